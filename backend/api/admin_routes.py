@@ -1,19 +1,29 @@
 """Admin API routes for user management and system administration"""
 from __future__ import annotations
+import asyncio
 
-from typing import Any, List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from typing import Any, List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Header
 from pydantic import BaseModel
 
 from services.auth import decode_token
 from models.database import get_db
 from services.user_service import UserService
 from services.admin_service import AdminService
+from services.analytics import get_analytics, refresh_analytics
+from services.data_version import get_current_data_version
+from services.graph_stats import etag_matches, get_graph_stats, sorted_counts
+from services.heavy_hitters import get_heavy_hitters
+from services.query_loader import query_registry
+from services.query_plans import check_query_plans, get_plan_report
+from services.warmup import get_warmup_state, refresh_after_import
 from models.user import UserResponse
 
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+_background: set = set()  # admin-triggered refreshes (referenced until done)
+
 
 class UserStats(BaseModel):
     """Statistics about users"""
@@ -249,16 +259,161 @@ def get_neo4j_graph(
 
 
 @router.get("/neo4j/stats")
-def get_neo4j_stats(
+async def get_neo4j_stats(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: Any = Depends(get_current_admin_user)
-) -> Dict[str, Any]:
+) -> Any:
     """
     Get Neo4j graph statistics (admin only)
     
+    Served from the per-data-version cache (services/graph_stats.py); answers
+    304 when If-None-Match carries the current ETag.
+    
     Args:
+        if_none_match: ETag of the copy the client already has
         current_user: Current authenticated admin user
         
     Returns:
         Graph statistics (node/rel counts)
     """
-    return AdminService.get_neo4j_stats()
+    stats = await get_graph_stats()
+    if stats is None:
+        return {"node_counts": [], "rel_counts": []}
+    headers = {"ETag": stats["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, stats["etag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return {
+        "node_counts": sorted_counts(stats["labels"], "label"),
+        "rel_counts": sorted_counts(stats["types"], "type"),
+    }
+
+
+@router.get("/analytics")
+def get_analytics_reports(
+    name: Optional[str] = None,
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Get the materialized report / dashboard templates (admin only)
+    
+    Args:
+        name: Only this report template
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Rows, subgraph versions and computation time of each report
+    """
+    return get_analytics(name)
+
+
+@router.post("/analytics/refresh")
+async def refresh_analytics_reports(
+    force: bool = False,
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Recompute the stale materialized reports, or all of them with force (admin only)
+    
+    Args:
+        force: Recompute every report
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Recomputed and reused reports
+    """
+    stats = await asyncio.to_thread(refresh_analytics, get_current_data_version(), force)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics disabled or Neo4j unavailable"
+        )
+    return stats
+
+
+@router.get("/heavy-hitters")
+def get_heavy_hitters_stats(
+    limit: int = 20,
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Get the hottest questions, intents and entities (admin only)
+    
+    Args:
+        limit: Number of entries per list
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Top questions / intents / entities with estimated counts in the current window
+    """
+    return get_heavy_hitters(limit)
+
+
+@router.post("/warmup", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_warmup(
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Refresh caches after a data import without waiting for the version poll (admin only)
+    
+    Args:
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Warm-up state at the time the refresh was started
+    """
+    task = asyncio.create_task(refresh_after_import(force=True))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return get_warmup_state()
+
+
+@router.get("/queries")
+def list_query_templates(
+    current_user: Any = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """
+    List the compiled Cypher templates (admin only)
+    
+    Args:
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Name, aliases, params with types, kind, default LIMIT, version and rejection of each template
+    """
+    return query_registry.describe()
+
+
+@router.get("/query-plans")
+def get_query_plan_report(
+    include_results: bool = True,
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Get the result of the last EXPLAIN check of all templates (admin only)
+    
+    Args:
+        include_results: Include the per-template results
+        current_user: Current authenticated admin user
+        
+    Returns:
+        Status, summary counts and per-template status / warnings / rejection reason
+    """
+    return get_plan_report(include_results)
+
+
+@router.post("/query-plans/check")
+async def run_query_plan_check(
+    current_user: Any = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Re-run the EXPLAIN check, e.g. after editing the template files (admin only)
+    
+    Args:
+        current_user: Current authenticated admin user
+        
+    Returns:
+        The new plan report
+    """
+    return await check_query_plans()
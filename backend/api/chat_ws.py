@@ -0,0 +1,174 @@
+"""
+WebSocket chat connections - several conversation streams multiplexed over
+one socket per browser
+"""
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from config import WS_MAX_STREAMS
+from models.database import SessionLocal
+from services.chatbot_service import chatbot_event_stream, load_system_prompt
+from services.conversation_service import ConversationService
+from services.user_service import UserService
+
+
+def _conversation_owner(email: Optional[str], conversation_id: int) -> Optional[int]:
+    """User id of `email` if that user owns the conversation, else None (runs in a worker thread)"""
+    if not email:
+        return None
+    db = SessionLocal()
+    try:
+        user = UserService.get_user_by_email(db, email)
+        if user is None or ConversationService.get_conversation(db, conversation_id, user.id) is None:
+            return None
+        return user.id
+    finally:
+        db.close()
+
+
+class ChatConnection:
+    """
+    One browser WebSocket carrying many concurrent chat requests
+
+    Client → server:
+        {"type": "query", "request_id": "r1", "question": "...", "conversation_id": 42}
+        {"type": "cancel", "request_id": "r1"}
+        {"type": "ping"}
+
+    A conversation_id is only accepted on a socket opened with the owner's
+    token; anything else closes the socket with 1008 (policy violation).
+
+    Server → client:
+        {"type": "intent" | "data" | "text" | "done", "request_id": "r1", "data": {...}}
+        {"type": "cancelled", "request_id": "r1"}
+        {"type": "error", "request_id": "r1", "detail": "..."}
+        {"type": "pong"}
+        {"type": "push", "data": {"event": "data_version", "data_version": "..."}}
+            (server-initiated after a graph import, see push_to_all)
+    """
+
+    def __init__(self, websocket: WebSocket, user: Optional[Dict[str, Any]] = None) -> None:
+        self.websocket = websocket
+        self.user = user
+        self.system_prompt = load_system_prompt()
+        self._streams: Dict[str, asyncio.Task] = {}
+        self._send_lock = asyncio.Lock()
+        self._owned: Dict[int, int] = {}  # conversation_id -> user id, checked once per socket
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Serialize writes - several stream tasks share the socket"""
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(message, ensure_ascii=False))
+
+    async def run(self) -> None:
+        """Receive loop; returns when the client disconnects"""
+        _connections.add(self)
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    message = json.loads(raw)
+                except json.JSONDecodeError:
+                    await self.send({"type": "error", "detail": "Invalid JSON"})
+                    continue
+                await self._dispatch(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            _connections.discard(self)
+            # Abandoned streams: cancels their Neo4j queries / Gemini streams
+            for task in self._streams.values():
+                task.cancel()
+            self._streams.clear()
+
+    async def _dispatch(self, message: Dict[str, Any]) -> None:
+        msg_type = message.get("type")
+        request_id = message.get("request_id")
+
+        if msg_type == "ping":
+            await self.send({"type": "pong"})
+        elif msg_type == "cancel":
+            task = self._streams.pop(request_id, None)
+            if task:
+                task.cancel()
+                await self.send({"type": "cancelled", "request_id": request_id})
+        elif msg_type == "query":
+            question = (message.get("question") or "").strip()
+            if not request_id or not question:
+                await self.send({"type": "error", "request_id": request_id, "detail": "request_id and question are required"})
+            elif request_id in self._streams:
+                await self.send({"type": "error", "request_id": request_id, "detail": "Duplicate request_id"})
+            elif len(self._streams) >= WS_MAX_STREAMS:
+                await self.send({"type": "error", "request_id": request_id, "detail": f"Too many concurrent streams (max {WS_MAX_STREAMS})"})
+            else:
+                conversation_id = message.get("conversation_id")
+                if not isinstance(conversation_id, int):
+                    conversation_id = None
+                user_id = None
+                if conversation_id is not None:
+                    user_id = await self._conversation_owner(conversation_id)
+                    if user_id is None:
+                        await self.send({"type": "error", "request_id": request_id, "detail": "Conversation does not belong to the current user"})
+                        await self.websocket.close(code=1008)
+                        raise WebSocketDisconnect(code=1008)
+                self._streams[request_id] = asyncio.create_task(
+                    self._run_stream(request_id, question, conversation_id, user_id)
+                )
+        else:
+            await self.send({"type": "error", "request_id": request_id, "detail": f"Unknown message type: {msg_type}"})
+
+    async def _conversation_owner(self, conversation_id: int) -> Optional[int]:
+        if conversation_id not in self._owned:
+            email = self.user.get("sub") if self.user else None
+            user_id = await asyncio.to_thread(_conversation_owner, email, conversation_id)
+            if user_id is None:
+                return None
+            self._owned[conversation_id] = user_id
+        return self._owned[conversation_id]
+
+    async def _run_stream(
+        self, request_id: str, question: str, conversation_id: Optional[int] = None, user_id: Optional[int] = None
+    ) -> None:
+        """Forward typed chatbot events for one request, tagged with its request_id"""
+        events = chatbot_event_stream(question, self.system_prompt, conversation_id=conversation_id, user_id=user_id)
+        try:
+            async for event in events:
+                await self.send({"type": event["event"], "request_id": request_id, "data": event["data"]})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WebSocket stream error: {e}")
+            try:
+                await self.send({"type": "error", "request_id": request_id, "detail": "Xin lỗi, đã có lỗi xảy ra."})
+            except Exception:
+                pass
+        finally:
+            self._streams.pop(request_id, None)
+            # Cancelled mid-send: run the stream's own cleanup (abandoned-stream
+            # metrics, closing the Gemini stream, no cache write) now, not at GC
+            await events.aclose()
+
+
+# Open connections, for server pushes
+_connections: Set[ChatConnection] = set()
+
+
+def connection_count() -> int:
+    """Number of open chat WebSockets"""
+    return len(_connections)
+
+
+async def push_to_all(data: Dict[str, Any]) -> None:
+    """Send a server-initiated message to every open chat WebSocket"""
+    async def _push(conn: ChatConnection) -> None:
+        try:
+            await conn.send({"type": "push", "data": data})
+        except Exception as e:
+            print(f"WebSocket push error: {e}")
+
+    # Concurrently: one slow client does not hold up the others
+    await asyncio.gather(*(_push(conn) for conn in list(_connections)))
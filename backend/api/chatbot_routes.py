@@ -2,17 +2,29 @@
 Chatbot API routes for AusVisa chatbot
 """
 from __future__ import annotations
-import os
-import json
-from typing import Optional
+import asyncio
+from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, WebSocket, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from services.chatbot_service import chatbot_response, chatbot_response_stream
+from services.chatbot_service import (
+    chatbot_response,
+    chatbot_event_stream,
+    get_stream_metrics,
+    load_system_prompt,
+)
+from services.stream_writer import SSEStreamWriter, can_resume, format_event, resume_stream
 from services.neo4j_exec import connect_neo4j
-from config import NEO4J_DATABASE
+from services.circuit_breaker import get_breaker_states
+from services.graph_stats import etag_matches, get_graph_stats
+from services.prefetch import get_prefetch_metrics
+from services.auth import decode_token
+from services.conversation_service import ConversationService
+from models.database import get_db
+from .chat_ws import ChatConnection, connection_count
+from .user_routes import get_current_user
 
 router = APIRouter(prefix="/api/chatbot", tags=["chatbot"])
 
@@ -20,6 +32,7 @@ router = APIRouter(prefix="/api/chatbot", tags=["chatbot"])
 class ChatRequest(BaseModel):
     """Request model for chat query"""
     question: str
+    conversation_id: Optional[int] = None  # from POST /api/conversations; enables follow-ups
 
 
 class ChatResponse(BaseModel):
@@ -35,32 +48,51 @@ class StatsResponse(BaseModel):
     visas: int
 
 
+async def conversation_owner(conversation_id: Optional[int], authorization: Optional[str], db: Any) -> Optional[int]:
+    """
+    Id of the authenticated user if they own conversation_id (None without a conversation)
+    
+    Raises:
+        HTTPException: 401 without a valid token, 403 if the conversation is not the user's
+    """
+    if conversation_id is None:
+        return None
+    user = await asyncio.to_thread(get_current_user, authorization, db)
+    conversation = await asyncio.to_thread(ConversationService.get_conversation, db, conversation_id, user.id)
+    if conversation is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Conversation does not belong to the current user"
+        )
+    return user.id
+
+
 @router.post("/query", response_model=ChatResponse)
-async def chat_query(req: ChatRequest):
+async def chat_query(
+    req: ChatRequest,
+    authorization: Optional[str] = Header(None),
+    db: Any = Depends(get_db)
+):
     """
     Process chatbot query
     
+    A conversation_id needs the Bearer token of the conversation's owner.
+    
     Args:
         req: Chat request with user question
+        authorization: Authorization header (required with conversation_id)
+        db: Database session
         
     Returns:
         ChatResponse with AI-generated response
     """
+    user_id = await conversation_owner(req.conversation_id, authorization, db)
     try:
-        # Load system prompt
-        system_prompt_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            "chatbot", 
-            "system_prompt.txt"
-        )
-        
-        if os.path.exists(system_prompt_path):
-            with open(system_prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-        else:
-            system_prompt = "You are a helpful AI assistant for Australian visa, study, and settlement information."
+        system_prompt = load_system_prompt()
         
-        result = await chatbot_response(req.question, system_prompt)
+        result = await chatbot_response(
+            req.question, system_prompt, conversation_id=req.conversation_id, user_id=user_id
+        )
         
         return ChatResponse(
             response=result["response"],
@@ -71,95 +103,134 @@ async def chat_query(req: ChatRequest):
 
 
 @router.post("/query-stream")
-async def chat_query_stream(req: ChatRequest):
+async def chat_query_stream(
+    req: ChatRequest,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None),
+    db: Any = Depends(get_db)
+):
     """
     Stream chatbot response using Server-Sent Events (SSE)
     
+    Events (each `data:` line is JSON):
+        intent: {"intent", "query_type", "entities"}
+        data:   {"rows", "row_count"} - compact Neo4j rows, sent before LLM text
+        text:   {"text"} - response chunks
+        done:   timing stats ({"intent_ms", "query_ms", "first_text_ms", "total_ms", "cached"})
+        error:  {"error": "disconnected" | "stream"} - ends a resumed replay of a
+                stream that stopped before `done`
+    
+    Text chunks are coalesced, `: ping` comments keep idle connections open and
+    every frame has an `id: <stream_id>:<seq>`. Reconnecting with a
+    `Last-Event-ID` header replays the missed frames instead of re-running the
+    question, as long as the stream is still in the replay buffer.
+    
+    If the client disconnects mid-answer, the Neo4j query / Gemini stream is
+    cancelled and nothing is cached (see `streams` in /api/chatbot/health).
+    
+    A conversation_id needs the Bearer token of the conversation's owner.
+    
     Args:
         req: Chat request with user question
+        request: Starlette request, polled for client disconnects
+        last_event_id: SSE `Last-Event-ID` header from a reconnecting client
+        authorization: Authorization header (required with conversation_id)
+        db: Database session
         
     Returns:
         StreamingResponse with real-time chunks
     """
+    user_id = await conversation_owner(req.conversation_id, authorization, db)
     try:
-        # Load system prompt
-        system_prompt_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            "chatbot", 
-            "system_prompt.txt"
-        )
-        
-        if os.path.exists(system_prompt_path):
-            with open(system_prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-        else:
-            system_prompt = "You are a helpful AI assistant for Australian visa, study, and settlement information."
+        system_prompt = load_system_prompt()
         
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+
+        if can_resume(last_event_id):
+            return StreamingResponse(
+                resume_stream(last_event_id),
+                media_type="text/event-stream",
+                headers=headers
+            )
+
+        writer = SSEStreamWriter()
+        headers["X-Stream-Id"] = writer.stream_id
+
         async def event_generator():
-            """Generate SSE events"""
+            """Generate typed SSE events: intent → data → text... → done"""
             try:
-                async for chunk in chatbot_response_stream(req.question, system_prompt):
-                    # Format as SSE with JSON payload to preserve newlines
-                    payload = json.dumps({"text": chunk})
-                    yield f"data: {payload}\n\n"
-                
-                # Send completion signal
-                yield "data: [DONE]\n\n"
+                events = chatbot_event_stream(
+                    req.question, system_prompt, conversation_id=req.conversation_id, user_id=user_id
+                )
+                async for frame in writer.stream(events, is_disconnected=request.is_disconnected):
+                    yield frame
             except Exception as e:
                 print(f"Stream generation error: {e}")
-                yield f"data: Xin lỗi, đã có lỗi xảy ra.\n\n"
-                yield "data: [DONE]\n\n"
+                yield format_event("text", {"text": "Xin lỗi, đã có lỗi xảy ra."})
+                yield format_event("done", {"error": "stream"})
         
         return StreamingResponse(
             event_generator(),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"  # Disable nginx buffering
-            }
+            headers=headers
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Streaming error: {str(e)}")
 
 
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Chat over one WebSocket with several concurrent conversation streams
+    
+    Each `query` message carries a request_id; every event sent back is tagged
+    with it, so answers can interleave. The system prompt and (optional) JWT are
+    resolved once per connection instead of once per message. See ChatConnection
+    for the message protocol.
+    
+    Args:
+        websocket: Client connection
+        token: Optional JWT access token (query parameter)
+    """
+    user = None
+    if token:
+        user = decode_token(token)
+        if user is None:
+            await websocket.close(code=1008)  # Policy violation: invalid token
+            return
+    
+    await websocket.accept()
+    await ChatConnection(websocket, user).run()
+
+
 @router.get("/stats", response_model=StatsResponse)
-async def get_stats():
+async def get_stats(response: Response, if_none_match: Optional[str] = Header(None)):
     """
     Get Neo4j database statistics
     
+    Served from the per-data-version cache (services/graph_stats.py); answers
+    304 when If-None-Match carries the current ETag.
+    
     Returns:
         StatsResponse with counts of universities, programs, and visas
     """
-    driver = connect_neo4j()
-    if not driver:
+    stats = await get_graph_stats()
+    if stats is None:
         raise HTTPException(status_code=500, detail="Neo4j not connected")
-    
-    try:
-        with driver.session(database=NEO4J_DATABASE) as session:
-            stats = session.run("""
-                MATCH (u:University) WITH count(u) AS unis
-                MATCH (p:Program) WITH unis, count(p) AS progs
-                MATCH (v:Visa) WITH unis, progs, count(v) AS visas
-                RETURN unis, progs, visas
-            """).single()
-            
-            if stats:
-                return StatsResponse(
-                    universities=stats["unis"],
-                    programs=stats["progs"],
-                    visas=stats["visas"]
-                )
-            else:
-                return StatsResponse(
-                    universities=0,
-                    programs=0,
-                    visas=0
-                )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Stats error: {str(e)}")
-    finally:
-        driver.close()
+    headers = {"ETag": stats["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, stats["etag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return StatsResponse(
+        universities=stats["labels"].get("University", 0),
+        programs=stats["labels"].get("Program", 0),
+        visas=stats["labels"].get("Visa", 0)
+    )
 
 
 @router.get("/health")
@@ -178,5 +249,9 @@ async def health_check():
     
     return {
         "status": "ok",
-        "neo4j": neo4j_status
+        "neo4j": neo4j_status,
+        "circuits": get_breaker_states(),
+        "streams": get_stream_metrics(),
+        "websockets": connection_count(),
+        "prefetch": get_prefetch_metrics()
     }
@@ -0,0 +1,124 @@
+"""Conversation API routes - conversation IDs for multi-turn chat"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from models.database import get_db
+from services.conversation_service import ConversationService
+from config import HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
+from models.conversation import (
+    ConversationCreate,
+    ConversationPage,
+    ConversationResponse,
+    MessagePage,
+    MessageResponse,
+)
+
+from .user_routes import get_current_user
+
+router = APIRouter(prefix="/api/conversations", tags=["conversations"])
+
+
+@router.post("", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
+def create_conversation(
+    body: ConversationCreate,
+    current_user: Any = Depends(get_current_user),
+    db: Any = Depends(get_db)
+) -> ConversationResponse:
+    """
+    Start a new conversation
+    
+    Pass the returned id as `conversation_id` to /api/chatbot/query,
+    /api/chatbot/query-stream or the WebSocket so follow-up questions
+    ("còn điều kiện của nó?") are resolved against the previous turn.
+    """
+    conversation = ConversationService.create_conversation(db, current_user.id, body.title)
+    return ConversationResponse.from_orm(conversation)
+
+
+@router.get("", response_model=ConversationPage)
+def list_conversations(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Any = Depends(get_current_user),
+    db: Any = Depends(get_db)
+) -> ConversationPage:
+    """
+    List the current user's conversations, most recently active first
+    
+    Args:
+        limit: Page size
+        cursor: `next_cursor` from the previous page (omit for the first page)
+    """
+    try:
+        rows, next_cursor = ConversationService.list_conversations(db, current_user.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ConversationPage(
+        items=[ConversationResponse.from_orm(c) for c in rows],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/{conversation_id}/messages", response_model=MessagePage)
+def list_messages(
+    conversation_id: int,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Any = Depends(get_current_user),
+    db: Any = Depends(get_db)
+) -> MessagePage:
+    """
+    List messages of a conversation: the latest page first, each page in
+    chronological order; `next_cursor` loads older messages
+    
+    Args:
+        conversation_id: Conversation ID
+        limit: Page size
+        cursor: `next_cursor` from the previous page (omit for the latest messages)
+    """
+    if not ConversationService.get_conversation(db, conversation_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    try:
+        rows, next_cursor = ConversationService.list_messages(db, conversation_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return MessagePage(
+        items=[MessageResponse.from_orm(m) for m in rows],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/{conversation_id}", response_model=ConversationResponse)
+def get_conversation(
+    conversation_id: int,
+    current_user: Any = Depends(get_current_user),
+    db: Any = Depends(get_db)
+) -> ConversationResponse:
+    """Get a conversation owned by the current user"""
+    conversation = ConversationService.get_conversation(db, conversation_id, current_user.id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    return ConversationResponse.from_orm(conversation)
+
+
+@router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+def delete_conversation(
+    conversation_id: int,
+    current_user: Any = Depends(get_current_user),
+    db: Any = Depends(get_db)
+) -> None:
+    """Delete a conversation and drop its cached context"""
+    if not ConversationService.delete_conversation(db, conversation_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
@@ -1,8 +1,11 @@
 from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 # from flow import build_flow  # Not needed for chatbot
@@ -12,6 +15,13 @@ from pydantic import BaseModel
 from .chatbot_routes import router as chatbot_router
 from .user_routes import router as user_router
 from .admin_routes import router as admin_router
+from .conversation_routes import router as conversation_router
+from services.answer_bank import get_answer_bank_info, load_answer_bank
+from services.chat_history import history_writer
+from services.data_version import fetch_data_version, set_current_data_version
+from services.message_partitions import partition_maintenance_loop
+from services.circuit_breaker import get_breaker_states
+from services.warmup import data_version_watch_loop, get_warmup_state, is_ready, startup_warmup
 
 class Text2CypherRequest(BaseModel):
     """_summary_
@@ -33,10 +43,33 @@ class Text2CypherResponse(BaseModel):
     params: Dict[str, Any]
     rows: Optional[List[Dict[str, Any]]] = None
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the FAQ answer bank, start the chat history writer, partition upkeep,
+    cache warm-up and the data version watch; flush history before exit
+    """
+    data_version = await asyncio.to_thread(fetch_data_version)
+    set_current_data_version(data_version)
+    await asyncio.to_thread(load_answer_bank, data_version)
+    history_writer.start()
+    # Warm-up runs in the background: the server accepts traffic (liveness)
+    # right away, /ready turns 200 once the caches are warm
+    tasks = [
+        asyncio.create_task(partition_maintenance_loop()),
+        asyncio.create_task(startup_warmup()),
+        asyncio.create_task(data_version_watch_loop()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await history_writer.stop()
+
 app = FastAPI(
     title="AusVisa API",
     description="API for Australian Visa Chatbot",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -57,6 +90,9 @@ app.include_router(chatbot_router)
 # Include admin routes
 app.include_router(admin_router)
 
+# Include conversation routes
+app.include_router(conversation_router)
+
 # Deprecated event handlers - commented out to avoid AssertionError
 # @app.on_event("startup")
 # def _startup() -> None:
@@ -80,9 +116,24 @@ def health():
     """Health check endpoint
     
     Returns:
-        dict: Status message
+        dict: Status message, "degraded" while a dependency circuit is open
     """
-    return {"status": "ok"}
+    circuits = get_breaker_states()
+    degraded = any(c["state"] != "closed" for c in circuits.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "circuits": circuits,
+        "chat_history": history_writer.snapshot(),
+        "answer_bank": get_answer_bank_info(),
+    }
+
+@app.get("/ready")
+def ready():
+    """Readiness check: 503 until the startup cache warm-up has finished"""
+    state = get_warmup_state()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": state})
+    return {"status": "ready", "warmup": state}
 
 @app.get("/debug-config")
 def debug_config():
@@ -14,7 +14,139 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
 # Chatbot optimization settings
 ENABLE_STREAMING = os.getenv("ENABLE_STREAMING", "true").lower() == "true"
-CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes cache
+# Caches are keyed on the graph data version (invalidated exactly by imports),
+# so the TTL only bounds memory
+CACHE_TTL = int(os.getenv("CACHE_TTL", "21600"))  # 6 hours cache
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_HOT_TTL_MULTIPLIER = int(os.getenv("CACHE_HOT_TTL_MULTIPLIER", "4"))  # hot keys: 1 day instead of 6 hours
+
+# Per-request deadline budget (seconds) split across intent / query / LLM stages
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+INTENT_BUDGET_SHARE = float(os.getenv("INTENT_BUDGET_SHARE", "0.25"))
+QUERY_BUDGET_SHARE = float(os.getenv("QUERY_BUDGET_SHARE", "0.25"))
+MIN_STAGE_SECONDS = float(os.getenv("MIN_STAGE_SECONDS", "1"))
+
+# Hedged intent detection: fire a 2nd Gemini call if the 1st is slower than p90
+ENABLE_INTENT_HEDGING = os.getenv("ENABLE_INTENT_HEDGING", "false").lower() == "true"
+INTENT_HEDGE_PERCENTILE = float(os.getenv("INTENT_HEDGE_PERCENTILE", "0.9"))
+INTENT_HEDGE_DEFAULT_SECONDS = float(os.getenv("INTENT_HEDGE_DEFAULT_SECONDS", "2"))  # until p90 is known
+
+# Circuit breakers (Neo4j / Gemini): open when >= CB_FAILURE_RATE of the calls
+# in the last CB_WINDOW_SECONDS failed (min CB_MIN_CALLS), retry after CB_OPEN_SECONDS
+CB_FAILURE_RATE = float(os.getenv("CB_FAILURE_RATE", "0.5"))
+CB_WINDOW_SECONDS = float(os.getenv("CB_WINDOW_SECONDS", "30"))
+CB_MIN_CALLS = int(os.getenv("CB_MIN_CALLS", "5"))
+CB_OPEN_SECONDS = float(os.getenv("CB_OPEN_SECONDS", "30"))
+CB_HALF_OPEN_PROBES = int(os.getenv("CB_HALF_OPEN_PROBES", "1"))
+
+# SSE streaming settings
+SSE_COALESCE_BYTES = int(os.getenv("SSE_COALESCE_BYTES", "512"))  # flush text frame at this size
+SSE_COALESCE_MS = int(os.getenv("SSE_COALESCE_MS", "50"))  # ...or after this long
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))  # keep idle proxies open
+SSE_REPLAY_TTL = int(os.getenv("SSE_REPLAY_TTL", "60"))  # Last-Event-ID resume window
+SSE_REPLAY_MAX_FRAMES = int(os.getenv("SSE_REPLAY_MAX_FRAMES", "512"))
+SSE_DISCONNECT_POLL_SECONDS = float(os.getenv("SSE_DISCONNECT_POLL_SECONDS", "0.5"))
+
+# WebSocket chat settings
+WS_MAX_STREAMS = int(os.getenv("WS_MAX_STREAMS", "4"))  # concurrent conversation streams per socket
+
+# Conversation context (multi-turn follow-ups)
+CONTEXT_TTL = int(os.getenv("CONTEXT_TTL", "1800"))  # forget a conversation after 30 minutes idle
+CONTEXT_MAX_CONVERSATIONS = int(os.getenv("CONTEXT_MAX_CONVERSATIONS", "5000"))
+
+# Predictive prefetch of likely follow-up queries
+ENABLE_PREFETCH = os.getenv("ENABLE_PREFETCH", "true").lower() == "true"
+PREFETCH_TOP_K = int(os.getenv("PREFETCH_TOP_K", "3"))  # follow-up templates per answer
+PREFETCH_QUEUE_SIZE = int(os.getenv("PREFETCH_QUEUE_SIZE", "100"))  # jobs beyond this are dropped
+PREFETCH_IDLE_WAIT_SECONDS = float(os.getenv("PREFETCH_IDLE_WAIT_SECONDS", "5"))  # wait for foreground to finish
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv("PREFETCH_TIMEOUT_SECONDS", "5"))
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", os.path.join(os.path.dirname(__file__), "logs", "query_log.jsonl"))
+QUERY_LOG_MAX_LINES = int(os.getenv("QUERY_LOG_MAX_LINES", "50000"))  # read at startup to learn transitions
+QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", str(20 * 1024 * 1024)))  # then rotated to <path>.1
+QUERY_LOG_PENDING_MAX = int(os.getenv("QUERY_LOG_PENDING_MAX", "10000"))  # unwritten entries beyond this are dropped
+
+# Chat history write-behind (Conversation / Message tables)
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "5000"))  # messages buffered in memory
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "200"))  # flush after this many messages...
+HISTORY_FLUSH_MS = int(os.getenv("HISTORY_FLUSH_MS", "500"))  # ...or after this long
+HISTORY_BACKPRESSURE_SECONDS = float(os.getenv("HISTORY_BACKPRESSURE_SECONDS", "2"))  # wait for space, then drop
+HISTORY_MAX_RETRIES = int(os.getenv("HISTORY_MAX_RETRIES", "3"))
+HISTORY_DRAIN_SECONDS = float(os.getenv("HISTORY_DRAIN_SECONDS", "10"))  # flush budget on shutdown
+
+# Chat history storage (monthly partitions of `messages`)
+MESSAGE_PARTITION_MONTHS_AHEAD = int(os.getenv("MESSAGE_PARTITION_MONTHS_AHEAD", "3"))
+MESSAGE_RETENTION_MONTHS = int(os.getenv("MESSAGE_RETENTION_MONTHS", "12"))  # older months get archived
+MESSAGE_ARCHIVE_DIR = os.getenv("MESSAGE_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "archive", "messages"))
+MESSAGE_AUTO_ARCHIVE = os.getenv("MESSAGE_AUTO_ARCHIVE", "false").lower() == "true"  # else run scripts/manage_messages.py
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200"))
+
+# Precomputed FAQ answers (built by scripts/build_answer_bank.py)
+ANSWER_BANK_PATH = os.getenv("ANSWER_BANK_PATH", os.path.join(os.path.dirname(__file__), "chatbot", "answer_bank.json"))
+ANSWER_BANK_TOP_N = int(os.getenv("ANSWER_BANK_TOP_N", "50"))
+ANSWER_BANK_CONCURRENCY = int(os.getenv("ANSWER_BANK_CONCURRENCY", "3"))  # parallel pipeline runs (Gemini quota)
+
+# Heavy hitters (count-min sketch + top-K): memory is HH_WIDTH x HH_DEPTH counters per tracker
+HH_WIDTH = int(os.getenv("HH_WIDTH", "2048"))
+HH_DEPTH = int(os.getenv("HH_DEPTH", "4"))  # at most 8
+HH_TOP_K = int(os.getenv("HH_TOP_K", "100"))
+HH_DECAY_SECONDS = float(os.getenv("HH_DECAY_SECONDS", "3600"))  # halve all counts this often
+HH_HOT_MIN_COUNT = int(os.getenv("HH_HOT_MIN_COUNT", "5"))  # lookups per window that make a key hot
+
+# Compiled Cypher template registry (services/query_loader.py)
+QUERY_RELOAD_SECONDS = float(os.getenv("QUERY_RELOAD_SECONDS", "2"))  # how often template files are checked for changes
+QUERY_REGISTRY_CACHE_PATH = os.getenv(
+    "QUERY_REGISTRY_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "query_registry.json")
+)  # "" disables the serialized registry
+
+# Startup EXPLAIN of every template (plan cache warm-up and validation)
+PLAN_CHECK_ENABLED = os.getenv("PLAN_CHECK_ENABLED", "true").lower() == "true"
+PLAN_CHECK_REJECT_CARTESIAN = os.getenv("PLAN_CHECK_REJECT_CARTESIAN", "true").lower() == "true"
+PLAN_CHECK_TIMEOUT_SECONDS = float(os.getenv("PLAN_CHECK_TIMEOUT_SECONDS", "10"))  # per EXPLAIN
+PLAN_WARM_PAGE_CACHE = os.getenv("PLAN_WARM_PAGE_CACHE", "false").lower() == "true"
+PLAN_WARM_LABELS = [
+    label.strip()
+    for label in os.getenv("PLAN_WARM_LABELS", "Visa,University,Program,ExamScore,StudyCategory,SettlementCategory").split(",")
+    if label.strip()
+]
+PLAN_WARM_NODE_LIMIT = int(os.getenv("PLAN_WARM_NODE_LIMIT", "50000"))  # per label
+
+# Full-text indexes for keyword templates (services/fulltext.py)
+FULLTEXT_ANALYZER = os.getenv("FULLTEXT_ANALYZER", "standard-no-stop-words")  # "standard-folding" ignores diacritics
+FULLTEXT_AWAIT_SECONDS = float(os.getenv("FULLTEXT_AWAIT_SECONDS", "300"))  # wait for new indexes to populate
+
+# In-process BM25 passage retrieval (services/bm25_index.py), fallback when templates return nothing
+BM25_ENABLED = os.getenv("BM25_ENABLED", "true").lower() == "true"
+BM25_TOP_K = int(os.getenv("BM25_TOP_K", "5"))
+BM25_MIN_SCORE = float(os.getenv("BM25_MIN_SCORE", "2.0"))  # weaker matches are not passed to the LLM
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Local dense vector index (services/vector_index.py); needs numpy and sentence-transformers
+VECTOR_ENABLED = os.getenv("VECTOR_ENABLED", "true").lower() == "true"
+VECTOR_MODEL = os.getenv("VECTOR_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(os.path.dirname(__file__), ".cache", "vectors"))
+VECTOR_TOP_K = int(os.getenv("VECTOR_TOP_K", "5"))
+VECTOR_MIN_SCORE = float(os.getenv("VECTOR_MIN_SCORE", "0.35"))  # cosine similarity
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", "8"))  # IVF lists scanned per query
+VECTOR_BATCH_SIZE = int(os.getenv("VECTOR_BATCH_SIZE", "32"))
+VECTOR_REBUILD_ON_CHANGE = os.getenv("VECTOR_REBUILD_ON_CHANGE", "true").lower() == "true"
+
+# Read-only in-process graph snapshot (services/graph_snapshot.py) serving hot templates; needs numpy
+GRAPH_SNAPSHOT_ENABLED = os.getenv("GRAPH_SNAPSHOT_ENABLED", "true").lower() == "true"
+GRAPH_SNAPSHOT_DIR = os.getenv("GRAPH_SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), ".cache", "graph_snapshot"))
+
+# Materialized report / dashboard templates (services/analytics.py), recomputed per graph version
+ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "true").lower() == "true"
+ANALYTICS_PATH = os.getenv("ANALYTICS_PATH", os.path.join(os.path.dirname(__file__), ".cache", "analytics.json"))
+
+# Cache warm-up (startup and after graph imports) and readiness
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_TOP_QUESTIONS = int(os.getenv("WARMUP_TOP_QUESTIONS", "30"))  # replayed through the full pipeline
+WARMUP_TOP_QUERIES = int(os.getenv("WARMUP_TOP_QUERIES", "100"))  # (template, entities) pairs replayed on Neo4j
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "3"))
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "120"))  # become ready after this at the latest
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "30"))  # reads the DataVersion nodes
 
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
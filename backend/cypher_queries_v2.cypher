@@ -20,16 +20,25 @@ ORDER BY university;
 -- name: find_programs_by_university_subject_level
 // 1.1. TÌM CHƯƠNG TRÌNH HỌC THEO TRƯỜNG, NGÀNH, CẤP ĐỘ
 // Use case: "Tìm chương trình Master về Computer Science tại University of Melbourne"
-MATCH (u:University {name: $university_name})
-MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-      -[:HAS_LEVEL]->(pl:ProgramLevel {name: $level})
-      -[:OFFERS]->(p:Program)
+// @param subject_keyword: search
+// Chương trình khớp từ khóa qua tên, Subject hoặc StudyCategory (full-text index)
+CALL {
+  CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $subject_keyword + ')') YIELD node
+  RETURN node AS hit
+  UNION
+  CALL db.index.fulltext.queryNodes('subject_fulltext', $subject_keyword) YIELD node
+  MATCH (hit:Program)-[:FOCUSES_ON]->(node)
+  RETURN hit
+  UNION
+  CALL db.index.fulltext.queryNodes('study_category_fulltext', $subject_keyword) YIELD node
+  MATCH (hit:Program)-[:IN_STUDY_CATEGORY]->(node)
+  RETURN hit
+}
+WITH hit AS p
 WHERE p.program_type = $level
+MATCH (u:University {name: $university_name})<-[:AT_UNIVERSITY]-(p)
 OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-WHERE toLower(subj.name) CONTAINS toLower($subject_keyword)
-   OR toLower(cat.name) CONTAINS toLower($subject_keyword)
-   OR toLower(p.name) CONTAINS toLower($subject_keyword)
 RETURN u.name AS university,
        p.name AS program_name,
        p.url AS program_url,
@@ -42,26 +51,22 @@ LIMIT 20;
 -- name: find_programs_by_ielts
 // 1.2. TÌM TRƯỜNG THEO YÊU CẦU IELTS/TOEFL
 // Use case: "Tìm trường yêu cầu IELTS 6.5 trở xuống"
-MATCH (p:Program)-[:HAS_REQUIRED]->(es:ExamScore)
-      <-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
-WHERE es.value <= $max_score
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)
-      <-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p:Program)
+WHERE p.min_ielts <= $max_score
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN DISTINCT u.name AS university,
        p.name AS program_name,
-       es.value AS ielts_required,
-       es.plus AS needs_plus,
+       p.min_ielts AS ielts_required,
+       p.min_ielts_plus AS needs_plus,
        p.url AS url
-ORDER BY es.value ASC
+ORDER BY p.min_ielts ASC
 LIMIT 20;
 
 -- name: find_programs_by_intake_month
 // 1.3. TÌM CHƯƠNG TRÌNH THEO KỲ NHẬP HỌC
 // Use case: "Chương trình nào nhập học tháng 2?"
 MATCH (p:Program)-[:STARTS_IN]->(m:Month {name: $month})
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 RETURN u.name AS university,
        p.name AS program_name,
@@ -76,8 +81,7 @@ LIMIT 20;
 // Use case: "Tìm chương trình kép Bachelor + Master"
 MATCH (parent:Program {relation: "combined"})
       -[:HAS_COMPONENT]->(comp:Program)
-MATCH (parent)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (parent)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        parent.name AS combined_program,
        collect(comp.name) AS components,
@@ -90,9 +94,7 @@ LIMIT 10;
 // Use case: "So sánh yêu cầu IELTS giữa 3 trường"
 MATCH (u:University)
 WHERE u.name IN $university_list
-MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-      -[:HAS_LEVEL]->(pl:ProgramLevel {name: $level})
-      -[:OFFERS]->(p:Program)
+MATCH (u)<-[:AT_UNIVERSITY]-(p:Program {program_type: $level})
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 RETURN u.name AS university,
        p.name AS program,
@@ -110,9 +112,7 @@ MATCH (p:Program)-[:FOCUSES_ON]->(s:Subject)
 WITH s.name AS subject, count(DISTINCT p) AS program_count
 ORDER BY program_count DESC
 LIMIT 15
-MATCH (s:Subject {name: subject})<-[:FOCUSES_ON]-(p:Program)
-      <-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (s:Subject {name: subject})<-[:FOCUSES_ON]-(p:Program)-[:AT_UNIVERSITY]->(u:University)
 RETURN subject,
        program_count,
        collect(DISTINCT u.name)[..5] AS sample_universities
@@ -136,8 +136,7 @@ RETURN u.name AS university,
 // Use case: "Tìm chương trình có học phí dưới 30,000 AUD"
 MATCH (p:Program)
 WHERE p.description CONTAINS '$' OR p.description CONTAINS 'AUD'
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        p.name AS program,
        p.description AS description,
@@ -275,8 +274,7 @@ RETURN sp.title AS page_title,
 -- name: settlement_search_by_keyword
 // 3.4. TÌM THÔNG TIN THEO TỪ KHÓA
 // Use case: "Thông tin về học tiếng Anh tại Úc"
-MATCH (cat:SettlementCategory)
-WHERE toLower(cat.name) CONTAINS toLower($keyword)
+CALL db.index.fulltext.queryNodes('settlement_category_fulltext', $keyword) YIELD node AS cat
 MATCH (cat)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
       -[:CONTAINS_SETTLEMENT_PAGE]->(sp:SettlementPage)
 RETURN cat.name AS category,
@@ -318,6 +316,21 @@ RETURN v.name_visa AS visa,
            page_url: sp.url
        })[..5] AS settlement_info;
 
+-- name: visa_related_settlement_info
+// 4.2b. VISA BẤT KỲ → THÔNG TIN ĐỊNH CƯ LIÊN QUAN
+// Use case: "Với visa 190, tôi cần biết gì về định cư?"
+MATCH (v:Visa {subclass: $subclass})
+      -[:HAS_RELEVANT_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
+MATCH (sc)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
+      -[:CONTAINS_SETTLEMENT_PAGE]->(sp:SettlementPage)
+RETURN v.name_visa AS visa,
+       sc.name AS settlement_category,
+       collect(DISTINCT {
+           task_group: tg.name,
+           page_title: sp.title,
+           page_url: sp.url
+       })[..5] AS settlement_info;
+
 -- name: visa_skilled_employment_info
 // 4.3. VISA SKILLED → THÔNG TIN ĐỊNH CƯ VIỆC LÀM
 // Use case: "Với visa PR, làm sao tìm việc?"
@@ -354,8 +367,7 @@ RETURN u.name AS university,
 -- name: studyfield_related_settlement_info
 // 4.5. NGÀNH HỌC → THÔNG TIN ĐỊNH CƯ
 // Use case: "Học IT thì có thông tin gì về định cư?"
-MATCH (sc:StudyCategory)
-WHERE toLower(sc.name) CONTAINS toLower($study_field)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $study_field) YIELD node AS sc
 MATCH (sc)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc2:SettlementCategory)
 MATCH (sc2)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
       -[:CONTAINS_SETTLEMENT_PAGE]->(sp:SettlementPage)
@@ -374,38 +386,27 @@ RETURN sc.name AS study_category,
 -- name: comprehensive_pathway_it_to_pr
 // 5.1. LỘ TRÌNH DU HỌC → ĐỊNH CƯ HOÀN CHỈNH
 // Use case: "Tôi muốn học IT và định cư, hướng dẫn chi tiết"
-// Bước 1: Tìm chương trình IT
-MATCH (p:Program)-[:FOCUSES_ON]->(subj:Subject)
-WHERE toLower(subj.name) CONTAINS 'computer'
-   OR toLower(subj.name) CONTAINS 'information technology'
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
-OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
-WITH u, p, collect({exam: e.name, score: es.value}) AS requirements
-LIMIT 5
-// Bước 2: Visa du học (500)
-MATCH (v:Visa {subclass: "500"})
-OPTIONAL MATCH (v)-[:HAS_STEP]->(s:VisaStep)
-// Bước 3: Visa PR sau khi tốt nghiệp
-MATCH (vpr:Visa)
-WHERE vpr.subclass IN ["189", "190", "191"]
-OPTIONAL MATCH (vpr)-[:HAS_RELEVANT_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
+// Pathway dựng sẵn bởi import_cross_rel.py (ngành → chương trình → visa 500 → PR)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', 'computer* OR "information technology"') YIELD node AS cat
+MATCH (pw:Pathway {category: cat.name})
+WITH pw LIMIT 1
+UNWIND range(0, size(pw.program_names) - 1) AS i
 RETURN {
     study: {
-        university: u.name,
-        program: p.name,
-        requirements: requirements,
-        url: p.url
+        university: pw.program_universities[i],
+        program: pw.program_names[i],
+        min_ielts: CASE WHEN pw.program_min_ielts[i] > 0 THEN pw.program_min_ielts[i] END,
+        url: pw.program_urls[i]
     },
     student_visa: {
-        name: v.name_visa,
-        steps: collect(DISTINCT {order: s.step_order, title: s.title})[..3]
+        name: pw.student_visa_name,
+        steps: pw.student_visa_steps
     },
-    pr_visas: collect(DISTINCT {
-        name: vpr.name_visa,
-        subclass: vpr.subclass,
-        settlement_support: collect(DISTINCT sc.name)[..3]
-    })[..3]
+    pr_visas: [j IN range(0, size(pw.pr_visa_subclasses) - 1) | {
+        name: pw.pr_visa_names[j],
+        subclass: pw.pr_visa_subclasses[j]
+    }][..3],
+    settlement_support: pw.pr_settlement_categories[..3]
 } AS complete_pathway;
 
 -- name: compare_universities_full
@@ -413,9 +414,7 @@ RETURN {
 // Use case: "So sánh toàn diện giữa UNSW, Uni Melbourne, ANU"
 MATCH (u:University)
 WHERE u.name IN $university_list
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-              -[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 OPTIONAL MATCH (u)-[:HAS_INFO]->(ip:InfoPage)-[:HAS_SECTION]->(sec:InfoSection)
@@ -436,12 +435,10 @@ ORDER BY total_programs DESC;
 // Use case: Chatbot nhận câu hỏi tự do và query linh hoạt
 // "Tôi muốn học Master, IELTS 7.0, quan tâm Business, muốn biết về định cư"
 MATCH (p:Program {program_type: "Master"})
-MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
-WHERE es.value <= 7.0
+WHERE p.min_ielts <= 7.0
 MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 WHERE toLower(cat.name) CONTAINS 'business'
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 // Thông tin visa
 OPTIONAL MATCH (v:Visa {subclass: "500"})
 OPTIONAL MATCH (v)-[:HAS_RELEVANT_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
@@ -450,7 +447,7 @@ RETURN {
     programs: collect(DISTINCT {
         university: u.name,
         program: p.name,
-        ielts: es.value,
+        ielts: p.min_ielts,
         url: p.url
     })[..5],
     visa_info: {
@@ -468,9 +465,7 @@ RETURN {
 MATCH (u:University)-[:HAS_INFO]->(ip:InfoPage)
       -[:HAS_SECTION]->(sec:InfoSection)
 WHERE sec.key CONTAINS 'Cost'
-MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-      -[:HAS_LEVEL]->(pl:ProgramLevel)
-      -[:OFFERS]->(p:Program)
+MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 RETURN u.name AS university,
        collect(DISTINCT {
            cost_type: sec.key,
@@ -505,6 +500,26 @@ RETURN {
     top_categories: all_categories[..10]
 } AS system_overview;
 
+-- name: study_to_pr_pathway_by_field
+// 5.6. LỘ TRÌNH DU HỌC → PR THEO NGÀNH (Pathway dựng sẵn)
+// Use case: "Học ngành Nursing rồi định cư thì đi thế nào?"
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $field) YIELD node AS cat
+MATCH (pw:Pathway {category: cat.name})
+RETURN pw.category AS category,
+       pw.program_count AS total_programs,
+       pw.subjects AS subjects,
+       [i IN range(0, size(pw.program_names) - 1) | {
+           program: pw.program_names[i],
+           level: pw.program_levels[i],
+           university: pw.program_universities[i],
+           min_ielts: CASE WHEN pw.program_min_ielts[i] > 0 THEN pw.program_min_ielts[i] END,
+           url: pw.program_urls[i]
+       }] AS sample_programs,
+       pw.visa_route_names AS visa_route,
+       pw.student_visa_steps AS student_visa_steps,
+       pw.settlement_categories + [x IN pw.pr_settlement_categories WHERE NOT x IN pw.settlement_categories] AS settlement_support
+LIMIT 3;
+
 // ============================================================
 // PHẦN 6: QUERY NÂNG CAO
 // ============================================================
@@ -512,12 +527,12 @@ RETURN {
 -- name: shortest_path_study_to_pr
 // 6.1. TÌM LỘ TRÌNH TỐI ƯU (Shortest Path)
 // Use case: "Con đường ngắn nhất từ du học đến PR"
-MATCH path = shortestPath(
-    (start:Visa {subclass: "500"})
-    -[*..5]-
-    (end:Visa {subclass: "189"})
-)
-RETURN path;
+// Lộ trình visa dựng sẵn (giống nhau ở mọi Pathway) thay cho shortestPath không giới hạn kiểu quan hệ
+MATCH (pw:Pathway)
+WITH pw LIMIT 1
+RETURN pw.visa_route AS visa_subclasses,
+       pw.visa_route_names AS visas,
+       size(pw.visa_route) - 1 AS path_length;
 
 -- name: universities_with_bachelor_and_master_overlap
 // 6.2. TÌM TẤT CẢ TRƯỜNG CÓ CHƯƠNG TRÌNH LIÊN QUAN
@@ -553,14 +568,21 @@ RETURN v.name_visa AS visa,
 -- name: programs_by_student_profile
 // 7.1. TÌM CHƯƠNG TRÌNH PHÙ HỢP THEO PROFILE HỌC SINH
 // Use case: "IELTS 6.5, muốn học IT, ngân sách 40k, bắt đầu tháng 7"
-MATCH (p:Program)-[:STARTS_IN]->(m:Month {name: $start_month})
+// @param interest: search
+CALL {
+  CALL db.index.fulltext.queryNodes('study_category_fulltext', $interest) YIELD node
+  MATCH (hit:Program)-[:IN_STUDY_CATEGORY]->(node)
+  RETURN hit
+  UNION
+  CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $interest + ')') YIELD node
+  RETURN node AS hit
+}
+WITH hit AS p
+MATCH (p)-[:STARTS_IN]->(m:Month {name: $start_month})
 MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: $exam_type})
 WHERE es.value <= $student_score
 MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($interest)
-   OR toLower(p.name) CONTAINS toLower($interest)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (u)-[:HAS_INFO]->(ip:InfoPage)
               -[:HAS_SECTION]->(cost:InfoSection)
 WHERE cost.key CONTAINS 'Cost'
@@ -577,12 +599,12 @@ LIMIT 10;
 -- name: master_recommendations_from_bachelor_field
 // 7.2. GỢI Ý CHƯƠNG TRÌNH DỰA TRÊN LỘ TRÌNH HỌC TẬP
 // Use case: "Tôi học Bachelor IT xong, muốn tiếp tục Master"
-MATCH (bachelor:Program {program_type: "Bachelor"})
-WHERE toLower(bachelor.name) CONTAINS toLower($current_field)
+// @param current_field: search
+CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $current_field + ')') YIELD node AS bachelor
+WHERE bachelor.program_type = "Bachelor"
 MATCH (bachelor)-[:FOCUSES_ON]->(subj:Subject)
 MATCH (master:Program {program_type: "Master"})-[:FOCUSES_ON]->(subj)
-MATCH (master)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (master)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (master)-[:HAS_REQUIRED]->(es:ExamScore)
               <-[:HAS_SCORE]-(e:Exam)
 RETURN u.name AS university,
@@ -595,14 +617,12 @@ LIMIT 15;
 -- name: entry_difficulty_ranking_by_level
 // 7.3. PHÂN TÍCH ĐỘ KHÓ NHẬP HỌC (Entry Difficulty)
 // Use case: "Xếp hạng trường theo độ khó nhập học"
-MATCH (u:University)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-      -[:HAS_LEVEL]->(pl:ProgramLevel {name: $level})
-      -[:OFFERS]->(p:Program)
-MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
+MATCH (u:University)<-[:AT_UNIVERSITY]-(p:Program {program_type: $level})
+WHERE p.min_ielts IS NOT NULL
 WITH u, 
-     avg(es.value) AS avg_ielts,
-     min(es.value) AS min_ielts,
-     max(es.value) AS max_ielts,
+     avg(p.min_ielts) AS avg_ielts,
+     min(p.min_ielts) AS min_ielts,
+     max(p.min_ielts) AS max_ielts,
      count(DISTINCT p) AS program_count
 ORDER BY avg_ielts DESC
 RETURN u.name AS university,
@@ -621,12 +641,10 @@ LIMIT 20;
 -- name: flexible_entry_requirements_by_field_and_level
 // 7.4. TÌM CHƯƠNG TRÌNH CÓ YÊU CẦU LINH HOẠT
 // Use case: "Trường nào dễ nhập học nhất cho Master Business?"
-MATCH (p:Program {program_type: $level})
-MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($field)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $field) YIELD node AS cat
+MATCH (p:Program {program_type: $level})-[:IN_STUDY_CATEGORY]->(cat)
 MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 WITH u, p, 
      collect({exam: e.name, score: es.value, plus: es.plus}) AS all_requirements,
      min(es.value) AS lowest_requirement
@@ -774,9 +792,7 @@ LIMIT 10;
 -- name: settlement_info_by_city
 // 9.3. TÌM THÔNG TIN THEO THÀNH PHỐ (nếu có trong data)
 // Use case: "Thông tin định cư tại Melbourne"
-MATCH (sp:SettlementPage)
-WHERE toLower(sp.title) CONTAINS toLower($city)
-   OR toLower(sp.url) CONTAINS toLower($city)
+CALL db.index.fulltext.queryNodes('settlement_page_fulltext', $city) YIELD node AS sp
 OPTIONAL MATCH (sp)<-[:CONTAINS_SETTLEMENT_PAGE]-(tg:SettlementTaskGroup)
               <-[:HAS_GROUP]-(cat:SettlementCategory)
 OPTIONAL MATCH (sp)-[:HAS_SETTLEMENT_SECTION]->(sec)
@@ -790,8 +806,7 @@ LIMIT 10;
 -- name: settlement_support_by_profession
 // 9.4. MAPPING HỖ TRỢ THEO NGÀNH NGHỀ
 // Use case: "Tôi làm IT, cần hỗ trợ gì khi mới đến?"
-MATCH (sc:StudyCategory)
-WHERE toLower(sc.name) CONTAINS toLower($profession)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $profession) YIELD node AS sc
 MATCH (sc)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc2:SettlementCategory)
       -[:HAS_GROUP]->(tg:SettlementTaskGroup)
       -[:CONTAINS_SETTLEMENT_PAGE]->(sp:SettlementPage)
@@ -811,9 +826,7 @@ RETURN sc.name AS your_field,
 // 10.1. TÌM TẤT CẢ KẾT NỐI CỦA MỘT TRƯỜNG
 // Use case: "Tất cả thông tin liên quan đến UNSW"
 MATCH (u:University {name: $university_name})
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-              -[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
 OPTIONAL MATCH (u)-[:HAS_INFO]->(ip:InfoPage)
@@ -865,15 +878,13 @@ RETURN {
 // 10.3. TÌM CHƯƠNG TRÌNH VỚI ĐẦY ĐỦ THÔNG TIN
 // Use case: "Tôi muốn biết mọi thứ về chương trình X"
 MATCH (p:Program {name: $program_name})
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (p)-[:STUDY_LEVEL]->(sl:StudyLevel)
 OPTIONAL MATCH (p)-[:STUDY_MODE]->(sm:StudyMode)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
 OPTIONAL MATCH (p)-[:AWARDS]->(deg:Degree)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
-OPTIONAL MATCH (p)-[:STARTS_IN]->(m:Month)
 OPTIONAL MATCH (p)-[:HAS_MAJOR]->(maj:Major)
 OPTIONAL MATCH (p)-[:HAS_COMPONENT]->(comp:Program)
 OPTIONAL MATCH (cat)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
@@ -899,7 +910,7 @@ RETURN {
     }),
     schedule: {
         starting_months: p.starting_months,
-        available_intakes: collect(DISTINCT m.name)
+        available_intakes: p.start_months
     },
     specializations: collect(DISTINCT maj.name),
     components: collect(DISTINCT {
@@ -916,18 +927,15 @@ RETURN {
 -- name: university_statistics_report
 // 11.1. BÁO CÁO THỐNG KÊ THEO TRƯỜNG
 MATCH (u:University)
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-              -[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
 WITH u,
      count(DISTINCT p) AS total_programs,
      count(DISTINCT CASE WHEN p.program_type = 'Bachelor' THEN p END) AS bachelor_count,
      count(DISTINCT CASE WHEN p.program_type = 'Master' THEN p END) AS master_count,
      count(DISTINCT CASE WHEN p.program_type = 'Doctor' THEN p END) AS doctor_count,
      collect(DISTINCT cat.name) AS categories,
-     avg(es.value) AS avg_ielts
+     avg(p.min_ielts) AS avg_ielts
 RETURN u.name AS university,
        total_programs,
        bachelor_count,
@@ -943,9 +951,7 @@ MATCH (cat:StudyCategory)<-[:IN_STUDY_CATEGORY]-(p:Program)
 WITH cat, count(p) AS program_count
 ORDER BY program_count DESC
 LIMIT 15
-MATCH (cat)<-[:IN_STUDY_CATEGORY]-(p:Program)
-      <-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (cat)<-[:IN_STUDY_CATEGORY]-(p:Program)-[:AT_UNIVERSITY]->(u:University)
 RETURN cat.name AS category,
        program_count,
        count(DISTINCT u) AS universities_offering,
@@ -957,11 +963,11 @@ ORDER BY program_count DESC;
 -- name: ielts_stats_by_category
 // 11.3. THỐNG KÊ YÊU CẦU IELTS THEO NGÀNH
 MATCH (cat:StudyCategory)<-[:IN_STUDY_CATEGORY]-(p:Program)
-MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
+WHERE p.min_ielts IS NOT NULL
 WITH cat,
-     avg(es.value) AS avg_ielts,
-     min(es.value) AS min_ielts,
-     max(es.value) AS max_ielts,
+     avg(p.min_ielts) AS avg_ielts,
+     min(p.min_ielts) AS min_ielts,
+     max(p.min_ielts) AS max_ielts,
      count(p) AS program_count
 WHERE program_count >= 5
 RETURN cat.name AS category,
@@ -1056,11 +1062,8 @@ LIMIT 5;
 
 -- name: fallback_search_programs_by_keyword
 // 12.2. FALLBACK QUERY (Khi không tìm thấy kết quả chính xác)
-MATCH (p:Program)
-WHERE toLower(p.name) CONTAINS toLower($keyword)
-   OR toLower(p.description) CONTAINS toLower($keyword)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+CALL db.index.fulltext.queryNodes('program_fulltext', $keyword) YIELD node AS p, score
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
 RETURN u.name AS university,
@@ -1069,29 +1072,25 @@ RETURN u.name AS university,
        cat.name AS category,
        subj.name AS subject,
        p.url AS url
+ORDER BY score DESC
 LIMIT 10;
 
 -- name: intent_classification_query
 // 12.3. INTENT CLASSIFICATION QUERY
 // Use case: "Phát hiện ý định người dùng để route đúng query"
-MATCH (v:Visa)
-WHERE toLower(v.name_visa) CONTAINS toLower($user_query)
-   OR toString(v.subclass) CONTAINS $user_query
+CALL db.index.fulltext.queryNodes('visa_fulltext', $user_query) YIELD node AS v
 RETURN 'visa' AS intent, 
        collect(v.name_visa)[0] AS detected_entity
 UNION
-MATCH (u:University)
-WHERE toLower(u.name) CONTAINS toLower($user_query)
+CALL db.index.fulltext.queryNodes('university_fulltext', $user_query) YIELD node AS u
 RETURN 'university' AS intent,
        u.name AS detected_entity
 UNION
-MATCH (cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($user_query)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $user_query) YIELD node AS cat
 RETURN 'study_category' AS intent,
        cat.name AS detected_entity
 UNION
-MATCH (sc:SettlementCategory)
-WHERE toLower(sc.name) CONTAINS toLower($user_query)
+CALL db.index.fulltext.queryNodes('settlement_category_fulltext', $user_query) YIELD node AS sc
 RETURN 'settlement' AS intent,
        sc.name AS detected_entity
 LIMIT 1;
@@ -1099,9 +1098,7 @@ LIMIT 1;
 -- name: context_aware_more_programs
 // 12.4. CONTEXT-AWARE QUERY (Dựa trên lịch sử hội thoại)
 MATCH (u:University {name: $previous_university})
-      -[:HAS_PROGRAMS]->(pg:ProgramGroup)
-      -[:HAS_LEVEL]->(pl:ProgramLevel {name: $previous_level})
-      -[:OFFERS]->(p:Program)
+      <-[:AT_UNIVERSITY]-(p:Program {program_type: $previous_level})
 WHERE NOT p.name = $previous_program
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
@@ -1120,8 +1117,7 @@ MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 WHERE cat.name IN $user_interests
 MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 WHERE es.value <= $user_max_score
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        p.name AS program,
        p.program_type AS level,
@@ -1148,9 +1144,7 @@ RETURN v;
 // Use case: "Lấy thông tin nhiều trường cùng lúc"
 UNWIND $university_names AS uni_name
 MATCH (u:University {name: uni_name})
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->(pg:ProgramGroup)
-              -[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 WITH u, count(p) AS program_count
 RETURN u.name AS university,
        program_count
@@ -1160,22 +1154,21 @@ ORDER BY program_count DESC;
 // 13.3. EXISTENCE CHECK (Kiểm tra tồn tại nhanh)
 // Use case: "Trường có chương trình này không?"
 MATCH (u:University {name: $university_name})
-RETURN exists((u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()
-              -[:OFFERS]->(:Program {name: $program_name})) 
+RETURN exists((u)<-[:AT_UNIVERSITY]-(:Program {name: $program_name}))
        AS program_exists;
 
 -- name: count_programs_by_university
 // 13.4. COUNT OPTIMIZATION
 // Use case: "Đếm nhanh số lượng"
 MATCH (u:University {name: $university_name})
-      -[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p:Program)
+      <-[:AT_UNIVERSITY]-(p:Program)
 RETURN count(p) AS total_programs;
 
 -- name: universities_program_count_top20
 // 13.5. EFFICIENT AGGREGATION
 // Use case: "Thống kê nhanh theo trường"
 MATCH (u:University)
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 WITH u, count(p) AS program_count
 WHERE program_count > 0
 RETURN u.name AS university,
@@ -1206,7 +1199,7 @@ ORDER BY count(p) DESC;
 // 13.8. LIMIT EARLY (Giảm tải xử lý)
 MATCH (u:University)
 WITH u LIMIT 10
-MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p:Program)
+MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 RETURN u.name, count(p);
 
 -- name: avoid_cartesian_example
@@ -1335,18 +1328,17 @@ LIMIT 20;
 -- name: export_programs_by_university
 // 15.1. EXPORT DANH SÁCH ĐẦY ĐỦ
 MATCH (u:University {name: $university_name})
-      -[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->(pl:ProgramLevel)
-      -[:OFFERS]->(p:Program)
+      <-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 RETURN u.name AS University,
-       pl.name AS Level,
+       p.program_type AS Level,
        p.name AS Program,
        cat.name AS Category,
        p.starting_months AS StartingMonths,
        collect(DISTINCT e.name + ': ' + toString(es.value)) AS Requirements,
        p.url AS URL
-ORDER BY pl.name, p.name;
+ORDER BY p.program_type, p.name;
 
 -- name: system_summary_report
 // 15.2. SUMMARY REPORT
@@ -1396,8 +1388,7 @@ ORDER BY cat.name, tg.name, sp.title;
 -- name: export_university_profiles
 // 15.5. EXPORT UNIVERSITY PROFILES
 MATCH (u:University)
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 OPTIONAL MATCH (u)-[:HAS_INFO]->()-[:HAS_SECTION]->(sec:InfoSection)
 WITH u,
@@ -1424,12 +1415,11 @@ RETURN v.name_visa AS StudentVisa,
 -- name: export_statistics_by_category
 // 15.7. EXPORT STATISTICS BY CATEGORY
 MATCH (cat:StudyCategory)<-[:IN_STUDY_CATEGORY]-(p:Program)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 WITH cat.name AS Category,
      count(DISTINCT p) AS ProgramCount,
      count(DISTINCT u) AS UniversityCount,
-     collect(DISTINCT pl.name) AS Levels
+     collect(DISTINCT p.program_type) AS Levels
 RETURN Category,
        ProgramCount,
        UniversityCount,
@@ -1439,8 +1429,7 @@ ORDER BY ProgramCount DESC;
 -- name: export_requirements_matrix
 // 15.8. EXPORT REQUIREMENTS MATRIX
 MATCH (e:Exam)<-[:HAS_SCORE]-(es:ExamScore)<-[:HAS_REQUIRED]-(p:Program)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 WITH u.name AS University,
      p.name AS Program,
      e.name AS Exam,
@@ -1459,12 +1448,11 @@ LIMIT 100;
 -- name: export_timeline_data
 // 15.9. EXPORT TIMELINE DATA
 MATCH (m:Month)<-[:STARTS_IN]-(p:Program)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN m.name AS Month,
        count(DISTINCT p) AS ProgramsAvailable,
        collect(DISTINCT u.name)[..5] AS SampleUniversities,
-       collect(DISTINCT pl.name) AS AvailableLevels
+       collect(DISTINCT p.program_type) AS AvailableLevels
 ORDER BY 
     CASE m.name
         WHEN 'Jan' THEN 1 WHEN 'Feb' THEN 2 WHEN 'Mar' THEN 3
@@ -1492,14 +1480,13 @@ CALL apoc.export.csv.query(
 -- name: apoc_export_university_json
 // 15.12. EXPORT JSON FORMAT
 MATCH (u:University {name: $university_name})
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->(pl:ProgramLevel)
-              -[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 RETURN {
     university: u.name,
     programs: collect(DISTINCT {
         name: p.name,
-        level: pl.name,
+        level: p.program_type,
         url: p.url,
         requirements: collect({
             exam: e.name,
@@ -1515,8 +1502,7 @@ RETURN {
 -- name: timeline_preparation_plan
 // 16.1. KẾ HOẠCH THEO TIMELINE
 MATCH (p:Program)-[:STARTS_IN]->(m:Month {name: $target_month})
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 MATCH (v:Visa {subclass: "500"})-[:HAS_STEP]->(s:VisaStep)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 RETURN {
@@ -1552,8 +1538,7 @@ LIMIT 1;
 // 16.2. LỌC THEO HẠN DEADLINE
 MATCH (p:Program)-[:STARTS_IN]->(m:Month)
 WHERE m.name IN $upcoming_months
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        p.name AS program,
        p.program_type AS level,
@@ -1565,18 +1550,23 @@ LIMIT 15;
 
 -- name: programs_open_in_upcoming_months_with_field
 // 16.2b. Chương trình còn nhận trong N tháng tới + lọc ngành (IT, Business,...)
-MATCH (p:Program)-[:STARTS_IN]->(m:Month)
+// @param interest: search
+CALL {
+  CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $interest + ')') YIELD node
+  RETURN node AS hit
+  UNION
+  CALL db.index.fulltext.queryNodes('study_category_fulltext', $interest) YIELD node
+  MATCH (hit:Program)-[:IN_STUDY_CATEGORY]->(node)
+  RETURN hit
+  UNION
+  CALL db.index.fulltext.queryNodes('subject_fulltext', $interest) YIELD node
+  MATCH (hit:Program)-[:FOCUSES_ON]->(node)
+  RETURN hit
+}
+WITH hit AS p
+MATCH (p)-[:STARTS_IN]->(m:Month)
 WHERE m.name IN $upcoming_months
-OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
-WITH p, m, cat, subj,
-     toLower($interest) AS kw
-WHERE kw IS NULL OR kw = "" 
-   OR toLower(p.name) CONTAINS kw
-   OR toLower(cat.name) CONTAINS kw
-   OR toLower(subj.name) CONTAINS kw
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        p.name AS program,
        p.program_type AS level,
@@ -1588,8 +1578,9 @@ LIMIT 20;
 
 -- name: long_term_bachelor_master_pr_pathway
 // 16.3. LỘ TRÌNH DÀI HẠN (3-5 NĂM)
-MATCH (bachelor:Program {program_type: "Bachelor"})
-WHERE toLower(bachelor.name) CONTAINS toLower($field)
+// @param field: search
+CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $field + ')') YIELD node AS bachelor
+WHERE bachelor.program_type = "Bachelor"
 MATCH (bachelor)-[:FOCUSES_ON]->(subj:Subject)
 MATCH (master:Program {program_type: "Master"})-[:FOCUSES_ON]->(subj)
 MATCH (bachelor)<-[:OFFERS]-(pl1:ProgramLevel)
@@ -1636,8 +1627,7 @@ MATCH (u:University {name: $university_name})
       -[:HAS_SECTION]->(cost:InfoSection)
 WHERE cost.key CONTAINS 'Cost'
 WITH u, collect({type: cost.key, amount: cost.content}) AS all_costs
-MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->(pl:ProgramLevel {name: $level})
-      -[:OFFERS]->(p:Program)
+MATCH (u)<-[:AT_UNIVERSITY]-(p:Program {program_type: $level})
 WITH u, all_costs, avg(CASE 
     WHEN p.description CONTAINS '$' 
     THEN toFloat(substring(p.description, apoc.text.indexOf(p.description, '$') + 1, 5))
@@ -1654,11 +1644,9 @@ RETURN {
 
 -- name: compare_costs_across_universities
 // 17.2. SO SÁNH CHI PHÍ GIỮA CÁC TRƯỜNG
-MATCH (p:Program {program_type: $level})
-MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($field)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $field) YIELD node AS cat
+MATCH (p:Program {program_type: $level})-[:IN_STUDY_CATEGORY]->(cat)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (u)-[:HAS_INFO]->()-[:HAS_SECTION]->(cost:InfoSection)
 WHERE cost.key = 'Cost Accommodation'
 WITH u, p, cost.content AS accommodation_cost
@@ -1673,12 +1661,8 @@ LIMIT 10;
 
 -- name: programs_with_scholarships
 // 17.3. TÌM HỌC BỔNG (nếu có trong description)
-MATCH (p:Program)
-WHERE toLower(p.description) CONTAINS 'scholarship'
-   OR toLower(p.description) CONTAINS 'funding'
-   OR toLower(p.description) CONTAINS 'financial aid'
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)
-      <-[:HAS_PROGRAMS]-(u:University)
+CALL db.index.fulltext.queryNodes('program_fulltext', 'description:(scholarship* OR funding* OR "financial aid")') YIELD node AS p
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 RETURN u.name AS university,
        p.name AS program,
        p.program_type AS level,
@@ -1694,7 +1678,7 @@ LIMIT 15;
 // 18.1. TÌM TRƯỜNG THEO KHU VỰC (dựa vào tên)
 MATCH (u:University)
 WHERE toLower(u.name) CONTAINS toLower($city)
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (u)-[:HAS_RELEVANT_SETTLEMENT_INFO]->(sp:SettlementPage)
 WHERE toLower(sp.title) CONTAINS toLower($city)
    OR toLower(sp.url) CONTAINS toLower($city)
@@ -1722,7 +1706,7 @@ WITH u,
          WHEN u.name CONTAINS 'Darwin' OR u.name CONTAINS 'Northern Territory' THEN 'Northern Territory'
          ELSE 'Other'
      END AS state
-MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p:Program)
+MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 RETURN state,
        collect(DISTINCT u.name) AS universities,
        count(DISTINCT u) AS university_count,
@@ -1731,9 +1715,7 @@ ORDER BY university_count DESC;
 
 -- name: settlement_info_by_state
 // 18.3. ĐỊNH CƯ THEO VÙNG
-MATCH (sp:SettlementPage)
-WHERE toLower(sp.title) CONTAINS toLower($state)
-   OR toLower(sp.url) CONTAINS toLower($state)
+CALL db.index.fulltext.queryNodes('settlement_page_fulltext', $state) YIELD node AS sp
 OPTIONAL MATCH (sp)<-[:CONTAINS_SETTLEMENT_PAGE]-(tg:SettlementTaskGroup)
               <-[:HAS_GROUP]-(cat:SettlementCategory)
 OPTIONAL MATCH (sp)-[:HAS_SETTLEMENT_SECTION]->(sec)
@@ -1750,8 +1732,7 @@ LIMIT 10;
 
 -- name: career_resources_by_field
 // 19.1. TÌM NGÀNH NGHỀ TIỀM NĂNG
-MATCH (cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($field)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $field) YIELD node AS cat
 MATCH (cat)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
 WHERE toLower(sc.name) CONTAINS 'employ'
    OR toLower(sc.name) CONTAINS 'work'
@@ -1774,10 +1755,7 @@ RETURN {
 
 -- name: skills_demand_overview
 // 19.2. SKILLS GAP ANALYSIS
-MATCH (sc:SettlementCategory)
-WHERE toLower(sc.name) CONTAINS 'skill'
-   OR toLower(sc.name) CONTAINS 'demand'
-   OR toLower(sc.name) CONTAINS 'shortage'
+CALL db.index.fulltext.queryNodes('settlement_category_fulltext', 'skill* OR demand* OR shortage*') YIELD node AS sc
 MATCH (sc)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
       -[:CONTAINS_SETTLEMENT_PAGE]->(sp:SettlementPage)
 OPTIONAL MATCH (cat:StudyCategory)
@@ -1791,22 +1769,21 @@ LIMIT 5;
 
 -- name: post_graduation_career_pathway
 // 19.3. LỘ TRÌNH NGHỀ NGHIỆP SAU TỐT NGHIỆP
-MATCH (p:Program {program_type: $level})
-WHERE toLower(p.name) CONTAINS toLower($field)
+// @param field: search
+CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(' + $field + ')') YIELD node AS p
+WHERE p.program_type = $level
 MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-MATCH (cat)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
-MATCH (sc)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
-MATCH (visa_grad:Visa {subclass: "485"})
-MATCH (visa_pr:Visa)
-WHERE visa_pr.subclass IN ["189", "190", "186"]
-OPTIONAL MATCH (visa_pr)-[:HAS_RELEVANT_SETTLEMENT_CATEGORY]->(sc2:SettlementCategory)
+MATCH (pw:Pathway {category: cat.name})
 RETURN {
     your_degree: { program: p.name, category: cat.name },
-    immediate_steps: { visa: visa_grad.name_visa, purpose: "2-4 years work rights after graduation" },
-    career_resources: collect(DISTINCT { category: sc.name, task_group: tg.name })[..3],
+    immediate_steps: { visa: pw.graduate_visa_name, purpose: "2-4 years work rights after graduation" },
+    career_resources: [i IN range(0, size(pw.career_categories) - 1) | {
+        category: pw.career_categories[i],
+        task_group: pw.career_task_groups[i]
+    }],
     long_term: {
-        pr_visa_options: collect(DISTINCT visa_pr.name_visa),
-        settlement_support: collect(DISTINCT sc2.name)[..3]
+        pr_visa_options: pw.pr_visa_names,
+        settlement_support: pw.pr_settlement_categories[..3]
     }
 } AS career_pathway
 LIMIT 1;
@@ -1819,9 +1796,8 @@ LIMIT 1;
 // 20.1. MA TRẬN SO SÁNH TRƯỜNG
 MATCH (u:University)
 WHERE u.name IN $university_list
-OPTIONAL MATCH (u)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->(pl:ProgramLevel)-[:OFFERS]->(p:Program)
+OPTIONAL MATCH (u)<-[:AT_UNIVERSITY]-(p:Program)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
-OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
 OPTIONAL MATCH (u)-[:HAS_INFO]->()-[:HAS_SECTION]->(sec:InfoSection)
 WITH u,
      count(DISTINCT p) AS total_programs,
@@ -1829,8 +1805,8 @@ WITH u,
      count(DISTINCT CASE WHEN p.program_type = 'Master' THEN p END) AS master,
      count(DISTINCT CASE WHEN p.program_type = 'Doctor' THEN p END) AS doctor,
      collect(DISTINCT cat.name)[..5] AS top_categories,
-     avg(es.value) AS avg_ielts,
-     min(es.value) AS min_ielts,
+     avg(p.min_ielts) AS avg_ielts,
+     min(p.min_ielts) AS min_ielts,
      collect(DISTINCT sec.key)[..3] AS info_available
 RETURN u.name AS University,
        total_programs AS `Total Programs`,
@@ -1870,10 +1846,9 @@ ORDER BY v.subclass;
 
 -- name: benchmark_field_across_universities
 // 20.3. BENCHMARK NGÀNH HỌC
-MATCH (cat:StudyCategory)
-WHERE toLower(cat.name) CONTAINS toLower($field)
+CALL db.index.fulltext.queryNodes('study_category_fulltext', $field) YIELD node AS cat
 MATCH (p:Program)-[:IN_STUDY_CATEGORY]->(cat)
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)<-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
 WITH u, cat, count(DISTINCT p) AS programs, collect(DISTINCT p.program_type) AS levels, avg(es.value) AS avg_requirement
 RETURN u.name AS university,
@@ -1904,7 +1879,7 @@ MATCH (p:Program)
 WHERE ANY(keyword IN $keywords 
     WHERE toLower(p.name) CONTAINS toLower(keyword)
        OR toLower(p.description) CONTAINS toLower(keyword))
-MATCH (p)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)<-[:HAS_PROGRAMS]-(u:University)
+MATCH (p)-[:AT_UNIVERSITY]->(u:University)
 OPTIONAL MATCH (p)-[:FOCUSES_ON]->(subj:Subject)
 OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 WITH u, p, subj, cat,
@@ -1927,7 +1902,7 @@ MATCH (reference)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 MATCH (similar:Program)-[:FOCUSES_ON]->(subj)
 WHERE similar <> reference
 OPTIONAL MATCH (similar)-[:IN_STUDY_CATEGORY]->(cat)
-MATCH (similar)<-[:OFFERS]-(pl:ProgramLevel)<-[:HAS_LEVEL]-(pg:ProgramGroup)<-[:HAS_PROGRAMS]-(u:University)
+MATCH (similar)-[:AT_UNIVERSITY]->(u:University)
 WITH u, similar, CASE WHEN exists((similar)-[:IN_STUDY_CATEGORY]->(cat)) THEN 2 ELSE 1 END AS similarity_score
 RETURN u.name AS university,
        similar.name AS similar_program,
@@ -1958,10 +1933,10 @@ RETURN cat.name AS category,
 
 -- name: university_community_detection_by_categories
 // 22.2. COMMUNITY DETECTION
-MATCH (u1:University)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p1:Program)
+MATCH (u1:University)<-[:AT_UNIVERSITY]-(p1:Program)
 MATCH (p1)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
 MATCH (p2:Program)-[:IN_STUDY_CATEGORY]->(cat)
-MATCH (u2:University)-[:HAS_PROGRAMS]->()-[:HAS_LEVEL]->()-[:OFFERS]->(p2)
+MATCH (u2:University)<-[:AT_UNIVERSITY]-(p2:Program)
 WHERE u1 <> u2
 WITH u1, u2, count(DISTINCT cat) AS shared_categories
 WHERE shared_categories >= 3
@@ -1973,17 +1948,16 @@ LIMIT 20;
 
 -- name: path_analysis_bachelor_it_to_pr
 // 22.3. PATH ANALYSIS
-MATCH path = shortestPath(
-    (start:Program {program_type: "Bachelor"})-[:FOCUSES_ON]->(:Subject)
-    -[*..8]-
-    (end:Visa)
-)
-WHERE toLower(start.name) CONTAINS 'computer'
-  AND end.subclass IN ["189", "190"]
-RETURN path,
-       length(path) AS path_length,
-       [n IN nodes(path) | labels(n)[0]] AS node_types,
-       [r IN relationships(path) | type(r)] AS relationship_types
+CALL db.index.fulltext.queryNodes('program_fulltext', 'name:(computer*)') YIELD node AS start
+WHERE start.program_type = "Bachelor"
+MATCH (start)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)
+MATCH (pw:Pathway {category: cat.name})
+WITH start, cat, [s IN pw.visa_route WHERE NOT s IN pw.pr_visa_subclasses OR s IN ["189", "190"]] AS route
+RETURN start.name AS program,
+       cat.name AS category,
+       route AS visa_route,
+       size(route) + 1 AS path_length,
+       ["Program", "StudyCategory"] + [s IN route | "Visa " + s] AS node_types
 LIMIT 3;
 
 // ============================================================
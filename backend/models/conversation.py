@@ -0,0 +1,48 @@
+"""Conversation models for API operations."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ConversationCreate(BaseModel):
+    """Conversation model for starting a new chat."""
+    title: Optional[str] = Field(None, max_length=255)
+
+
+class ConversationResponse(BaseModel):
+    """Conversation model for API responses."""
+    id: int
+    user_id: int
+    title: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ConversationPage(BaseModel):
+    """One page of conversations; pass next_cursor back to get the next page."""
+    items: List[ConversationResponse]
+    next_cursor: Optional[str] = None
+
+
+class MessageResponse(BaseModel):
+    """Message model for API responses."""
+    id: int
+    conversation_id: int
+    role: str
+    content: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MessagePage(BaseModel):
+    """One page of messages (oldest first); next_cursor points to older messages."""
+    items: List[MessageResponse]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,7 @@
 """
 Database models for user authentication and chat history
 """
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -50,20 +50,37 @@ class Conversation(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination of a user's conversations (most recent first)
+    __table_args__ = (
+        Index("ix_conversations_user_updated_id", "user_id", "updated_at", "id"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    # Messages are removed by the database (ON DELETE CASCADE), not loaded one by one
+    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Message(Base):
-    """Message model to store individual chat messages"""
+    """
+    Message model to store individual chat messages
+
+    Range-partitioned by month on created_at (see services/message_partitions.py),
+    so created_at is part of the primary key.
+    """
     __tablename__ = 'messages'
     
-    id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey('conversations.id'), nullable=False)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    conversation_id = Column(Integer, ForeignKey('conversations.id', ondelete="CASCADE"), nullable=False)
     role = Column(String(20), nullable=False)  # 'user' or 'assistant'
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, nullable=False)
+    
+    # Keyset pagination within a conversation
+    __table_args__ = (
+        Index("ix_messages_conversation_created_id", "conversation_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
@@ -79,8 +96,10 @@ def get_db():
 
 
 def init_db():
-    """Initialize database - create all tables"""
+    """Initialize database - create all tables and the current message partitions"""
     Base.metadata.create_all(bind=engine)
+    from services.message_partitions import ensure_partitions
+    ensure_partitions()
     print(f"Database initialized at {DATABASE_URL}")
 
 
@@ -0,0 +1,102 @@
+"""
+Benchmark Cypher templates by PROFILE db hits
+
+Runs every runnable template (or the ones named) once with representative
+params and reports the total db hits. Used to check template rewrites - e.g.
+the AT_UNIVERSITY shortcut and denormalized Program properties written by
+import_study.py - against the previous version of the templates.
+
+Usage (from backend/):
+    python scripts/benchmark_templates.py --out before.json      # save a baseline
+    python scripts/benchmark_templates.py --baseline before.json # compare with it
+    git show HEAD~1:backend/cypher_queries_v2.cypher > /tmp/old.cypher
+    python scripts/benchmark_templates.py --against /tmp/old.cypher
+                                                      # old vs current text, same graph
+    python scripts/benchmark_templates.py find_programs_by_ielts complete_program_info
+
+PROFILE executes the templates, so a non-local NEO4J_URI needs --allow-remote.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import NEO4J_DATABASE, NEO4J_URI
+from services.data_version import fetch_data_version
+from services.index_advisor import format_comparison, is_local_uri, profile_templates
+from services.neo4j_exec import connect_neo4j
+from services.query_loader import QueryRegistry, query_registry
+
+
+def print_comparison(names, before, after, before_label):
+    print()
+    print("\n".join(format_comparison(names, before, after, before_label)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="templates to run (default: all runnable templates)")
+    parser.add_argument("--out", help="write the db hits to this JSON file")
+    parser.add_argument("--baseline", help="compare with db hits saved by --out")
+    parser.add_argument("--against", help="compare with the templates of another .cypher file")
+    parser.add_argument("--allow-remote", action="store_true", help="allow PROFILE against a non-local NEO4J_URI")
+    args = parser.parse_args()
+
+    if not is_local_uri(NEO4J_URI) and not args.allow_remote:
+        print(f"✗ Refusing to PROFILE against {NEO4J_URI} (not local); pass --allow-remote")
+        sys.exit(1)
+
+    names = args.names or [n for n in query_registry if query_registry.entry(n).runnable]
+    old_registry = None
+    if args.against:
+        old_registry = QueryRegistry([args.against], cache_path=None)
+        if not args.names:
+            # Only the templates whose text changed
+            names = [
+                n for n in names
+                if old_registry.entry(n) is not None and old_registry.entry(n).version != query_registry.entry(n).version
+            ]
+
+    driver = connect_neo4j()
+    if not driver:
+        print("✗ Neo4j not configured (NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD)")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("AusVisa Template Benchmark")
+    print("=" * 60)
+    print(f"Profiling {len(names)} template(s) on {NEO4J_URI}...")
+    started = time.perf_counter()
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            hits = profile_templates(session, names)
+            old_hits = profile_templates(session, names, old_registry) if old_registry else None
+    finally:
+        driver.close()
+    print(f"✓ Done in {time.perf_counter() - started:.1f}s")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"data_version": fetch_data_version(), "at": time.time(), "db_hits": hits}, f, indent=2)
+        print(f"✓ Wrote {len(hits)} result(s) to {args.out}")
+
+    if old_registry is not None:
+        print_comparison(names, old_hits, hits, "db hits old")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nBaseline: {args.baseline} (data version {baseline.get('data_version')})")
+        print_comparison(names, baseline.get("db_hits", {}), hits, "db hits before")
+    if not args.out and old_registry is None and not args.baseline:
+        print(f"\n{'template':<55} {'db hits':>12}")
+        for name in names:
+            h = hits.get(name)
+            print(f"{name:<55} {h if h is not None else '-':>12}")
+
+
+if __name__ == "__main__":
+    main()
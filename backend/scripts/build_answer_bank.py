@@ -0,0 +1,90 @@
+"""
+Build the FAQ answer bank (precomputed answers served with zero LLM calls)
+
+Takes the top-N most asked questions from the query log, runs each one through
+the chatbot pipeline with bounded concurrency and writes the answers to
+ANSWER_BANK_PATH with a new version number. The server loads the bank at startup.
+
+Answers are only regenerated when the graph data version changed since the
+last build (or with --force); otherwise only new top questions are added.
+Suitable for a nightly cron job, after the import scripts.
+
+Usage (from backend/):
+    python scripts/build_answer_bank.py [--top 50] [--concurrency 3] [--min-count 3] [--force]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import ANSWER_BANK_PATH, ANSWER_BANK_TOP_N, ANSWER_BANK_CONCURRENCY
+from services.answer_bank import read_answer_bank, write_answer_bank
+from services.chatbot_service import chatbot_event_stream, load_system_prompt
+from services.data_version import fetch_data_version
+from services.prefetch import top_logged_questions
+
+
+async def answer(question: str, system_prompt: str, semaphore: asyncio.Semaphore):
+    """Run one question through the pipeline; None for degraded or failed answers"""
+    async with semaphore:
+        intent, rows, text, done = None, [], [], {}
+        async for event in chatbot_event_stream(question, system_prompt, record=False):
+            if event["event"] == "intent":
+                intent = event["data"]
+            elif event["event"] == "data":
+                rows = event["data"]["rows"]
+            elif event["event"] == "text":
+                text.append(event["data"]["text"])
+            elif event["event"] == "done":
+                done = event["data"]
+    if done.get("error") or done.get("degraded") or not "".join(text).strip():
+        print(f"  ✗ {question} ({done.get('error') or done.get('degraded') or 'empty'})")
+        return None
+    print(f"  ✓ {question}")
+    return {"question": question, "intent": intent, "rows": rows, "text": "".join(text)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=ANSWER_BANK_TOP_N)
+    parser.add_argument("--concurrency", type=int, default=ANSWER_BANK_CONCURRENCY)
+    parser.add_argument("--min-count", type=int, default=3, help="ignore questions asked fewer times")
+    parser.add_argument("--force", action="store_true", help="regenerate every answer")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AusVisa FAQ Answer Bank")
+    print("=" * 60)
+
+    data_version = fetch_data_version()
+    previous = read_answer_bank() or {}
+    unchanged = data_version is not None and previous.get("data_version") == data_version
+    keep = previous.get("answers", {}) if unchanged and not args.force else {}
+    print(f"Graph data version: {data_version} ({'unchanged' if unchanged else 'changed'})")
+
+    questions = top_logged_questions(args.top, args.min_count)
+    todo = [(key, question) for key, question, _ in questions if key not in keep]
+    print(f"Top questions: {len(questions)}, reused: {len(questions) - len(todo)}, to generate: {len(todo)}")
+    if not todo and unchanged:
+        print("✓ Answer bank is up to date")
+        return
+
+    system_prompt = load_system_prompt()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = await asyncio.gather(*(answer(question, system_prompt, semaphore) for _, question in todo))
+
+    wanted = {key for key, _, _ in questions}
+    answers = {key: value for key, value in keep.items() if key in wanted}
+    answers.update({key: result for (key, _), result in zip(todo, results) if result})
+
+    version = (previous.get("version") or 0) + 1
+    write_answer_bank(answers, data_version, version)
+    print(f"\n✓ Answer bank v{version}: {len(answers)} answers → {ANSWER_BANK_PATH}")
+    print("  A running server serves the new answers after its next data version poll.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
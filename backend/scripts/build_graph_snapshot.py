@@ -0,0 +1,142 @@
+"""
+Export the read-only graph snapshot (hot templates served without Neo4j)
+
+Writes the CSR adjacency and property columns of the study and visa subgraphs
+to GRAPH_SNAPSHOT_DIR. The server re-exports it by itself after an import;
+this script is for a cron job after the import scripts or for checking the
+snapshot by hand.
+
+--verify runs every template the snapshot serves against Neo4j for a few
+sample params taken from the snapshot and reports rows that differ.
+
+Needs numpy.
+
+Usage (from backend/):
+    python scripts/build_graph_snapshot.py [--dir .cache/graph_snapshot] [--verify]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import GRAPH_SNAPSHOT_DIR, NEO4J_DATABASE
+from services.data_version import fetch_data_version
+from services.graph_snapshot import SNAPSHOT_TEMPLATES, build_graph_snapshot, get_snapshot, snapshot_available
+from services.neo4j_exec import connect_neo4j
+from services.query_loader import query_registry
+
+SAMPLES = 3
+# LIMIT without a total order: Neo4j and the snapshot may pick different rows
+UNORDERED_LIMIT = {"context_aware_more_programs"}
+# Slices of collected lists (`requirements[..3]`): only the length is comparable
+SAMPLED_COLUMNS = {"sample_requirements"}
+
+
+def sample_params(snapshot):
+    """A few params per template, taken from the snapshot itself"""
+    subclasses = list(dict.fromkeys(
+        snapshot.get("Visa", v, "subclass") for v in range(snapshot.count("Visa"))
+    ))[:SAMPLES]
+    programs = []
+    for u in range(snapshot.count("University")):
+        for p in snapshot.into("AT_UNIVERSITY", u)[:1]:
+            programs.append((
+                snapshot.get("University", u, "name"),
+                snapshot.get("Program", p, "program_type"),
+                snapshot.get("Program", p, "name"),
+            ))
+        if len(programs) >= SAMPLES:
+            break
+    by_subclass = [{"subclass": s} for s in subclasses if s is not None]
+    return {
+        "visa_about": by_subclass,
+        "visa_eligibility": by_subclass,
+        "visa_steps": by_subclass,
+        "visa_eligibility_groups_analysis": by_subclass,
+        "count_programs_by_university": [{"university_name": u} for u, _, _ in programs],
+        "program_existence_for_university": [{"university_name": u, "program_name": p} for u, _, p in programs],
+        "export_programs_by_university": [{"university_name": u} for u, _, _ in programs],
+        "context_aware_more_programs": [
+            {"previous_university": u, "previous_level": level, "previous_program": p} for u, level, p in programs
+        ],
+    }
+
+
+def canonical(rows, ordered):
+    def value(key, v):
+        if isinstance(v, list):
+            if key in SAMPLED_COLUMNS:
+                return len(v)
+            return sorted(json.dumps(x, sort_keys=True, default=str) for x in v)
+        return v
+
+    out = [json.dumps({k: value(k, v) for k, v in row.items()}, sort_keys=True, default=str) for row in rows]
+    return out if ordered else sorted(out)
+
+
+def verify(snapshot):
+    driver = connect_neo4j()
+    if not driver:
+        print("✗ Neo4j not configured")
+        return False
+    ok = True
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            for name, param_list in sample_params(snapshot).items():
+                template = query_registry.entry(name)
+                if template is None:
+                    print(f"  - {name}: not in the registry")
+                    continue
+                for params in param_list:
+                    params = query_registry.validate(name, params)
+                    expected = [r.data() for r in session.run(template.statements[0], **params)]
+                    started = time.perf_counter()
+                    actual = SNAPSHOT_TEMPLATES[name](snapshot, params)
+                    took_us = (time.perf_counter() - started) * 1e6
+                    if name in UNORDERED_LIMIT:
+                        same = len(expected) == len(actual)
+                    else:
+                        # Row order only matters where the template sorts (ties aside)
+                        same = canonical(expected, False) == canonical(actual, False)
+                    ok &= same
+                    print(f"  {'✓' if same else '✗'} {name} {params} ({len(actual)} rows, {took_us:.0f}µs)")
+                    if not same:
+                        print(f"      neo4j:    {expected[:2]}")
+                        print(f"      snapshot: {actual[:2]}")
+    finally:
+        driver.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=GRAPH_SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--verify", action="store_true", help="compare served templates with Neo4j")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AusVisa Graph Snapshot")
+    print("=" * 60)
+    if not snapshot_available():
+        print("✗ Graph snapshot disabled (GRAPH_SNAPSHOT_ENABLED) or numpy not installed")
+        sys.exit(1)
+
+    stats = build_graph_snapshot(fetch_data_version(), args.dir)
+    if stats is None:
+        print("✗ Export failed (is Neo4j reachable?)")
+        sys.exit(1)
+    print(f"✓ {stats['nodes']} nodes, {stats['relationships']} relationships, "
+          f"{stats['values']} distinct values in {stats['build_s']}s → {args.dir}")
+
+    if args.verify:
+        print("\nVerifying served templates against Neo4j...")
+        if not verify(get_snapshot()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Build the local vector index (semantic passage retrieval)
+
+Exports the same passages as the BM25 index from Neo4j, embeds them with
+VECTOR_MODEL on the CPU and writes vectors, IVF lists and metadata to
+VECTOR_INDEX_DIR. Only passages whose text changed since the last build are
+embedded again, so a nightly run after the import scripts is cheap.
+
+Needs numpy and sentence-transformers (pip install numpy sentence-transformers).
+
+Usage (from backend/):
+    python scripts/build_vector_index.py [--dir .cache/vectors]
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import VECTOR_INDEX_DIR, VECTOR_MODEL
+from services.data_version import fetch_data_version
+from services.vector_index import build_vector_index, vectors_available
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=VECTOR_INDEX_DIR, help="index directory")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AusVisa Vector Index")
+    print("=" * 60)
+    if not vectors_available():
+        print("✗ Vector index disabled (VECTOR_ENABLED) or numpy / sentence-transformers not installed")
+        sys.exit(1)
+
+    print(f"Model: {VECTOR_MODEL}")
+    print(f"Directory: {args.dir}")
+    stats = build_vector_index(fetch_data_version(), args.dir)
+    if stats is None:
+        print("✗ Build failed (is Neo4j reachable?)")
+        sys.exit(1)
+    print(f"✓ {stats['passages']} passages ({stats['embedded']} embedded, {stats['reused']} reused), "
+          f"{stats['lists']} IVF lists, {stats['build_s']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import os
+import sys
+from datetime import datetime, timezone
 from typing import Optional
 
 from neo4j import GraphDatabase, basic_auth
@@ -37,6 +39,26 @@ def connect_driver():
     return driver, db
 
 
+# ============================================================
+#  DATA VERSION (API invalidates its caches when this changes)
+# ============================================================
+
+def bump_data_version(driver, db, subgraph: str) -> int:
+    """Tăng (:DataVersion {subgraph}) sau khi import xong - API dùng để làm mới cache."""
+    with driver.session(database=db) as session:
+        version = session.execute_write(lambda tx: tx.run(
+            """
+            MERGE (d:DataVersion {subgraph: $subgraph})
+            SET d.version = coalesce(d.version, 0) + 1,
+                d.updated_at = datetime()
+            RETURN d.version AS version
+            """,
+            subgraph=subgraph,
+        ).single()["version"])
+    print(f" DataVersion {subgraph} -> {version}")
+    return version
+
+
 # ============================================================
 # ⚙️ CẤU HÌNH CROSS-MAPPING (CÓ THỂ CHỈNH SAU)
 # ============================================================
@@ -57,6 +79,12 @@ STUDY_SETTLEMENT_KEYWORDS = [
 ]
 
 
+# Pathway dựng sẵn (du học → visa 500 → 485 → PR → định cư), 1 node / StudyCategory
+PATHWAY_SAMPLE_PROGRAMS = 5
+GRADUATE_VISA_SUBCLASS = "485"
+PR_VISA_SUBCLASSES = ["189", "190", "191", "186"]
+
+
 # ============================================================
 # 🔗 CÁC HÀM TẠO QUAN HỆ
 # ============================================================
@@ -190,6 +218,110 @@ def link_university_to_settlement_page(session):
     )
 
 
+# ============================================================
+# 🧭 PATHWAY DỰNG SẴN (thay cho shortestPath / join lúc chạy)
+# ============================================================
+
+# Program.min_ielts và (:Program)-[:AT_UNIVERSITY]-> do import_study.py tạo.
+# Thuộc tính của node chỉ chứa được list giá trị đơn → các chương trình mẫu
+# lưu thành list song song (program_names[i], program_universities[i], ...);
+# list không chứa được null nên IELTS thiếu = 0.0, URL thiếu = "".
+PATHWAY_STATEMENTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (pw:Pathway) REQUIRE pw.category IS UNIQUE",
+    # Phần theo ngành: chương trình mẫu, subject, định cư liên quan
+    """
+    MATCH (cat:StudyCategory)
+    CALL {
+      WITH cat
+      MATCH (p:Program)-[:IN_STUDY_CATEGORY]->(cat)
+      OPTIONAL MATCH (p)-[:AT_UNIVERSITY]->(u:University)
+      WITH cat, p, u
+      ORDER BY p.min_ielts IS NULL, p.min_ielts, p.name
+      WITH cat, count(DISTINCT p) AS program_count,
+           collect(CASE WHEN u IS NOT NULL THEN {program: p, university: u} END)[..$samples] AS sample
+      OPTIONAL MATCH (cat)<-[:IN_STUDY_CATEGORY]-(:Program)-[:FOCUSES_ON]->(subj:Subject)
+      WITH cat, program_count, sample, subj, count(*) AS uses
+      ORDER BY uses DESC, subj.name
+      WITH cat, program_count, sample, collect(subj.name)[..$samples] AS subjects
+      OPTIONAL MATCH (cat)-[:RELATED_TO_SETTLEMENT_CATEGORY]->(sc:SettlementCategory)
+      OPTIONAL MATCH (sc)-[:HAS_GROUP]->(tg:SettlementTaskGroup)
+      WITH cat, program_count, sample, subjects,
+           collect(DISTINCT sc.name) AS settlement,
+           collect(DISTINCT CASE WHEN tg IS NOT NULL THEN [sc.name, tg.name] END)[..3] AS career
+      MERGE (pw:Pathway {category: cat.name})
+      SET pw.program_count        = program_count,
+          pw.subjects             = subjects,
+          pw.program_names        = [x IN sample | x.program.name],
+          pw.program_levels       = [x IN sample | coalesce(x.program.program_type, "")],
+          pw.program_universities = [x IN sample | x.university.name],
+          pw.program_urls         = [x IN sample | coalesce(x.program.url, "")],
+          pw.program_min_ielts    = [x IN sample | toFloat(coalesce(x.program.min_ielts, 0.0))],
+          pw.settlement_categories = settlement,
+          pw.career_categories    = [c IN career | c[0]],
+          pw.career_task_groups   = [c IN career | c[1]],
+          pw.refreshed_at         = $run
+    } IN TRANSACTIONS OF 100 ROWS
+    """,
+    # Ngành không còn chương trình nào
+    "MATCH (pw:Pathway) WHERE pw.refreshed_at <> $run DETACH DELETE pw",
+    # Phần visa: giống nhau cho mọi ngành → tính 1 lần rồi chép vào từng Pathway
+    """
+    MATCH (student:Visa {subclass: $student})
+    OPTIONAL MATCH (student)-[:HAS_STEP]->(s:VisaStep)
+    WITH student, s ORDER BY s.step_order
+    WITH student, collect(s.title)[..3] AS steps
+    OPTIONAL MATCH (grad:Visa {subclass: $graduate})
+    WITH student, steps, grad
+    OPTIONAL MATCH (pr:Visa) WHERE pr.subclass IN $pr
+    OPTIONAL MATCH (pr)-[:HAS_RELEVANT_SETTLEMENT_CATEGORY]->(psc:SettlementCategory)
+    WITH student, steps, grad, pr, collect(DISTINCT psc.name) AS support
+    ORDER BY [i IN range(0, size($pr) - 1) WHERE $pr[i] = pr.subclass][0]
+    WITH student, steps, grad,
+         collect(pr.subclass) AS pr_subclasses,
+         collect(pr.name_visa) AS pr_names,
+         reduce(acc = [], names IN collect(support) | acc + [x IN names WHERE NOT x IN acc]) AS pr_support
+    MATCH (pw:Pathway)
+    SET pw.student_visa_subclass    = student.subclass,
+        pw.student_visa_name        = student.name_visa,
+        pw.student_visa_steps       = steps,
+        pw.graduate_visa_subclass   = grad.subclass,
+        pw.graduate_visa_name       = grad.name_visa,
+        pw.pr_visa_subclasses       = pr_subclasses,
+        pw.pr_visa_names            = pr_names,
+        pw.pr_settlement_categories = pr_support,
+        pw.visa_route       = [student.subclass] + CASE WHEN grad IS NULL THEN [] ELSE [grad.subclass] END + pr_subclasses,
+        pw.visa_route_names = [student.name_visa] + CASE WHEN grad IS NULL THEN [] ELSE [grad.name_visa] END + pr_names
+    """,
+]
+
+
+def build_pathways(driver, db):
+    """
+    (8) Pathway dựng sẵn cho từng StudyCategory:
+    ngành → chương trình mẫu → visa 500 → 485 → visa PR → SettlementCategory.
+    Các template "lộ trình" chỉ còn tra (:Pathway {category}) qua constraint,
+    không chạy shortestPath / join Program × Visa lúc trả lời.
+    Chạy lại toàn bộ sau mỗi lần import (idempotent, xoá Pathway cũ).
+    """
+    print(" Build Pathway nodes (StudyCategory -> Program -> Visa -> Settlement)…")
+    params = {
+        "run": datetime.now(timezone.utc).isoformat(),
+        "samples": PATHWAY_SAMPLE_PROGRAMS,
+        "student": STUDENT_VISA_SUBCLASSES[0],
+        "graduate": GRADUATE_VISA_SUBCLASS,
+        "pr": PR_VISA_SUBCLASSES,
+    }
+    with driver.session(database=db) as session:
+        # CALL { } IN TRANSACTIONS chỉ chạy được trong auto-commit transaction
+        for stmt in PATHWAY_STATEMENTS:
+            session.run(stmt, params).consume()
+        stats = session.run("""
+            MATCH (pw:Pathway)
+            RETURN count(pw) AS pathways, count(pw.student_visa_name) AS with_visas
+        """).single()
+    print(f"    Pathways: {stats['pathways']} ({stats['with_visas']} with visa route)")
+
+
 # ============================================================
 # 🧩 HÀM CHẠY TOÀN BỘ CROSS-REL
 # ============================================================
@@ -214,7 +346,11 @@ def run_cross_relations(driver, db):
             # 5) University ↔ SettlementPage (generic)
             link_university_to_settlement_page(session)
 
+        # 6) Pathway dựng sẵn (cần các quan hệ ở trên)
+        build_pathways(driver, db)
+
         print(" DONE CROSS-RELATIONS (Visa <-> Study <-> Settlement)")
+        bump_data_version(driver, db, "cross_rel")
 
     except Neo4jError as e:
         raise RuntimeError(f"Neo4j error: {e}") from e
@@ -227,6 +363,11 @@ def run_cross_relations(driver, db):
 if __name__ == "__main__":
     driver, db = connect_driver()
     try:
-        run_cross_relations(driver, db)
+        # Chỉ dựng lại Pathway (vd. sau khi chạy riêng import_study.py)
+        if "--pathways-only" in sys.argv:
+            build_pathways(driver, db)
+            bump_data_version(driver, db, "cross_rel")
+        else:
+            run_cross_relations(driver, db)
     finally:
         driver.close()
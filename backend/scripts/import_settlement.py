@@ -39,6 +39,26 @@ def connect_driver():
     return driver, db
 
 
+# ============================================================
+#  DATA VERSION (API invalidates its caches when this changes)
+# ============================================================
+
+def bump_data_version(driver, db, subgraph: str) -> int:
+    """Tăng (:DataVersion {subgraph}) sau khi import xong - API dùng để làm mới cache."""
+    with driver.session(database=db) as session:
+        version = session.execute_write(lambda tx: tx.run(
+            """
+            MERGE (d:DataVersion {subgraph: $subgraph})
+            SET d.version = coalesce(d.version, 0) + 1,
+                d.updated_at = datetime()
+            RETURN d.version AS version
+            """,
+            subgraph=subgraph,
+        ).single()["version"])
+    print(f" DataVersion {subgraph} -> {version}")
+    return version
+
+
 # ============================================================
 # CLEAN / PARSE HELPERS
 # ============================================================
@@ -219,5 +239,6 @@ if __name__ == "__main__":
     driver, db = connect_driver()
     try:
         import_settlement(driver, db, CSV_PATH)
+        bump_data_version(driver, db, "settlement")
     finally:
         driver.close()
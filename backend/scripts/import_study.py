@@ -1,5 +1,6 @@
 import os
 import re
+import sys
 import json
 import ast
 import unicodedata
@@ -33,6 +34,26 @@ def connect_driver():
     driver.verify_connectivity()
     return driver, db
 
+
+# ============================================================
+#  DATA VERSION (API invalidates its caches when this changes)
+# ============================================================
+
+def bump_data_version(driver, db, subgraph: str) -> int:
+    """Tăng (:DataVersion {subgraph}) sau khi import xong - API dùng để làm mới cache."""
+    with driver.session(database=db) as session:
+        version = session.execute_write(lambda tx: tx.run(
+            """
+            MERGE (d:DataVersion {subgraph: $subgraph})
+            SET d.version = coalesce(d.version, 0) + 1,
+                d.updated_at = datetime()
+            RETURN d.version AS version
+            """,
+            subgraph=subgraph,
+        ).single()["version"])
+    print(f" DataVersion {subgraph} -> {version}")
+    return version
+
 # ============================================================
 # 🔧 TEXT CLEANING UTILS
 # ============================================================
@@ -146,6 +167,72 @@ LEVEL_TITLE = {
     "doctor": "Doctor"
 }
 
+# ============================================================
+# 🔗 SHORTCUTS + DENORMALIZED PROPERTIES (hot traversals)
+# ============================================================
+
+SHORTCUT_INDEXES = """
+CREATE INDEX program_min_ielts IF NOT EXISTS FOR (p:Program) ON (p.min_ielts);
+CREATE INDEX program_min_toefl IF NOT EXISTS FOR (p:Program) ON (p.min_toefl);
+"""
+
+SHORTCUT_STATEMENTS = [
+    # (p)-[:AT_UNIVERSITY]->(u) thay cho OFFERS ← HAS_LEVEL ← HAS_PROGRAMS
+    """
+    MATCH (u:University)-[:HAS_PROGRAMS]->(:ProgramGroup)-[:HAS_LEVEL]->(:ProgramLevel)-[:OFFERS]->(p:Program)
+    CALL {
+      WITH u, p
+      MERGE (p)-[:AT_UNIVERSITY]->(u)
+    } IN TRANSACTIONS OF 1000 ROWS
+    """,
+    # Shortcut không còn đường đi tương ứng (chương trình chuyển trường / level)
+    """
+    MATCH (p:Program)-[r:AT_UNIVERSITY]->(u:University)
+    WHERE NOT exists((u)-[:HAS_PROGRAMS]->(:ProgramGroup)-[:HAS_LEVEL]->(:ProgramLevel)-[:OFFERS]->(p))
+    DELETE r
+    """,
+    # min_ielts / min_toefl (HAS_REQUIRED → ExamScore ← HAS_SCORE ← Exam), start_months (STARTS_IN → Month)
+    """
+    MATCH (p:Program)
+    CALL {
+      WITH p
+      OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)
+      WITH p,
+           collect(CASE WHEN e.name = 'IELTS' THEN es END) AS ielts,
+           collect(CASE WHEN e.name = 'TOEFL' THEN es.value END) AS toefl
+      WITH p, toefl,
+           reduce(best = null, s IN ielts | CASE WHEN best IS NULL OR s.value < best.value THEN s ELSE best END) AS best_ielts
+      OPTIONAL MATCH (p)-[:STARTS_IN]->(m:Month)
+      WITH p, toefl, best_ielts, collect(m.name) AS months
+      SET p.min_ielts      = best_ielts.value,
+          p.min_ielts_plus = best_ielts.plus,
+          p.min_toefl      = reduce(low = null, v IN toefl | CASE WHEN low IS NULL OR v < low THEN v ELSE low END),
+          p.start_months   = [x IN ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec'] WHERE x IN months]
+    } IN TRANSACTIONS OF 1000 ROWS
+    """,
+]
+
+def materialize_shortcuts(driver, db):
+    """
+    Tạo shortcut (:Program)-[:AT_UNIVERSITY]->(:University) và các thuộc tính
+    denormalized Program.min_ielts / min_ielts_plus / min_toefl / start_months
+    cho các template hay dùng (chạy lại toàn bộ sau mỗi lần import, idempotent).
+    """
+    with driver.session(database=db) as session:
+        for stmt in [q.strip() for q in SHORTCUT_INDEXES.split(";") if q.strip()]:
+            session.run(stmt).consume()
+        # CALL { } IN TRANSACTIONS chỉ chạy được trong auto-commit transaction
+        for stmt in SHORTCUT_STATEMENTS:
+            session.run(stmt).consume()
+        stats = session.run("""
+            MATCH (p:Program)
+            RETURN count(p) AS programs,
+                   sum(CASE WHEN EXISTS { (p)-[:AT_UNIVERSITY]->() } THEN 1 ELSE 0 END) AS linked,
+                   count(p.min_ielts) AS with_ielts
+        """).single()
+    print(f"    Shortcuts: {stats['linked']}/{stats['programs']} programs AT_UNIVERSITY, "
+          f"{stats['with_ielts']} with min_ielts")
+
 # ============================================================
 # 📥 MAIN IMPORT FUNCTION (BEGINNING)
 # ============================================================
@@ -559,6 +646,12 @@ def import_study_data(csv_path: str, wipe: bool = False, batch_size: int = 1000)
 
             print(" DONE STUDY KG IMPORT")
 
+        # ----- SHORTCUTS + DENORMALIZED PROPERTIES -----
+        print(" Materialize SHORTCUTS…")
+        materialize_shortcuts(driver, db)
+
+        bump_data_version(driver, db, "study")
+
     except Neo4jError as e:
         raise RuntimeError(f"Neo4j error: {e}") from e
 
@@ -570,6 +663,16 @@ def import_study_data(csv_path: str, wipe: bool = False, batch_size: int = 1000)
 # ============================================================
 
 if __name__ == "__main__":
+    # Chỉ tạo lại shortcut trên graph đã import (lần đầu nâng cấp, không cần CSV)
+    if "--shortcuts-only" in sys.argv:
+        driver, db = connect_driver()
+        try:
+            materialize_shortcuts(driver, db)
+            bump_data_version(driver, db, "study")
+        finally:
+            driver.close()
+        sys.exit(0)
+
     # Bạn có thể set CSV_PATH trong .env, nếu không thì dùng path mặc định
     CSV_PATH = os.getenv("CSV_PATH") or r"C:\Users\PAT95\OneDrive - The University of Technology\Desktop\Kysu_Ki1\CK_CNTT\Crawl_DuHoc\Chuan hoa & Import Neo4j\Uni_Info_Program_Final.csv"
     import_study_data(CSV_PATH, wipe=False, batch_size=1000)
@@ -37,6 +37,26 @@ def connect_driver():
     return driver, db
 
 
+# ============================================================
+#  DATA VERSION (API invalidates its caches when this changes)
+# ============================================================
+
+def bump_data_version(driver, db, subgraph: str) -> int:
+    """Tăng (:DataVersion {subgraph}) sau khi import xong - API dùng để làm mới cache."""
+    with driver.session(database=db) as session:
+        version = session.execute_write(lambda tx: tx.run(
+            """
+            MERGE (d:DataVersion {subgraph: $subgraph})
+            SET d.version = coalesce(d.version, 0) + 1,
+                d.updated_at = datetime()
+            RETURN d.version AS version
+            """,
+            subgraph=subgraph,
+        ).single()["version"])
+    print(f" DataVersion {subgraph} -> {version}")
+    return version
+
+
 # ============================================================
 #  UTIL: CLEAN VALUE
 # ============================================================
@@ -246,6 +266,7 @@ if __name__ == "__main__":
         import_about(driver, db, ABOUT_CSV)
         import_eligibility(driver, db, ELIG_CSV)
         import_steps(driver, db, STEP_CSV)
+        bump_data_version(driver, db, "visa")
 
         print("\nDONE! Visa KG (About + Eligibility + Step) da duoc import vao Neo4j Aura.")
     except Neo4jError as e:
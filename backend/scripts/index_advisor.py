@@ -0,0 +1,99 @@
+"""
+Index advisor: finds label/property lookups used by the Cypher templates and
+the import scripts' MERGE keys that have no index or constraint
+
+Usage (from backend/):
+    python scripts/index_advisor.py --static          # static analysis only, no database
+    python scripts/index_advisor.py                   # compare with SHOW INDEXES, print DDL
+    python scripts/index_advisor.py --out indexes.cypher
+    python scripts/index_advisor.py --apply           # create the missing indexes and
+                                                      # compare PROFILE db hits before/after
+
+--apply and PROFILE are meant for a local database (PROFILE executes the
+templates); a non-local NEO4J_URI needs --allow-remote.
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import NEO4J_DATABASE, NEO4J_URI
+from services.index_advisor import advise, apply_ddl, format_comparison, is_local_uri, profile_templates
+from services.neo4j_exec import connect_neo4j
+from services.query_loader import query_registry
+
+
+def print_report(report):
+    for status in ("missing", "unknown", "covered", "unindexable"):
+        entries = [e for e in report if e["status"] == status]
+        if not entries:
+            continue
+        print(f"\n{status.upper()} ({len(entries)})")
+        for e in entries:
+            target = f"{e['kind']:<7} :{e['label']}({', '.join(e['properties'])})"
+            extra = f" -> {e['index']}" if e.get("index") else ""
+            print(f"  {target}{extra}  [{', '.join(e['sources'][:4])}{', ...' if len(e['sources']) > 4 else ''}]")
+            if e.get("note"):
+                print(f"      {e['note']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--static", action="store_true", help="skip the database, only analyse the sources")
+    parser.add_argument("--out", help="write the missing DDL to this file")
+    parser.add_argument("--apply", action="store_true", help="create the missing indexes and constraints")
+    parser.add_argument("--no-profile", action="store_true", help="with --apply: skip the before/after PROFILE")
+    parser.add_argument("--allow-remote", action="store_true", help="allow --apply against a non-local NEO4J_URI")
+    args = parser.parse_args()
+
+    if args.static:
+        print_report(advise())
+        return
+
+    driver = connect_neo4j()
+    if not driver:
+        print("✗ Neo4j not configured (NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD)")
+        sys.exit(1)
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            report = advise(session)
+            print_report(report)
+            missing = [e for e in report if e["status"] == "missing"]
+            ddl = [e["ddl"] for e in missing]
+
+            if args.out:
+                with open(args.out, "w", encoding="utf-8") as f:
+                    f.write(";\n".join(ddl) + (";\n" if ddl else ""))
+                print(f"\n✓ Wrote {len(ddl)} statement(s) to {args.out}")
+            elif ddl:
+                print("\n-- Missing DDL")
+                for statement in ddl:
+                    print(f"{statement};")
+
+            if not args.apply or not ddl:
+                return
+            if not is_local_uri(NEO4J_URI) and not args.allow_remote:
+                print(f"\n✗ Refusing to apply to {NEO4J_URI} (not local); pass --allow-remote")
+                sys.exit(1)
+
+            # Templates that use one of the new indexes (importer sources are not templates)
+            affected = sorted({s for e in missing for s in e["sources"] if query_registry.entry(s)})
+            before = {} if args.no_profile else profile_templates(session, affected)
+
+            print(f"\nApplying {len(ddl)} statement(s)...")
+            for statement, error in apply_ddl(session, ddl):
+                print(f"  {'✗' if error else '✓'} {statement}" + (f"\n      {error}" if error else ""))
+
+            if args.no_profile or not affected:
+                return
+            after = profile_templates(session, affected)
+            print()
+            print("\n".join(format_comparison(affected, before, after, after_label="after")))
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Maintenance of the partitioned `messages` table (chat history)
+
+Usage (from backend/):
+    python scripts/manage_messages.py ensure              # create upcoming monthly partitions
+    python scripts/manage_messages.py archive [--months 12] [--dir PATH]
+    python scripts/manage_messages.py migrate             # convert a pre-partitioning table
+    python scripts/manage_messages.py list
+
+`archive` is meant for a monthly cron job: partitions older than the retention
+window are detached, written to gzip-compressed CSV files and dropped.
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import MESSAGE_RETENTION_MONTHS, MESSAGE_ARCHIVE_DIR
+from services.message_partitions import (
+    archive_partitions,
+    ensure_partitions,
+    list_partitions,
+    migrate_to_partitioned,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["ensure", "archive", "migrate", "list"])
+    parser.add_argument("--months", type=int, default=MESSAGE_RETENTION_MONTHS, help="retention window for archive")
+    parser.add_argument("--dir", default=MESSAGE_ARCHIVE_DIR, help="archive directory")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        created = ensure_partitions()
+        print(f"✓ Partitions present: {', '.join(created) or 'none'}")
+    elif args.command == "archive":
+        archived = archive_partitions(args.months, args.dir)
+        print(f"✓ Archived {len(archived)} partition(s) to {args.dir}")
+    elif args.command == "migrate":
+        if migrate_to_partitioned():
+            print("✓ messages converted to a partitioned table")
+        else:
+            print("✓ Nothing to migrate (already partitioned or missing)")
+    else:
+        for name in list_partitions():
+            print(f"  - {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """Admin service for Neo4j graph operations and admin utilities"""
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any
 from services.neo4j_exec import connect_neo4j
 from config import NEO4J_DATABASE
 
@@ -74,48 +74,6 @@ class AdminService:
         finally:
             driver.close()
     
-    @staticmethod
-    def get_neo4j_stats() -> Dict[str, Any]:
-        """
-        Get Neo4j graph statistics
-        Returns counts of nodes by label and relationships by type
-        """
-        driver = connect_neo4j()
-        if not driver:
-            return {"node_counts": [], "rel_counts": []}
-        
-        try:
-            with driver.session(database=NEO4J_DATABASE) as session:
-                # Count nodes by label
-                node_result = session.run("""
-                    MATCH (n)
-                    RETURN labels(n)[0] as label, count(*) as count
-                    ORDER BY count DESC
-                """)
-                
-                # Count relationships by type
-                rel_result = session.run("""
-                    MATCH ()-[r]->()
-                    RETURN type(r) as type, count(*) as count
-                    ORDER BY count DESC
-                """)
-                
-                return {
-                    "node_counts": [
-                        {"label": record["label"] or "Unlabeled", "count": record["count"]}
-                        for record in node_result
-                    ],
-                    "rel_counts": [
-                        {"type": record["type"], "count": record["count"]}
-                        for record in rel_result
-                    ]
-                }
-        except Exception as e:
-            print(f"Error fetching Neo4j stats: {e}")
-            return {"node_counts": [], "rel_counts": []}
-        finally:
-            driver.close()
-
     @staticmethod
     def verify_admin_role(user_role: str) -> bool:
         """
@@ -0,0 +1,174 @@
+"""
+Materialized analytics for the report and statistics templates
+
+The section 11 reports and the 5.5 dashboard in cypher_queries_v2.cypher take
+no parameters and aggregate over whole labels, so their rows only change when
+the graph does. They are computed once per graph version (by running the
+template's own Cypher) and kept in one JSON document at ANALYTICS_PATH:
+
+    {"reports": {name: {"rows": [...], "versions": {subgraph: version},
+                        "template_version": ..., "computed_at": ..., "duration_ms": ...}}}
+
+execute_query() and /api/admin/analytics read the rows from memory. Each
+report lists the subgraphs whose import can change it (ANALYTICS_REPORTS);
+after an import only the reports depending on a subgraph whose DataVersion
+moved are recomputed, so a study-only import leaves the visa report alone.
+An edited template is recomputed too (its version changes).
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import ANALYTICS_ENABLED, ANALYTICS_PATH, NEO4J_DATABASE
+from services.data_version import SUBGRAPHS
+from services.neo4j_exec import connect_neo4j
+from services.query_loader import query_registry
+
+# template name -> subgraphs (import scripts) whose data the report reads
+ANALYTICS_REPORTS: Dict[str, Tuple[str, ...]] = {
+    "university_statistics_report": ("study",),
+    "program_distribution_by_category": ("study",),
+    "ielts_stats_by_category": ("study",),
+    "intake_popularity_report": ("study",),
+    # RELEVANT_FOR_UNIVERSITY / HAS_RELEVANT_SETTLEMENT_CATEGORY come from cross_rel
+    "visa_coverage_analysis": ("visa", "settlement", "study", "cross_rel"),
+    "system_dashboard_overview": ("visa", "settlement", "study"),
+}
+
+_state: Dict[str, Any] = {
+    "reports": {},
+    "loaded": False,
+    "last_refresh": None,
+    "error": None,
+}
+_refresh_lock = threading.Lock()
+
+
+def subgraph_versions(data_version: Optional[str]) -> Dict[str, str]:
+    """
+    {subgraph: version} parsed from the combined data version
+    ("visa=3,settlement=1,..."); a fingerprint version (no DataVersion nodes)
+    stands for every subgraph, so any change recomputes every report
+    """
+    if not data_version:
+        return {}
+    parts = dict(p.split("=", 1) for p in data_version.split(",") if "=" in p)
+    if set(parts) != set(SUBGRAPHS):
+        return {name: data_version for name in SUBGRAPHS}
+    return parts
+
+
+def _is_current(report: Optional[Dict[str, Any]], name: str, versions: Dict[str, str]) -> bool:
+    template = query_registry.entry(name)
+    return (
+        report is not None
+        and template is not None
+        and report["template_version"] == template.version
+        and report["versions"] == {s: versions.get(s) for s in ANALYTICS_REPORTS[name]}
+    )
+
+
+def _load(path: str) -> None:
+    _state["loaded"] = True
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, encoding="utf-8") as f:
+            _state["reports"] = json.load(f).get("reports", {})
+        print(f"📊 Analytics loaded ({len(_state['reports'])} reports)")
+    except (OSError, ValueError) as e:
+        print(f"Analytics not loaded: {e}")
+
+
+def _save(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"reports": _state["reports"]}, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def refresh_analytics(data_version: Optional[str], force: bool = False, path: str = ANALYTICS_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Recompute the reports that are stale for data_version (all with `force`)
+    and persist the document; returns refresh stats, None if disabled or
+    Neo4j is unavailable
+    """
+    if not ANALYTICS_ENABLED or data_version is None:
+        return None
+    with _refresh_lock:
+        if not _state["loaded"]:
+            _load(path)
+        versions = subgraph_versions(data_version)
+        stale = [
+            name for name in ANALYTICS_REPORTS
+            if force or not _is_current(_state["reports"].get(name), name, versions)
+        ]
+        stats = {"data_version": data_version, "recomputed": stale, "reused": len(ANALYTICS_REPORTS) - len(stale)}
+        if not stale:
+            _state["last_refresh"] = stats
+            return stats
+
+        driver = connect_neo4j()
+        if not driver:
+            return None
+        started = time.perf_counter()
+        try:
+            with driver.session(database=NEO4J_DATABASE) as session:
+                for name in stale:
+                    template = query_registry.entry(name)
+                    if template is None or not template.runnable:
+                        continue
+                    t0 = time.perf_counter()
+                    rows = [r.data() for r in session.run(template.statements[0])]
+                    _state["reports"][name] = {
+                        "rows": json.loads(json.dumps(rows, default=str)),
+                        "versions": {s: versions.get(s) for s in ANALYTICS_REPORTS[name]},
+                        "template_version": template.version,
+                        "computed_at": time.time(),
+                        "duration_ms": round((time.perf_counter() - t0) * 1000, 1),
+                    }
+            _save(path)
+            stats["build_s"] = round(time.perf_counter() - started, 2)
+            _state.update(last_refresh=stats, error=None)
+            print(f"📊 Analytics refreshed: {stats}")
+            return stats
+        except Exception as e:
+            print(f"Analytics refresh error: {e}")
+            _state["error"] = str(e)
+            return None
+        finally:
+            driver.close()
+
+
+def analytics_rows(template_name: str, data_version: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """Materialized rows of a report template; None when not materialized or stale"""
+    if template_name not in ANALYTICS_REPORTS:
+        return None
+    report = _state["reports"].get(template_name)
+    if not _is_current(report, template_name, subgraph_versions(data_version)):
+        return None
+    return report["rows"]
+
+
+def get_analytics(name: Optional[str] = None) -> Dict[str, Any]:
+    """The materialized reports (or one of them) as stored"""
+    reports = _state["reports"]
+    if name is not None:
+        return {name: reports[name]} if name in reports else {}
+    return dict(reports)
+
+
+def get_analytics_stats() -> Dict[str, Any]:
+    return {
+        "enabled": ANALYTICS_ENABLED,
+        "reports": {
+            name: {"computed_at": r["computed_at"], "versions": r["versions"], "rows": len(r["rows"])}
+            for name, r in _state["reports"].items()
+        },
+        "last_refresh": _state["last_refresh"],
+        "error": _state["error"],
+    }
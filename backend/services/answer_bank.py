@@ -0,0 +1,112 @@
+"""
+Precomputed FAQ answers, served without any LLM call
+
+The bank is built offline by scripts/build_answer_bank.py from the most asked
+questions in the query log and stored as JSON:
+
+    {"version": 3, "data_version": "<graph fingerprint>", "generated_at": "...",
+     "answers": {"<normalized question>": {"question", "intent", "rows", "text"}}}
+
+It is loaded at startup and ignored when it was built against an older
+graph data version. A rebuilt file is picked up by the data version watch
+(reload_answer_bank_if_changed), so no restart is needed.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import ANSWER_BANK_PATH
+
+_bank: Dict[str, Any] = {"version": None, "data_version": None, "answers": {}, "stale": False, "mtime": None}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def read_answer_bank(path: str = ANSWER_BANK_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_answer_bank(answers: Dict[str, Any], data_version: Optional[str], version: int, path: str = ANSWER_BANK_PATH) -> None:
+    """Atomic write - a running server never sees a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": version,
+            "data_version": data_version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "answers": answers,
+        }, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp_path, path)
+
+
+def load_answer_bank(current_data_version: Optional[str], path: str = ANSWER_BANK_PATH) -> int:
+    """
+    Load the bank into memory; returns the number of answers served
+
+    A bank built for another data version is kept out of service. When the
+    current version is unknown (Neo4j down) the bank is served as is.
+    """
+    _bank["mtime"] = _file_mtime(path)
+    try:
+        bank = read_answer_bank(path)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Answer bank read error: {e}")
+        bank = None
+    if not bank:
+        return 0
+
+    stale = current_data_version is not None and bank.get("data_version") != current_data_version
+    _bank.update(
+        version=bank.get("version"),
+        data_version=bank.get("data_version"),
+        answers={} if stale else bank.get("answers", {}),
+        stale=stale,
+    )
+    if stale:
+        print(f"⚠️ Answer bank v{bank.get('version')} is stale (graph changed) - run scripts/build_answer_bank.py")
+        return 0
+    print(f"Loaded answer bank v{bank.get('version')}: {len(_bank['answers'])} answers")
+    return len(_bank["answers"])
+
+
+def reload_answer_bank_if_changed(current_data_version: Optional[str], path: str = ANSWER_BANK_PATH) -> Optional[int]:
+    """
+    Reload the bank if its file was rewritten since it was loaded (one stat
+    call otherwise); returns the number of answers served, None if unchanged
+    """
+    if _file_mtime(path) == _bank["mtime"]:
+        return None
+    return load_answer_bank(current_data_version, path)
+
+
+def lookup_answer(question: str) -> Optional[Dict[str, Any]]:
+    """Precomputed answer for the question, or None"""
+    if not _bank["answers"]:
+        return None
+    return _bank["answers"].get(normalize_question(question))
+
+
+def get_answer_bank_info() -> Dict[str, Any]:
+    return {
+        "version": _bank["version"],
+        "data_version": _bank["data_version"],
+        "answers": len(_bank["answers"]),
+        "stale": _bank["stale"],
+    }
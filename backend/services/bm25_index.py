@@ -0,0 +1,203 @@
+"""
+In-process BM25 retrieval over the knowledge graph's free text
+
+Passages are exported from Neo4j (visa about info, eligibility requirements and
+steps, university info sections, settlement sections) and indexed in memory:
+
+- tokens: accent-folded, lower-cased Unicode words (Vietnamese syllables and
+  English words alike), English/Vietnamese function words dropped before
+  folding (so "thế" is a stop word but "thẻ" - card - is kept)
+- postings: per term, two compact arrays (document ids, term frequencies);
+  per-document length norms are precomputed, so a query is a few array scans
+
+The chat pipeline uses search_passages() when a template returns no rows (or
+no template matched). The index is rebuilt on startup and whenever the graph
+data version changes (services/warmup.py), so it always matches the graph.
+"""
+from __future__ import annotations
+import heapq
+import math
+import re
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import BM25_B, BM25_ENABLED, BM25_K1, BM25_MIN_SCORE, BM25_TOP_K, NEO4J_DATABASE
+from services.neo4j_exec import connect_neo4j
+
+# source -> export query returning id (elementId), title, text, url
+EXPORT_QUERIES: Dict[str, str] = {
+    "visa_about": """
+        MATCH (v:Visa)-[:HAS_ABOUT_INFO]->(a:AboutInfo)
+        RETURN elementId(a) AS id, v.name_visa + ' (' + coalesce(v.subclass, '') + ') - ' + a.field AS title,
+               a.content AS text, v.url AS url
+    """,
+    "visa_eligibility": """
+        MATCH (v:Visa)-[:HAS_ELIGIBILITY_REQUIREMENT]->(r:EligibilityRequirement)
+        RETURN elementId(r) AS id, v.name_visa + ' (' + coalesce(v.subclass, '') + ') - ' + coalesce(r.key, 'eligibility') AS title,
+               r.content AS text, v.url AS url
+    """,
+    "visa_step": """
+        MATCH (v:Visa)-[:HAS_STEP]->(s:VisaStep)
+        RETURN elementId(s) AS id, v.name_visa + ' (' + coalesce(v.subclass, '') + ') - ' + coalesce(s.title, 'step') AS title,
+               s.body AS text, coalesce(s.url, v.url) AS url
+    """,
+    "university_info": """
+        MATCH (u:University)-[:HAS_INFO]->(:InfoPage)-[:HAS_SECTION]->(s:InfoSection)
+        RETURN elementId(s) AS id, u.name + ' - ' + s.key AS title, s.content AS text, s.url AS url
+    """,
+    "settlement": """
+        MATCH (c:SettlementCategory)-[:HAS_GROUP]->(:SettlementTaskGroup)
+              -[:CONTAINS_SETTLEMENT_PAGE]->(p:SettlementPage)-[:HAS_SETTLEMENT_SECTION]->(s)
+        RETURN elementId(s) AS id, c.name + ' - ' + p.title AS title, s.path AS text, coalesce(s.url, p.url) AS url
+    """,
+}
+
+STOP_WORDS = {
+    # English
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it",
+    "no", "not", "of", "on", "or", "such", "that", "the", "their", "then", "there", "these",
+    "they", "this", "to", "was", "will", "with", "what", "how", "which", "do", "does", "can", "i", "you",
+    # Vietnamese, with accents: folded, many collide with content words
+    # (thế/thẻ, về/vé, tại/tài, để/đề, từ/tư, mình/minh...)
+    "là", "của", "và", "có", "không", "cho", "tôi", "bạn", "gì", "nào", "được", "những", "nhưng",
+    "các", "một", "với", "về", "thì", "muốn", "cần", "như", "thế", "này", "ở", "tại", "khi", "làm",
+    "sao", "em", "mình", "nhé", "vậy", "hay", "để", "đến", "từ", "trong",
+}
+
+# (node_id, source, title, text, url)
+Passage = Tuple[str, str, str, str, Optional[str]]
+
+MAX_TF = 65535  # term frequencies are stored as unsigned shorts
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@lru_cache(maxsize=65536)
+def _fold(word: str) -> str:
+    word = unicodedata.normalize('NFKD', word.replace('đ', 'd'))
+    return ''.join(c for c in word if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case words without stop words, accent-folded ("Định cư" → ["dinh", "cu"])"""
+    text = unicodedata.normalize('NFC', (text or '').lower()).replace('_', ' ')
+    return [_fold(t) for t in _TOKEN_RE.findall(text) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring; documents are (node_id, source, title, text, url)"""
+
+    def __init__(self, docs: List[Passage], k1: float = BM25_K1, b: float = BM25_B) -> None:
+        self.docs = docs
+        self.k1 = k1
+        postings: Dict[str, Tuple[array, array]] = {}
+        lengths = array('I')
+        for doc_id, (_, _, title, text, _) in enumerate(docs):
+            counts = Counter(tokenize(f"{title}\n{text}"))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                if term not in postings:
+                    postings[term] = (array('I'), array('H'))
+                ids, tfs = postings[term]
+                ids.append(doc_id)
+                tfs.append(min(tf, MAX_TF))
+        self.postings = postings
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        # k1 * (1 - b + b * |d| / avgdl), the document part of the BM25 denominator
+        self.norms = array('f', (k1 * (1 - b + b * (n / avg_length if avg_length else 0)) for n in lengths))
+        self.idf = {
+            term: math.log(1 + (len(docs) - len(ids) + 0.5) / (len(ids) + 0.5))
+            for term, (ids, _) in postings.items()
+        }
+
+    def search(self, query: str, k: int = BM25_TOP_K) -> List[Tuple[int, float]]:
+        """Top k (doc_id, score) pairs"""
+        scores: Dict[int, float] = {}
+        k1_plus_1 = self.k1 + 1
+        norms = self.norms
+        for term in set(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            idf = self.idf[term]
+            ids, tfs = entry
+            for doc_id, tf in zip(ids, tfs):
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * k1_plus_1 / (tf + norms[doc_id])
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+_index: Dict[str, Any] = {"index": None, "data_version": None, "built_at": None, "build_s": None}
+
+
+def export_passages() -> Optional[List[Passage]]:
+    """
+    (node_id, source, title, text, url) for every passage (also the input of
+    services/vector_index.py); None if Neo4j is unavailable
+    """
+    driver = connect_neo4j()
+    if not driver:
+        return None
+    try:
+        docs = []
+        with driver.session(database=NEO4J_DATABASE) as session:
+            for source, query in EXPORT_QUERIES.items():
+                for r in session.run(query):
+                    if r["text"]:
+                        docs.append((r["id"], source, r["title"] or "", str(r["text"]), r["url"]))
+        return docs
+    except Exception as e:
+        print(f"BM25 export error: {e}")
+        return None
+    finally:
+        driver.close()
+
+
+def rebuild_bm25_index(data_version: Optional[str] = None) -> bool:
+    """Export and index the passages; the previous index stays in use if the export fails"""
+    if not BM25_ENABLED:
+        return False
+    started = time.perf_counter()
+    docs = export_passages()
+    if docs is None:
+        return False
+    index = BM25Index(docs)
+    _index.update(
+        index=index,
+        data_version=data_version,
+        built_at=time.time(),
+        build_s=round(time.perf_counter() - started, 2),
+    )
+    print(f"📚 BM25 index built: {len(docs)} passages, {len(index.postings)} terms in {_index['build_s']}s")
+    return True
+
+
+def search_passages(query: str, k: int = BM25_TOP_K) -> List[Dict[str, Any]]:
+    """Best matching passages as result rows (empty without an index or a good match)"""
+    index: Optional[BM25Index] = _index["index"]
+    if index is None:
+        return []
+    rows = []
+    for doc_id, score in index.search(query, k):
+        if score < BM25_MIN_SCORE:
+            break
+        node_id, source, title, text, url = index.docs[doc_id]
+        rows.append({
+            "node_id": node_id, "source": source, "title": title, "content": text, "url": url,
+            "score": round(score, 2),
+        })
+    return rows
+
+
+def get_bm25_stats() -> Dict[str, Any]:
+    index: Optional[BM25Index] = _index["index"]
+    return {
+        "enabled": BM25_ENABLED,
+        "passages": len(index.docs) if index else 0,
+        "terms": len(index.postings) if index else 0,
+        "data_version": _index["data_version"],
+        "built_at": _index["built_at"],
+        "build_s": _index["build_s"],
+    }
@@ -0,0 +1,183 @@
+"""
+Write-behind persistence of chat turns into the Conversation / Message tables
+
+The chat path only puts messages on an in-memory queue; a background task
+bulk-inserts them into Postgres in batches (flushed on size or time), so
+answering never waits on the database.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+
+from config import (
+    HISTORY_QUEUE_SIZE,
+    HISTORY_BATCH_SIZE,
+    HISTORY_FLUSH_MS,
+    HISTORY_BACKPRESSURE_SECONDS,
+    HISTORY_MAX_RETRIES,
+    HISTORY_DRAIN_SECONDS,
+)
+from models.database import Conversation, Message, SessionLocal
+
+DEFAULT_TITLE = "New Chat"
+
+
+class ChatHistoryWriter:
+    """
+    Batching write-behind queue for chat messages
+
+    - flush: when HISTORY_BATCH_SIZE messages are queued or HISTORY_FLUSH_MS
+      after the first one, whichever comes first
+    - backpressure: when Postgres is slow the queue fills up; submit() then
+      waits up to HISTORY_BACKPRESSURE_SECONDS for space before dropping
+    - drain: stop() flushes what is queued (bounded by HISTORY_DRAIN_SECONDS)
+    """
+
+    def __init__(self) -> None:
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "failed_batches": 0}
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=HISTORY_QUEUE_SIZE)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, conversation_id: int, user_id: int, role: str, content: str) -> bool:
+        """Queue one message; returns False if it was dropped under backpressure"""
+        if self._queue is None:
+            self.start()
+        item = {
+            "conversation_id": conversation_id,
+            "user_id": user_id,  # checked against Conversation.user_id, not stored
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(item), HISTORY_BACKPRESSURE_SECONDS)
+            except asyncio.TimeoutError:
+                self.stats["dropped"] += 1
+                print(f"⚠️ Chat history queue full, dropped message for conversation {conversation_id}")
+                return False
+        self.stats["queued"] += 1
+        return True
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Block for the first message, then collect until size or time limit"""
+        batch = [await self._queue.get()]
+        flush_at = time.monotonic() + HISTORY_FLUSH_MS / 1000
+        while len(batch) < HISTORY_BATCH_SIZE:
+            remaining = flush_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write one batch, retrying with backoff; the queue fills meanwhile"""
+        for attempt in range(HISTORY_MAX_RETRIES + 1):
+            try:
+                written = await asyncio.to_thread(_write_batch, batch)
+                self.stats["written"] += written
+                self.stats["dropped"] += len(batch) - written
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                print(f"Chat history flush error (attempt {attempt + 1}): {e}")
+                if attempt < HISTORY_MAX_RETRIES:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+        self.stats["failed_batches"] += 1
+        self.stats["dropped"] += len(batch)
+
+    async def stop(self) -> None:
+        """Flush queued messages, then stop the background task"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), HISTORY_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Chat history drain timed out, {self._queue.qsize()} messages lost")
+        self._task.cancel()
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": self._queue.qsize() if self._queue else 0}
+
+
+def _write_batch(batch: List[Dict[str, Any]]) -> int:
+    """
+    Bulk insert one batch in a single transaction (runs in a worker thread)
+
+    Messages for conversations that no longer exist or belong to another user
+    are skipped. Conversations get updated_at bumped and, while still
+    untitled, the first question as title.
+    """
+    db = SessionLocal()
+    try:
+        ids = {m["conversation_id"] for m in batch}
+        owners = dict(db.execute(select(Conversation.id, Conversation.user_id).where(Conversation.id.in_(ids))).all())
+        rows = [
+            {k: v for k, v in m.items() if k != "user_id"}
+            for m in batch if owners.get(m["conversation_id"]) == m["user_id"]
+        ]
+        if not rows:
+            return 0
+        existing = {m["conversation_id"] for m in rows}
+
+        db.execute(insert(Message), rows)
+
+        now = datetime.utcnow()
+        db.execute(
+            update(Conversation).where(Conversation.id.in_(existing)).values(updated_at=now)
+        )
+        titles: Dict[int, str] = {}
+        for m in rows:
+            if m["role"] == "user" and m["conversation_id"] not in titles:
+                titles[m["conversation_id"]] = m["content"][:255]
+        if titles:
+            # Core executemany (an ORM session would treat this as bulk-by-primary-key)
+            db.connection().execute(
+                update(Conversation.__table__)
+                .where(Conversation.id == bindparam("cid"), Conversation.title == DEFAULT_TITLE)
+                .values(title=bindparam("new_title")),
+                [{"cid": cid, "new_title": title} for cid, title in titles.items()],
+            )
+        db.commit()
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+history_writer = ChatHistoryWriter()
+
+
+async def record_turn(conversation_id: Optional[int], user_id: Optional[int], question: str, answer: str) -> None:
+    """Queue a user question and the assistant answer for persistence (only for the conversation's owner)"""
+    if conversation_id is None or user_id is None:
+        return
+    await history_writer.submit(conversation_id, user_id, "user", question)
+    if answer:
+        await history_writer.submit(conversation_id, user_id, "assistant", answer)
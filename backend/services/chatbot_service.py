@@ -5,49 +5,195 @@ Optimized for speed with streaming, caching, and reduced API calls
 from __future__ import annotations
 import asyncio
 import json
+import os
 import time
-from typing import Dict, Any, List, Optional, AsyncGenerator
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple
 from datetime import datetime, timedelta
 
 import google.generativeai as genai
-from config import GOOGLE_API_KEY, GEMINI_MODEL, NEO4J_DATABASE, CACHE_TTL
-from services.neo4j_exec import connect_neo4j, execute_cypher
-from services.query_loader import load_cypher_queries
+from neo4j import Query
+from config import (
+    GOOGLE_API_KEY,
+    GEMINI_MODEL,
+    NEO4J_DATABASE,
+    CACHE_TTL,
+    CACHE_MAX_ENTRIES,
+    CACHE_HOT_TTL_MULTIPLIER,
+    ENABLE_INTENT_HEDGING,
+    INTENT_HEDGE_PERCENTILE,
+    INTENT_HEDGE_DEFAULT_SECONDS,
+)
+from services.answer_bank import lookup_answer
+from services.analytics import analytics_rows
+from services.bm25_index import search_passages
+from services.chat_history import record_turn
+from services.circuit_breaker import CircuitOpenError, gemini_breaker, neo4j_breaker
+from services.conversation_context import remember, resolve_follow_up
+from services.data_version import get_current_data_version
+from services.deadline import Deadline, LatencyTracker, hedged_call
+from services.graph_snapshot import snapshot_rows
+from services.heavy_hitters import cache_frequency, is_hot, track_answer
+from services.neo4j_exec import connect_neo4j_async
+from services.prefetch import foreground_query, schedule_prefetch
+from services.query_loader import QueryParamError, query_registry
+from services.vector_index import search_similar, vector_index_loaded
 
 # Initialize Gemini
 genai.configure(api_key=GOOGLE_API_KEY)
 
-# Load Cypher Query Templates from file
-print("Loading Cypher queries from file...")
-QUERY_TEMPLATES = load_cypher_queries()
+# Compiled Cypher templates (both query files; hot-reloads on file change)
+QUERY_TEMPLATES = query_registry
 print(f"Loaded {len(QUERY_TEMPLATES)} query templates")
 
-# Simple in-memory cache for responses
-_response_cache: Dict[str, tuple[Any, datetime]] = {}
+DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant for Australian visa, study, and settlement information."
+
+
+@lru_cache(maxsize=1)
+def load_system_prompt() -> str:
+    """Read chatbot/system_prompt.txt once per process"""
+    system_prompt_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "chatbot",
+        "system_prompt.txt"
+    )
+    if os.path.exists(system_prompt_path):
+        with open(system_prompt_path, "r", encoding="utf-8") as f:
+            return f.read()
+    return DEFAULT_SYSTEM_PROMPT
+
+
+# Simple in-memory cache for responses: (data version, key) -> (value, expires_at),
+# oldest first. Keyed on the graph data version, so an import invalidates
+# exactly the entries computed from the old data; CACHE_TTL only bounds memory.
+_response_cache: Dict[Tuple[Optional[str], str], tuple[Any, datetime]] = {}
 
 
 def _get_cache(key: str) -> Optional[Any]:
-    """Get cached response if not expired"""
+    """Get cached response if not expired (every lookup counts towards hotness)"""
     key = key.lower().strip()
-    if key in _response_cache:
-        value, timestamp = _response_cache[key]
-        if datetime.now() - timestamp < timedelta(seconds=CACHE_TTL):
+    cache_frequency.add(key)
+    entry_key = (get_current_data_version(), key)
+    if entry_key in _response_cache:
+        value, expires_at = _response_cache[entry_key]
+        if datetime.now() < expires_at:
             return value
         else:
-            del _response_cache[key]
+            del _response_cache[entry_key]
     return None
 
 
-def _set_cache(key: str, value: Any) -> None:
-    """Set cache with current timestamp"""
+def _set_cache(key: str, value: Any, data_version: Optional[str]) -> None:
+    """
+    Set cache entry; hot keys (heavy hitters) live CACHE_HOT_TTL_MULTIPLIER
+    times longer
+
+    `data_version` is the version current when the value was computed - a
+    result that raced with an import is not stored under the new version.
+
+    When the cache is full the oldest entry is evicted, unless it has been
+    requested more often than the new key - then the new key is not admitted.
+    """
     key = key.lower().strip()
-    _response_cache[key] = (value, datetime.now())
+    if data_version != get_current_data_version():
+        return
+    entry_key = (data_version, key)
+    if entry_key not in _response_cache and len(_response_cache) >= CACHE_MAX_ENTRIES:
+        now = datetime.now()
+        for expired in [k for k, (_, expires_at) in _response_cache.items() if expires_at <= now]:
+            del _response_cache[expired]
+        if len(_response_cache) >= CACHE_MAX_ENTRIES:
+            victim = next(iter(_response_cache))
+            if cache_frequency.estimate(victim[1]) > cache_frequency.estimate(key):
+                return
+            del _response_cache[victim]
 
+    ttl = CACHE_TTL * (CACHE_HOT_TTL_MULTIPLIER if is_hot(key) else 1)
+    _response_cache.pop(entry_key, None)
+    _response_cache[entry_key] = (value, datetime.now() + timedelta(seconds=ttl))
+
+
+def clear_caches() -> int:
+    """Drop cached entries of older data versions (after an import); returns entries dropped"""
+    current = get_current_data_version()
+    stale = [k for k in _response_cache if k[0] != current]
+    for k in stale:
+        del _response_cache[k]
+    return len(stale)
+
+
+# Latency of single intent calls, for the hedge delay (p90)
+_intent_latency = LatencyTracker()
+
+
+# Last good rows per (query_type, params), served while the Neo4j circuit is open
+_last_good_rows: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_LAST_GOOD_ROWS_MAX = 500
+
+DEGRADED_NEO4J_MESSAGE = "⚠️ Cơ sở dữ liệu tri thức đang tạm gián đoạn. Vui lòng thử lại sau ít phút."
+DEGRADED_GEMINI_HEADER = "⚠️ Trợ lý AI đang tạm gián đoạn, dưới đây là dữ liệu gốc từ hệ thống:"
+
+
+async def _generate(model: Any, prompt: str, timeout: float) -> Any:
+    """Gemini call bounded by the stage budget and guarded by the Gemini circuit"""
+    if timeout <= 0:
+        # Request deadline already passed - not a Gemini failure
+        raise asyncio.TimeoutError()
+    if not gemini_breaker.allow():
+        raise CircuitOpenError("gemini")
+    try:
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, request_options={"timeout": timeout}),
+            timeout
+        )
+    except asyncio.CancelledError:
+        gemini_breaker.record_cancelled()
+        raise
+    except Exception:
+        gemini_breaker.record_failure()
+        raise
+    gemini_breaker.record_success()
+    return response
 
-async def detect_intent(user_query: str, system_prompt: str) -> Dict[str, Any]:
+
+def _format_value(value: Any) -> str:
+    """Flatten a row value (lists of dicts from collect()) into one short line"""
+    if isinstance(value, dict):
+        return " – ".join(_format_value(v) for v in value.values() if v not in (None, "", [], {}))
+    if isinstance(value, list):
+        return "; ".join(_format_value(v) for v in value[:3])
+    return str(value)
+
+
+def render_template_answer(query_results: List[Dict[str, Any]]) -> str:
+    """
+    Answer without the LLM (Gemini circuit open): render the rows as a list
+    """
+    if not query_results:
+        return "⚠️ Trợ lý AI đang tạm gián đoạn. Vui lòng thử lại sau ít phút."
+
+    lines = [DEGRADED_GEMINI_HEADER, ""]
+    for row in _compact_rows(query_results, limit=5):
+        for i, (key, value) in enumerate(row.items()):
+            label = key.replace("_", " ").capitalize()
+            prefix = "📌" if i == 0 else "  -"
+            lines.append(f"{prefix} **{label}**: {_format_value(value)}")
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+async def detect_intent(
+    user_query: str, system_prompt: str, deadline: Optional[Deadline] = None
+) -> Dict[str, Any]:
     """
     Detect user intent and extract entities using Gemini
+
+    The call is bounded by the deadline's intent budget. With
+    ENABLE_INTENT_HEDGING, a second request is fired if the first has not
+    answered by the observed p90 latency, and the faster one wins.
     """
+    deadline = deadline or Deadline()
     # Quick check for greetings to save API calls
     greetings = {"hi", "hello", "xin chào", "chào", "chao", "hola"}
     if user_query.lower().strip() in greetings:
@@ -61,14 +207,6 @@ async def detect_intent(user_query: str, system_prompt: str) -> Dict[str, Any]:
     genai.configure(api_key=GOOGLE_API_KEY)
     model = genai.GenerativeModel(model_name=GEMINI_MODEL)
     
-    # --- Token Counting (Estimate) ---
-    try:
-        count = await model.count_tokens_async(prompt)
-        print(f"📊 Intent Tokens: {count.total_tokens}")
-    except:
-        pass
-    # ---------------------------------
-    
     # Optimized prompt - shorter and more direct
     prompt = f"""
     Phân tích câu hỏi sau để lấy thông tin truy vấn graph database:
@@ -84,9 +222,20 @@ async def detect_intent(user_query: str, system_prompt: str) -> Dict[str, Any]:
     }}
     """
     
+    budget = deadline.budget("intent")
+
+    async def _call():
+        started = time.perf_counter()
+        response = await _generate(model, prompt, budget)
+        _intent_latency.record(time.perf_counter() - started)
+        return response
+    
     try:
-        # Use native async method
-        response = await model.generate_content_async(prompt)
+        if ENABLE_INTENT_HEDGING:
+            hedge_after = _intent_latency.percentile(INTENT_HEDGE_PERCENTILE) or INTENT_HEDGE_DEFAULT_SECONDS
+            response = await hedged_call(_call, hedge_after, budget)
+        else:
+            response = await _call()
         text = response.text.strip()
         
         # Clean up json markdown code blocks if present
@@ -95,6 +244,19 @@ async def detect_intent(user_query: str, system_prompt: str) -> Dict[str, Any]:
         if text.endswith("```"):
             text = text[:-3]
         return json.loads(text.strip())
+    except asyncio.TimeoutError:
+        print(f"⏱️ Intent detection timed out after {budget:.1f}s")
+        return {
+            "intent": "STUDY",
+            "entities": {},
+            "query_type": "fallback"
+        }
+    except CircuitOpenError:
+        return {
+            "intent": "STUDY",
+            "entities": {},
+            "query_type": "fallback"
+        }
     except Exception as e:
         error_str = str(e)
         print(f"❌ GEMINI ERROR DETAILS: {error_str}")
@@ -113,37 +275,173 @@ async def detect_intent(user_query: str, system_prompt: str) -> Dict[str, Any]:
         }
 
 
-async def execute_query(query_type: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _note_answer(
+    conversation_id: Optional[int], analysis: Dict[str, Any], rows: List[Dict[str, Any]], question: str
+) -> None:
+    """Remember the turn for follow-ups, count it, log it and prefetch likely next queries"""
+    # v1 aliases are recorded under the canonical template name
+    template = QUERY_TEMPLATES.entry(analysis.get("query_type") or "")
+    if template and template.name != analysis.get("query_type"):
+        analysis = {**analysis, "query_type": template.name}
+    track_answer(question, analysis)
+    previous = remember(conversation_id, analysis, rows)
+    schedule_prefetch(conversation_id, analysis, previous, QUERY_TEMPLATES, question)
+
+
+def _rows_key(query_type: str, params: Dict[str, Any]) -> str:
+    """Canonical template name and version + validated params (an edited template gets new keys)"""
+    template = QUERY_TEMPLATES.entry(query_type)
+    return f"{template.name}@{template.version}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def has_cached_rows(query_type: str, params: Dict[str, Any]) -> bool:
+    """True if execute_query would be served from the query-result cache (not counted as a lookup)"""
+    try:
+        params = QUERY_TEMPLATES.validate(query_type, params)
+    except QueryParamError:
+        return False
+    key = f"rows:{_rows_key(query_type, params)}".lower().strip()
+    entry = _response_cache.get((get_current_data_version(), key))
+    return entry is not None and datetime.now() < entry[1]
+
+
+async def execute_query(
+    query_type: str,
+    params: Dict[str, Any],
+    deadline: Optional[Deadline] = None,
+    background: bool = False,
+) -> List[Dict[str, Any]]:
     """
     Execute Cypher query against Neo4j (Async wrapper)
+
+    Results are cached for CACHE_TTL per template and params (the prefetcher
+    warms this cache). The query budget is sent as the Neo4j transaction
+    timeout, so the server also stops work when the request runs out of time.
+
+    While the Neo4j circuit is open (or the query fails), the last good rows
+    for the same template and params are served instead.
+
+    Only single read-only templates that passed the plan check run; params
+    are validated and coerced against the template's declared $params first.
+
+    Templates in services/graph_snapshot.SNAPSHOT_TEMPLATES are answered from
+    the in-process snapshot while it matches the current data version, the
+    report templates in services/analytics.ANALYTICS_REPORTS from their
+    materialized rows.
+
+    Args:
+        background: Prefetch query - not counted as foreground load
     """
-    if query_type not in QUERY_TEMPLATES:
+    template = QUERY_TEMPLATES.entry(query_type)
+    if template is None or not template.runnable or QUERY_TEMPLATES.rejection(query_type):
         return []
+    try:
+        params = QUERY_TEMPLATES.validate(query_type, params)
+    except QueryParamError as e:
+        # Would fail on the server anyway - no round trip, no breaker failure
+        print(f"Query params rejected: {e}")
+        return []
+
+    query = template.statements[0]
+    budget = (deadline or Deadline()).budget("query")
+    rows_key = _rows_key(query_type, params)
+    data_version = get_current_data_version()
+
+    cached = _get_cache(f"rows:{rows_key}")
+    if cached is not None:
+        return cached
+
+    # Hot template shapes are answered from the in-process graph snapshot
+    rows = snapshot_rows(template.name, params, data_version)
+    if rows is not None:
+        return rows
+
+    # Report / dashboard templates are materialized once per graph version
+    rows = analytics_rows(template.name, data_version)
+    if rows is not None:
+        return rows
     
-    query = QUERY_TEMPLATES[query_type]
-    
-    def _run_query():
-        driver = connect_neo4j()
-        if not driver:
-            return []
-        try:
-            with driver.session(database=NEO4J_DATABASE) as session:
-                result = session.run(query, **params)
-                data = [record.data() for record in result]
-                return data
-        except Exception as e:
-            print(f"Query execution error: {e}")
-            return []
-        finally:
-            driver.close()
+    if budget <= 0:
+        # Request deadline already passed - not a Neo4j failure
+        return _last_good_rows.get(rows_key, [])
 
-    return await asyncio.to_thread(_run_query)
+    # Not configured is not a Neo4j failure: check before taking a probe slot
+    driver = connect_neo4j_async()
+    if not driver:
+        return []
+    if not neo4j_breaker.allow():
+        await driver.close()
+        return _last_good_rows.get(rows_key, [])
+    try:
+        async def _run() -> List[Dict[str, Any]]:
+            async with driver.session(database=NEO4J_DATABASE) as session:
+                result = await session.run(Query(query, timeout=budget), **params)
+                return [record.data() async for record in result]
 
+        if background:
+            rows = await asyncio.wait_for(_run(), budget)
+        else:
+            with foreground_query():
+                rows = await asyncio.wait_for(_run(), budget)
+    except asyncio.CancelledError:
+        # Client went away - the async driver aborts the running transaction
+        print(f"Query cancelled: {query_type}")
+        neo4j_breaker.record_cancelled()
+        raise
+    except asyncio.TimeoutError:
+        print(f"⏱️ Query {query_type} timed out after {budget:.1f}s")
+        neo4j_breaker.record_failure()
+        return _last_good_rows.get(rows_key, [])
+    except Exception as e:
+        print(f"Query execution error: {e}")
+        neo4j_breaker.record_failure()
+        return _last_good_rows.get(rows_key, [])
+    finally:
+        await driver.close()
+
+    neo4j_breaker.record_success()
+    if rows:
+        _set_cache(f"rows:{rows_key}", rows, data_version)
+    _last_good_rows[rows_key] = rows
+    _last_good_rows.move_to_end(rows_key)
+    if len(_last_good_rows) > _LAST_GOOD_ROWS_MAX:
+        _last_good_rows.popitem(last=False)
+    return rows
+
+
+RRF_K = 60  # reciprocal rank fusion constant
 
-async def format_response(user_query: str, query_results: List[Dict[str, Any]], system_prompt: str) -> str:
+
+async def retrieve_passages(user_query: str, k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Passages for a question no template answered: BM25 keyword hits and vector
+    index neighbours merged by reciprocal rank fusion (a passage found by both
+    ranks first)
+    """
+    keyword = search_passages(user_query)
+    semantic = await asyncio.to_thread(search_similar, user_query) if vector_index_loaded() else []
+    fused: Dict[str, float] = {}
+    rows: Dict[str, Dict[str, Any]] = {}
+    for ranking in (keyword, semantic):
+        for rank, row in enumerate(ranking):
+            key = row["node_id"]
+            fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            rows.setdefault(key, row)
+    return [rows[key] for key in sorted(fused, key=fused.get, reverse=True)[:k]]
+
+
+async def format_response(
+    user_query: str,
+    query_results: List[Dict[str, Any]],
+    system_prompt: str,
+    deadline: Optional[Deadline] = None
+) -> str:
     """
     Format query results into natural language response using Gemini (Async)
+
+    Token counting and generation share the remaining request budget.
     """
+    deadline = deadline or Deadline()
     model = genai.GenerativeModel(model_name=GEMINI_MODEL)
     
     prompt = f"""
@@ -157,27 +455,63 @@ async def format_response(user_query: str, query_results: List[Dict[str, Any]],
     3. Trình bày dạng danh sách (bullet points) dễ đọc.
     """
     
+    if gemini_breaker.is_open():
+        return render_template_answer(query_results)
+    
     try:
         # Count tokens before generating
-        token_count = await model.count_tokens_async(prompt)
+        token_count = await asyncio.wait_for(model.count_tokens_async(prompt), deadline.budget("llm"))
         print(f"\n📊 TOKEN USAGE ESTIMATE:")
         print(f"   - Input Tokens: {token_count.total_tokens}")
         print(f"   - Est. Cost (Free Tier): 0$")
         print(f"   - Remaining Requests (Daily Limit ~1500): Check Google Console\n")
 
-        response = await model.generate_content_async(prompt)
+        response = await _generate(model, prompt, deadline.budget("llm"))
         return response.text
+    except CircuitOpenError:
+        return render_template_answer(query_results)
     except Exception as e:
         print(f"Response formatting error: {e}")
         return "Xin lỗi, tôi gặp lỗi khi xử lý câu trả lời."
 
 
-async def chatbot_response(user_query: str, system_prompt: str) -> Dict[str, Any]:
+async def chatbot_response(
+    user_query: str,
+    system_prompt: str,
+    deadline: Optional[Deadline] = None,
+    conversation_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Main chatbot function - Async
+
+    With a conversation_id, follow-ups ("còn điều kiện của nó?") are resolved
+    against the previous turn instead of re-running intent detection. The
+    caller must have checked that user_id owns the conversation.
     """
-    # Step 1: Detect intent
-    analysis = await detect_intent(user_query, system_prompt)
+    deadline = deadline or Deadline()
+    original_query = user_query
+
+    # Step 1: Detect intent (or resolve a follow-up locally)
+    follow_up = resolve_follow_up(conversation_id, user_query, QUERY_TEMPLATES)
+    if follow_up:
+        user_query = follow_up.question
+
+    # Precomputed FAQ answer - no LLM call at all
+    banked = lookup_answer(user_query)
+    if banked:
+        _note_answer(conversation_id, banked["intent"], banked["rows"], user_query)
+        await record_turn(conversation_id, user_id, original_query, banked["text"])
+        return {
+            "response": banked["text"],
+            "intent": banked["intent"].get("intent"),
+            "query_results": banked["rows"]
+        }
+
+    if follow_up:
+        analysis = follow_up.analysis
+    else:
+        analysis = await detect_intent(user_query, system_prompt, deadline)
     
     if analysis.get("query_type") == "greeting":
         return {
@@ -193,15 +527,26 @@ async def chatbot_response(user_query: str, system_prompt: str) -> Dict[str, Any
             "query_results": []
         }
     
-    # Step 2: Execute query
-    query_results = await execute_query(
-        analysis.get("query_type", "fallback"),
-        analysis.get("entities", {})
-    )
+    # Step 2: Execute query (a follow-up on the same topic reuses the previous rows)
+    if follow_up and follow_up.rows is not None:
+        query_results = follow_up.rows
+    else:
+        query_results = await execute_query(
+            analysis.get("query_type", "fallback"),
+            analysis.get("entities", {}),
+            deadline
+        )
+    if not query_results:
+        # No template rows: best matching passages (BM25 + vector index)
+        query_results = await retrieve_passages(user_query)
+    _note_answer(conversation_id, analysis, query_results, user_query)
     
     # Step 3: Format response
     if query_results:
-        response = await format_response(user_query, query_results, system_prompt)
+        response = await format_response(user_query, query_results, system_prompt, deadline)
+    elif neo4j_breaker.is_open():
+        # No data because the graph is down - a general-knowledge LLM answer would mislead
+        response = DEGRADED_NEO4J_MESSAGE
     else:
         # Fallback
         model = genai.GenerativeModel(model_name=GEMINI_MODEL)
@@ -212,12 +557,15 @@ async def chatbot_response(user_query: str, system_prompt: str) -> Dict[str, Any
             Trả lời dựa trên kiến thức chung về visa/du học Úc. 
             BẮT BUỘC dùng emoji cho các ý chính (🎓, 🛂, 💰...). Trình bày đẹp.
             """
-            fallback_response = await model.generate_content_async(prompt)
+            fallback_response = await _generate(model, prompt, deadline.budget("llm"))
             response = fallback_response.text
+        except CircuitOpenError:
+            response = render_template_answer([])
         except Exception as e:
             print(f"Fallback error: {e}")
             response = "Xin lỗi, tôi không tìm thấy thông tin phù hợp."
     
+    await record_turn(conversation_id, user_id, original_query, response)
     return {
         "response": response,
         "intent": analysis.get("intent"),
@@ -225,42 +573,203 @@ async def chatbot_response(user_query: str, system_prompt: str) -> Dict[str, Any
     }
 
 
-async def chatbot_response_stream(user_query: str, system_prompt: str) -> AsyncGenerator[str, None]:
+# Counters for /query-stream; "abandoned" = client disconnected before `done`
+_stream_metrics: Dict[str, Any] = {
+    "started": 0,
+    "completed": 0,
+    "abandoned": 0,
+    "abandoned_by_stage": {"intent": 0, "query": 0, "llm": 0},
+}
+
+
+def get_stream_metrics() -> Dict[str, Any]:
+    """Snapshot of the streaming counters"""
+    return {**_stream_metrics, "abandoned_by_stage": dict(_stream_metrics["abandoned_by_stage"])}
+
+
+async def _close_llm_stream(response_stream: Any) -> None:
+    """Best-effort cancel of an in-flight Gemini stream so it stops consuming quota"""
+    iterator = getattr(response_stream, "_iterator", None)
+    try:
+        if hasattr(iterator, "cancel"):
+            iterator.cancel()
+        elif hasattr(iterator, "aclose"):
+            await iterator.aclose()
+    except Exception as e:
+        print(f"Error closing Gemini stream: {e}")
+
+
+def _compact_rows(query_results: List[Dict[str, Any]], limit: int = 10, max_text: int = 300) -> List[Dict[str, Any]]:
     """
-    Stream chatbot response chunk by chunk for real-time display
-    
+    Shrink Neo4j rows into small cards (programs, visas...) for the SSE `data` event
+
+    Drops empty values and truncates long text fields so the first frame stays small.
+    """
+    def _compact(value: Any) -> Any:
+        if isinstance(value, str):
+            return value if len(value) <= max_text else value[:max_text] + "…"
+        if isinstance(value, dict):
+            return {k: _compact(v) for k, v in value.items() if v not in (None, "", [], {})}
+        if isinstance(value, list):
+            return [_compact(v) for v in value[:limit] if v not in (None, "", [], {})]
+        return value
+
+    return [_compact(row) for row in query_results[:limit]]
+
+
+async def chatbot_event_stream(
+    user_query: str,
+    system_prompt: str,
+    deadline: Optional[Deadline] = None,
+    conversation_id: Optional[int] = None,
+    record: bool = True,
+    user_id: Optional[int] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Stream typed chatbot events for the SSE endpoint
+
+    Event order: `intent` → `data` (compact Neo4j rows, sent as soon as the query
+    returns) → `text` chunks from Gemini → `done` with timing stats.
+
+    Closing or cancelling the generator (client disconnected) cancels the
+    in-flight Neo4j query or Gemini stream, skips the cache write and counts
+    the stream as abandoned. Completed turns are queued for chat history.
+
     Args:
         user_query: User's question
         system_prompt: System prompt for context
-        
+        deadline: Request time budget (defaults to REQUEST_DEADLINE_SECONDS)
+        conversation_id: Conversation.id; enables follow-up resolution
+        user_id: Owner of the conversation (checked by the caller)
+        record: Log the query, learn follow-ups and store chat history
+            (off for offline jobs such as the answer bank builder)
+
     Yields:
-        Response chunks as they are generated
+        Dicts of the form {"event": <type>, "data": <payload>}
     """
+    state: Dict[str, Any] = {"stage": "intent", "llm_stream": None}
+    deadline = deadline or Deadline()
+    answer: List[str] = []
+    _stream_metrics["started"] += 1
+    try:
+        async for event in _run_event_stream(user_query, system_prompt, deadline, state, conversation_id, record):
+            if event["event"] == "text":
+                answer.append(event["data"]["text"])
+            yield event
+        _stream_metrics["completed"] += 1
+    except (asyncio.CancelledError, GeneratorExit):
+        _stream_metrics["abandoned"] += 1
+        _stream_metrics["abandoned_by_stage"][state["stage"]] += 1
+        if state["stage"] == "llm":
+            gemini_breaker.record_cancelled()
+        if state["llm_stream"] is not None:
+            await _close_llm_stream(state["llm_stream"])
+        raise
+    # Write-behind: returns as soon as the turn is queued
+    if record:
+        await record_turn(conversation_id, user_id, user_query, "".join(answer))
+
+
+async def _run_event_stream(
+    user_query: str,
+    system_prompt: str,
+    deadline: Deadline,
+    state: Dict[str, Any],
+    conversation_id: Optional[int] = None,
+    record: bool = True,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Pipeline behind chatbot_event_stream; keeps `state` updated for cancellation"""
+    started = time.perf_counter()
+    timings: Dict[str, Any] = {}
+
+    def _elapsed_ms() -> int:
+        return int((time.perf_counter() - started) * 1000)
+
+    # Resolve pronouns first so the cache key is the self-contained question
+    follow_up = resolve_follow_up(conversation_id, user_query, QUERY_TEMPLATES)
+    if follow_up:
+        user_query = follow_up.question
+        timings["follow_up"] = True
+
+    # Precomputed FAQ answer - no LLM call at all
+    banked = lookup_answer(user_query)
+    if banked:
+        if record:
+            _note_answer(conversation_id, banked["intent"], banked["rows"], user_query)
+        yield {"event": "intent", "data": banked["intent"]}
+        yield {"event": "data", "data": {"rows": banked["rows"]}}
+        yield {"event": "text", "data": {"text": banked["text"]}}
+        yield {"event": "done", "data": {"cached": True, "answer_bank": True, "total_ms": _elapsed_ms()}}
+        return
+
     # Check cache first
     cache_key = f"stream:{user_query.lower().strip()}"
+    data_version = get_current_data_version()
     cached = _get_cache(cache_key)
     if cached:
-        # Stream cached response word by word for smooth UX
-        words = cached.split()
-        for i, word in enumerate(words):
-            yield word + (" " if i < len(words) - 1 else "")
-            await asyncio.sleep(0.01)  # Small delay for smooth streaming
+        if record:
+            _note_answer(conversation_id, cached["intent"], cached["rows"], user_query)
+        yield {"event": "intent", "data": cached["intent"]}
+        yield {"event": "data", "data": {"rows": cached["rows"]}}
+        # One text event - no per-word frames for cache hits
+        yield {"event": "text", "data": {"text": cached["text"]}}
+        yield {"event": "done", "data": {"cached": True, "total_ms": _elapsed_ms()}}
         return
-    
+
     # Step 1: Detect intent
-    analysis = await detect_intent(user_query, system_prompt)
-    
+    if follow_up:
+        analysis = follow_up.analysis
+    else:
+        analysis = await detect_intent(user_query, system_prompt, deadline)
+    timings["intent_ms"] = _elapsed_ms()
+    intent = {
+        "intent": analysis.get("intent"),
+        "query_type": analysis.get("query_type"),
+        "entities": analysis.get("entities", {}),
+    }
+    yield {"event": "intent", "data": intent}
+
     if analysis.get("query_type") == "greeting":
-        yield "Chào bạn! Tôi là trợ lý ảo AusVisa. Tôi có thể giúp gì cho bạn về du học và visa Úc?"
+        yield {"event": "text", "data": {"text": "Chào bạn! Tôi là trợ lý ảo AusVisa. Tôi có thể giúp gì cho bạn về du học và visa Úc?"}}
+        yield {"event": "done", "data": {"cached": False, **timings, "total_ms": _elapsed_ms()}}
         return
 
-    # Step 2: Execute query
-    query_results = await execute_query(
-        analysis.get("query_type", "fallback"),
-        analysis.get("entities", {})
-    )
-    
+    # Step 2: Execute query - rows go out before the LLM starts generating
+    state["stage"] = "query"
+    if follow_up and follow_up.rows is not None:
+        query_results = follow_up.rows
+    else:
+        query_results = await execute_query(
+            analysis.get("query_type", "fallback"),
+            analysis.get("entities", {}),
+            deadline
+        )
+    if not query_results:
+        query_results = await retrieve_passages(user_query)
+        timings["retrieval"] = bool(query_results)
+    if record:
+        _note_answer(conversation_id, intent, query_results, user_query)
+    timings["query_ms"] = _elapsed_ms() - timings["intent_ms"]
+    rows = _compact_rows(query_results)
+    yield {"event": "data", "data": {"rows": rows, "row_count": len(query_results)}}
+
     # Step 3: Stream format_response
+    state["stage"] = "llm"
+
+    # Degraded modes: no LLM call while a dependency circuit is open
+    if not query_results and neo4j_breaker.is_open():
+        yield {"event": "text", "data": {"text": DEGRADED_NEO4J_MESSAGE}}
+        yield {"event": "done", "data": {"cached": False, "degraded": "neo4j", **timings, "total_ms": _elapsed_ms()}}
+        return
+    if deadline.expired():
+        yield {"event": "text", "data": {"text": "⏱️ Xin lỗi, câu trả lời mất quá nhiều thời gian. Vui lòng thử lại."}}
+        yield {"event": "done", "data": {"cached": False, "error": "timeout", **timings, "total_ms": _elapsed_ms()}}
+        return
+    if not gemini_breaker.allow():
+        yield {"event": "text", "data": {"text": render_template_answer(query_results)}}
+        yield {"event": "done", "data": {"cached": False, "degraded": "gemini", **timings, "total_ms": _elapsed_ms()}}
+        return
+
     model = genai.GenerativeModel(model_name=GEMINI_MODEL)
     
     if query_results:
@@ -274,6 +783,7 @@ async def chatbot_response_stream(user_query: str, system_prompt: str) -> AsyncG
         2. Ví dụ: 🎓 Du học, 🛂 Visa, 💰 Chi phí, 📅 Thời gian, ✅ Điều kiện, 🏫 Trường học.
         3. Trình bày dạng danh sách (bullet points) dễ đọc.
         """
+    else:
         prompt = f"""
         User: "{user_query}"
         Trả lời dựa trên kiến thức chung về visa/du học Úc.
@@ -283,23 +793,46 @@ async def chatbot_response_stream(user_query: str, system_prompt: str) -> AsyncG
     try:
         # Stream response from Gemini using native async stream
         full_response = ""
-        response_stream = await model.generate_content_async(prompt, stream=True)
+        llm_budget = deadline.budget("llm")
+        llm_ends = time.monotonic() + llm_budget
+        response_stream = await asyncio.wait_for(
+            model.generate_content_async(prompt, stream=True, request_options={"timeout": llm_budget}),
+            llm_budget
+        )
+        state["llm_stream"] = response_stream
         
-        async for chunk in response_stream:
+        chunks = response_stream.__aiter__()
+        while True:
+            # Each chunk must arrive before the request deadline
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), max(llm_ends - time.monotonic(), 0))
+            except StopAsyncIteration:
+                break
             if chunk.text:
+                if "first_text_ms" not in timings:
+                    timings["first_text_ms"] = _elapsed_ms()
                 full_response += chunk.text
-                yield chunk.text
+                yield {"event": "text", "data": {"text": chunk.text}}
         
-        # Cache the complete response
-        _set_cache(cache_key, full_response)
+        gemini_breaker.record_success()
+        # Cache the complete response together with the structured events
+        _set_cache(cache_key, {"intent": intent, "rows": rows, "text": full_response}, data_version)
         
+    except asyncio.TimeoutError:
+        print("⏱️ Gemini stream exceeded the request deadline")
+        gemini_breaker.record_failure()
+        if state["llm_stream"] is not None:
+            await _close_llm_stream(state["llm_stream"])
+        yield {"event": "text", "data": {"text": "\n\n⏱️ Xin lỗi, câu trả lời mất quá nhiều thời gian. Vui lòng thử lại."}}
+        timings["error"] = "timeout"
     except Exception as e:
         import traceback
-        # Write to file instead of print for debugging
+        gemini_breaker.record_failure()
         # Write to file instead of print for debugging
         if "429" in str(e) or "quota" in str(e).lower():
-             yield "⚠️ Hệ thống đang quá tải (Google API Quota Exceeded). Vui lòng thử lại sau."
-             return
+            yield {"event": "text", "data": {"text": "⚠️ Hệ thống đang quá tải (Google API Quota Exceeded). Vui lòng thử lại sau."}}
+            yield {"event": "done", "data": {"cached": False, "error": "quota", **timings, "total_ms": _elapsed_ms()}}
+            return
 
         with open("streaming_error.log", "a", encoding="utf-8") as f:
             f.write(f"\n{'='*60}\n")
@@ -308,4 +841,23 @@ async def chatbot_response_stream(user_query: str, system_prompt: str) -> AsyncG
             f.write(f"Traceback:\n{traceback.format_exc()}\n")
         
         error_msg = "Xin lỗi, tôi gặp lỗi khi xử lý câu hỏi của bạn. Vui lòng thử lại."
-        yield error_msg
+        yield {"event": "text", "data": {"text": error_msg}}
+        timings["error"] = "llm"
+
+    yield {"event": "done", "data": {"cached": False, **timings, "total_ms": _elapsed_ms()}}
+
+
+async def chatbot_response_stream(user_query: str, system_prompt: str) -> AsyncGenerator[str, None]:
+    """
+    Stream chatbot response chunk by chunk for real-time display
+    
+    Args:
+        user_query: User's question
+        system_prompt: System prompt for context
+        
+    Yields:
+        Response chunks as they are generated
+    """
+    async for event in chatbot_event_stream(user_query, system_prompt):
+        if event["event"] == "text":
+            yield event["data"]["text"]
@@ -0,0 +1,121 @@
+"""
+Circuit breakers for the Neo4j and Gemini dependencies
+"""
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from config import (
+    CB_FAILURE_RATE,
+    CB_WINDOW_SECONDS,
+    CB_MIN_CALLS,
+    CB_OPEN_SECONDS,
+    CB_HALF_OPEN_PROBES,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker
+
+    - closed: calls go through; outcomes are kept for CB_WINDOW_SECONDS
+    - open: once at least CB_MIN_CALLS calls in the window failed at
+      CB_FAILURE_RATE or more, calls are refused for CB_OPEN_SECONDS
+    - half_open: then up to CB_HALF_OPEN_PROBES probe calls are let through;
+      a success closes the circuit, a failure opens it again
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.total_opened = 0
+        self._calls: Deque[Tuple[float, bool]] = deque()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > CB_WINDOW_SECONDS:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """True if a call may be made now (counts as a probe when half-open)"""
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < CB_OPEN_SECONDS:
+                return False
+            self.state = HALF_OPEN
+            self.probes_in_flight = 0
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= CB_HALF_OPEN_PROBES:
+                return False
+            self.probes_in_flight += 1
+        return True
+
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at < CB_OPEN_SECONDS
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self._calls.clear()
+        self._calls.append((now, True))
+        self._trim(now)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._open(now)
+            return
+        self._calls.append((now, False))
+        self._trim(now)
+        failures = sum(1 for _, ok in self._calls if not ok)
+        if len(self._calls) >= CB_MIN_CALLS and failures / len(self._calls) >= CB_FAILURE_RATE:
+            self._open(now)
+
+    def record_cancelled(self) -> None:
+        """Call was abandoned (client left) - frees its half-open probe slot"""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.probes_in_flight = 0
+        self.total_opened += 1
+        self._calls.clear()
+        print(f"⚡ Circuit OPEN: {self.name} (retry in {CB_OPEN_SECONDS}s)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State for the health endpoints"""
+        now = time.monotonic()
+        self._trim(now)
+        failures = sum(1 for _, ok in self._calls if not ok)
+        return {
+            "state": HALF_OPEN if self.state == OPEN and not self.is_open() else self.state,
+            "window_calls": len(self._calls),
+            "window_failures": failures,
+            "times_opened": self.total_opened,
+            "retry_in_seconds": max(round(CB_OPEN_SECONDS - (now - self.opened_at), 1), 0) if self.is_open() else 0,
+        }
+
+
+neo4j_breaker = CircuitBreaker("neo4j")
+gemini_breaker = CircuitBreaker("gemini")
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state per dependency, for /health"""
+    return {
+        "neo4j": neo4j_breaker.snapshot(),
+        "gemini": gemini_breaker.snapshot(),
+    }
@@ -0,0 +1,187 @@
+"""
+Per-conversation working memory for multi-turn follow-ups
+
+Keeps the last resolved intent, entities, query_type and rows of each
+conversation (keyed by Conversation.id) so a follow-up such as "còn điều kiện
+của nó?" can be answered without re-running intent detection, and - when it
+asks about the same thing - without another Neo4j round trip.
+"""
+from __future__ import annotations
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import CONTEXT_TTL, CONTEXT_MAX_CONVERSATIONS
+from services.data_version import get_current_data_version
+
+# Anaphora / "what about ..." markers that make a question a follow-up.
+# No bare "it" / "them" / "their": "IT" is a field of study ("Master IT").
+_FOLLOW_UP_RE = re.compile(
+    r"\b(nó|của nó|visa này|visa đó|trường này|trường đó|ngành này|ngành đó|"
+    r"chương trình này|chương trình đó|cái này|cái đó|thế còn|vậy còn|còn về|"
+    r"this one|that one|what about|how about)\b"
+    r"|(?-i:\bits\b)",  # lowercase only ("ITS" is a program name)
+    re.IGNORECASE,
+)
+
+# Pronoun → replacement pattern ({label} = resolved entity), longest first
+_PRONOUNS = [
+    (re.compile(r"\bcủa nó\b", re.IGNORECASE), "của {label}"),
+    (re.compile(r"\b(visa|trường|ngành|chương trình|cái) (này|đó)\b", re.IGNORECASE), "{label}"),
+    (re.compile(r"\bnó\b", re.IGNORECASE), "{label}"),
+    (re.compile(r"\bits\b"), "{label}'s"),
+    (re.compile(r"\b(this one|that one)\b", re.IGNORECASE), "{label}"),
+]
+
+# A question naming its own university / subject is a new question, not a follow-up
+_NEW_ENTITY_RES = [
+    re.compile(r"\b(university|uni|college|institute|đại học|học viện)\b(?!\s+(này|đó)\b)", re.IGNORECASE),
+    re.compile(r"\b(ngành|chuyên ngành|môn|field|major|degree in)\s+(?!này\b|đó\b)\w", re.IGNORECASE),
+    re.compile(r"\b(of|ngành)\s+[A-Z]"),  # "Master of Nursing", "ngành Accounting"
+]
+# Upper-case tokens: university / subject acronyms (UTS, UNSW, IT), except exams and the like
+_ACRONYM_RE = re.compile(r"\b[A-Z][A-Z&]{1,7}\b")
+_NOT_ENTITIES = {"IELTS", "TOEFL", "PTE", "GPA", "PR", "CV", "OK", "AUD", "USD", "VND", "COE", "CAS"}
+
+# Follow-up aspect → visa template for the same $subclass (visa turns only:
+# "yêu cầu" after a program turn means its entry requirements)
+ASPECT_TEMPLATES = {
+    "visa_eligibility": ("điều kiện", "yêu cầu", "eligib", "requirement"),
+    "visa_steps": ("bước", "quy trình", "thủ tục", "step", "process", "apply"),
+    "visa_about": ("là gì", "tổng quan", "overview", "about"),
+}
+
+_SUBCLASS_RE = re.compile(r"\b\d{3}\b")
+
+
+class ConversationContext:
+    """Last resolved turn of one conversation"""
+
+    def __init__(self, analysis: Dict[str, Any], rows: List[Dict[str, Any]]) -> None:
+        self.intent = analysis.get("intent")
+        self.query_type = analysis.get("query_type")
+        self.entities = dict(analysis.get("entities") or {})
+        self.rows = rows
+        self.data_version = get_current_data_version()
+        self.updated = time.monotonic()
+
+    @property
+    def label(self) -> Optional[str]:
+        """Human-readable name of the main entity, used to rewrite pronouns"""
+        e = self.entities
+        subclass = e.get("subclass") or e.get("visa_subclass")
+        if subclass:
+            return f"visa {subclass}"
+        for key in ("university_name", "program_name", "field", "subject_keyword", "category", "keyword"):
+            if e.get(key):
+                return str(e[key])
+        return None
+
+    def analysis(self, query_type: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "intent": self.intent,
+            "query_type": query_type or self.query_type,
+            "entities": dict(self.entities),
+        }
+
+
+class FollowUp:
+    """A follow-up resolved locally against the conversation context"""
+
+    def __init__(self, question: str, analysis: Dict[str, Any], rows: Optional[List[Dict[str, Any]]]) -> None:
+        self.question = question
+        self.analysis = analysis
+        self.rows = rows  # None → run analysis["query_type"] with the carried entities
+
+
+# conversation_id -> context, oldest first
+_contexts: "OrderedDict[int, ConversationContext]" = OrderedDict()
+
+
+def get_context(conversation_id: Optional[int]) -> Optional[ConversationContext]:
+    """Context of a conversation, or None if unknown or older than CONTEXT_TTL"""
+    if conversation_id is None:
+        return None
+    ctx = _contexts.get(conversation_id)
+    if ctx and time.monotonic() - ctx.updated > CONTEXT_TTL:
+        del _contexts[conversation_id]
+        return None
+    return ctx
+
+
+def remember(
+    conversation_id: Optional[int], analysis: Dict[str, Any], rows: List[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Store the resolved turn; evicts the least recently used conversations
+
+    Returns the query_type of the previous turn (None for a new conversation).
+    """
+    if conversation_id is None or not analysis.get("query_type"):
+        return None
+    previous = get_context(conversation_id)
+    _contexts[conversation_id] = ConversationContext(analysis, rows)
+    _contexts.move_to_end(conversation_id)
+    while len(_contexts) > CONTEXT_MAX_CONVERSATIONS:
+        _contexts.popitem(last=False)
+    return previous.query_type if previous else None
+
+
+def forget(conversation_id: int) -> None:
+    _contexts.pop(conversation_id, None)
+
+
+def _names_new_entity(question: str, ctx: ConversationContext, label: str) -> bool:
+    """True if the question names a subclass, university or subject other than the remembered one"""
+    # An explicit different subclass
+    subclass = str(ctx.entities.get("subclass") or ctx.entities.get("visa_subclass") or "")
+    if any(num != subclass for num in _SUBCLASS_RE.findall(question)):
+        return True
+    known = " ".join([label] + [str(v) for v in ctx.entities.values() if v]).upper()
+    if any(token not in _NOT_ENTITIES and token not in known for token in _ACRONYM_RE.findall(question)):
+        return True
+    return any(pattern.search(question) for pattern in _NEW_ENTITY_RES)
+
+
+def _aspect_template(question: str) -> Optional[str]:
+    q = question.lower()
+    for template, keywords in ASPECT_TEMPLATES.items():
+        if any(k in q for k in keywords):
+            return template
+    return None
+
+
+def resolve_follow_up(
+    conversation_id: Optional[int], question: str, templates: Dict[str, Any]
+) -> Optional[FollowUp]:
+    """
+    Resolve a follow-up question locally (no LLM call)
+
+    Returns None when there is no context, the question names a new entity
+    (subclass, university or subject) or the previous turn had no entity to
+    refer back to.
+    Otherwise pronouns are rewritten to the remembered entity; after a visa
+    turn a new aspect ("điều kiện", "các bước"...) switches to that template
+    for the same subclass, anything else reuses the remembered rows.
+    """
+    ctx = get_context(conversation_id)
+    if not ctx or not _FOLLOW_UP_RE.search(question):
+        return None
+
+    # Without a named entity the pronoun cannot be resolved locally
+    label = ctx.label
+    if not label or _names_new_entity(question, ctx, label):
+        return None
+
+    resolved = question
+    for pattern, replacement in _PRONOUNS:
+        resolved = pattern.sub(replacement.format(label=label), resolved)
+
+    aspect = _aspect_template(question) if ctx.entities.get("subclass") else None
+    if aspect and aspect != ctx.query_type and aspect in templates:
+        return FollowUp(resolved, ctx.analysis(aspect), None)
+    if ctx.data_version != get_current_data_version():
+        # Graph re-imported since: same query, fresh rows
+        return FollowUp(resolved, ctx.analysis(), None)
+    return FollowUp(resolved, ctx.analysis(), ctx.rows)
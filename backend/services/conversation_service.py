@@ -0,0 +1,107 @@
+"""Conversation service for database operations using SQLAlchemy."""
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from models.database import Conversation, Message
+from services.conversation_context import forget
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for (timestamp, id)"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class ConversationService:
+    """Service class for conversation-related database operations (SQLAlchemy)."""
+
+    @staticmethod
+    def create_conversation(db: Session, user_id: int, title: Optional[str] = None) -> Conversation:
+        conversation = Conversation(
+            user_id=user_id,
+            title=title or "New Chat",
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        db.add(conversation)
+        db.commit()
+        db.refresh(conversation)
+        return conversation
+
+    @staticmethod
+    def get_conversation(db: Session, conversation_id: int, user_id: int) -> Optional[Conversation]:
+        """Conversation owned by user_id, or None"""
+        conversation = db.get(Conversation, conversation_id)
+        if not conversation or conversation.user_id != user_id:
+            return None
+        return conversation
+
+    @staticmethod
+    def delete_conversation(db: Session, conversation_id: int, user_id: int) -> bool:
+        conversation = ConversationService.get_conversation(db, conversation_id, user_id)
+        if not conversation:
+            return False
+        db.delete(conversation)
+        db.commit()
+        forget(conversation_id)
+        return True
+
+    @staticmethod
+    def list_conversations(
+        db: Session, user_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Conversation], Optional[str]]:
+        """
+        A user's conversations, most recently active first (keyset pagination)
+
+        Uses ix_conversations_user_updated_id; cost does not grow with the page number.
+        """
+        stmt = select(Conversation).where(Conversation.user_id == user_id)
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Conversation.updated_at, Conversation.id) < (updated_at, conversation_id))
+        stmt = stmt.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).limit(limit + 1)
+
+        rows = list(db.execute(stmt).scalars())
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+        return rows, next_cursor
+
+    @staticmethod
+    def list_messages(
+        db: Session, conversation_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Message], Optional[str]]:
+        """
+        Messages of a conversation, newest page first (keyset pagination)
+
+        Walks ix_messages_conversation_created_id backwards from `cursor`; the
+        page itself is returned oldest first, ready to render.
+        """
+        stmt = select(Message).where(Message.conversation_id == conversation_id)
+        if cursor:
+            created_at, message_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Message.created_at, Message.id) < (created_at, message_id))
+        stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+
+        rows = list(db.execute(stmt).scalars())
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        rows.reverse()
+        return rows, next_cursor
@@ -0,0 +1,116 @@
+"""
+Graph data version - changes whenever the knowledge graph content changes
+
+Each import script (import_visa, import_settlement, import_study,
+import_cross_rel) bumps its own (:DataVersion {subgraph}) node when it
+finishes. The API reads these few nodes (one cheap query), combines them into
+one version string and keys the answer and query-result caches on it, so
+cached entries stay valid until the next import and never longer.
+
+Graphs imported before DataVersion nodes existed fall back to a fingerprint
+of the label / relationship type counts.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from config import NEO4J_DATABASE
+from services.neo4j_exec import connect_neo4j
+
+# Subgraphs bumped by the import scripts (bump_data_version() in each script)
+SUBGRAPHS = ("visa", "settlement", "study", "cross_rel")
+
+# Version the caches are currently keyed on (set at startup and on change)
+_current: Dict[str, Optional[str]] = {"version": None}
+
+
+def get_current_data_version() -> Optional[str]:
+    return _current["version"]
+
+
+def set_current_data_version(version: Optional[str]) -> None:
+    _current["version"] = version
+
+
+def fetch_subgraph_versions() -> Optional[Dict[str, int]]:
+    """{subgraph: version} from the DataVersion nodes; None if Neo4j is unavailable"""
+    driver = connect_neo4j()
+    if not driver:
+        return None
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            return {
+                r["subgraph"]: r["version"]
+                for r in session.run("MATCH (d:DataVersion) RETURN d.subgraph AS subgraph, d.version AS version")
+            }
+    except Exception as e:
+        print(f"Data version error: {e}")
+        return None
+    finally:
+        driver.close()
+
+
+def count_store(session) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    ({label: node count}, {type: relationship count}), sorted by name
+
+    Two round trips whatever the schema: the label / type names, then one
+    UNION ALL statement whose branches are single label / single type counts,
+    each answered from the count store (no scan).
+    """
+    names = session.run(
+        "CALL { CALL db.labels() YIELD label RETURN collect(label) AS labels } "
+        "CALL { CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS types } "
+        "RETURN labels, types"
+    ).single()
+    labels, types = sorted(names["labels"]), sorted(names["types"])
+    branches, params = [], {}
+    for i, label in enumerate(labels):
+        params[f"l{i}"] = label
+        branches.append(f"MATCH (n:{_quote(label)}) RETURN 'label' AS kind, $l{i} AS name, count(n) AS c")
+    for i, rel_type in enumerate(types):
+        params[f"t{i}"] = rel_type
+        branches.append(f"MATCH ()-[r:{_quote(rel_type)}]->() RETURN 'type' AS kind, $t{i} AS name, count(r) AS c")
+    counts: Dict[str, Dict[str, int]] = {"label": {}, "type": {}}
+    if branches:
+        for r in session.run(" UNION ALL ".join(branches), **params):
+            counts[r["kind"]][r["name"]] = r["c"]
+    return {label: counts["label"][label] for label in labels}, {t: counts["type"][t] for t in types}
+
+
+def _quote(name: str) -> str:
+    """Backtick-quote a label / relationship type name"""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _fingerprint() -> Optional[str]:
+    """
+    Fingerprint of the graph: node count per label and relationship count per
+    type (count_store - two small statements). None if Neo4j is unavailable.
+    """
+    driver = connect_neo4j()
+    if not driver:
+        return None
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            label_counts, type_counts = count_store(session)
+        parts = [f"{name}={count}" for counts in (label_counts, type_counts) for name, count in counts.items()]
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+    except Exception as e:
+        print(f"Data version error: {e}")
+        return None
+    finally:
+        driver.close()
+
+
+def fetch_data_version() -> Optional[str]:
+    """
+    Combined version of all subgraphs, e.g. "visa=3,settlement=1,study=5,cross_rel=2".
+    None if Neo4j is unavailable.
+    """
+    versions = fetch_subgraph_versions()
+    if versions is None:
+        return None
+    if not versions:
+        return _fingerprint()
+    return ",".join(f"{name}={versions.get(name, 0)}" for name in SUBGRAPHS)
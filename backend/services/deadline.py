@@ -0,0 +1,115 @@
+"""
+Per-request deadline budget and hedged calls for the chatbot pipeline
+"""
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from config import (
+    REQUEST_DEADLINE_SECONDS,
+    INTENT_BUDGET_SHARE,
+    QUERY_BUDGET_SHARE,
+    MIN_STAGE_SECONDS,
+)
+
+# Share of the total budget each stage may use; the LLM answer gets what is left
+STAGE_SHARES: Dict[str, float] = {
+    "intent": INTENT_BUDGET_SHARE,
+    "query": QUERY_BUDGET_SHARE,
+}
+
+
+class Deadline:
+    """
+    Time budget for one chat request, split across pipeline stages
+
+    A stage gets min(its share of the total, time remaining), so a slow intent
+    call cannot eat the LLM answer budget and no stage can outlive the request.
+    """
+
+    def __init__(self, total_seconds: float = REQUEST_DEADLINE_SECONDS) -> None:
+        self.total = total_seconds
+        self.expires_at = time.monotonic() + total_seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def budget(self, stage: str) -> float:
+        """
+        Seconds allowed for `stage` (never below MIN_STAGE_SECONDS), 0 once the
+        deadline has passed - callers skip the stage instead of overrunning
+        """
+        if self.expired():
+            return 0.0
+        share = STAGE_SHARES.get(stage)
+        limit = self.remaining() if share is None else min(self.total * share, self.remaining())
+        return max(limit, MIN_STAGE_SECONDS)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies, used to pick the hedge delay"""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """q-th percentile (0-1) or None until enough samples are collected"""
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def hedged_call(
+    make_call: Callable[[], Awaitable[Any]],
+    hedge_after: float,
+    timeout: float,
+) -> Any:
+    """
+    Run `make_call()`; if it has not finished after `hedge_after` seconds, fire a
+    second identical call and return whichever succeeds first
+
+    Only slowness is hedged: a primary that fails before `hedge_after` (e.g. a
+    429) raises its error without a backup call. The loser is cancelled.
+    Raises asyncio.TimeoutError after `timeout` seconds (at once if it is 0),
+    or the last error if every attempt failed.
+    """
+    if timeout <= 0:
+        raise asyncio.TimeoutError()
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    tasks = {asyncio.ensure_future(make_call())}
+    hedged = False
+    error: Optional[BaseException] = None
+    try:
+        while tasks:
+            wait_for = end - loop.time()
+            if not hedged:
+                wait_for = min(wait_for, hedge_after)
+            if wait_for <= 0 and hedged:
+                raise asyncio.TimeoutError()
+
+            done, tasks = await asyncio.wait(tasks, timeout=max(wait_for, 0), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+
+            if not hedged and not done and loop.time() < end:
+                # Primary is still running after hedge_after: send the backup request
+                tasks.add(asyncio.ensure_future(make_call()))
+                hedged = True
+            elif loop.time() >= end:
+                raise asyncio.TimeoutError()
+        raise error if error else asyncio.TimeoutError()
+    finally:
+        for task in tasks:
+            task.cancel()
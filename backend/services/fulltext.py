@@ -0,0 +1,114 @@
+"""
+Full-text indexes for keyword templates
+
+Keyword templates look nodes up with db.index.fulltext.queryNodes instead of
+`toLower(x.name) CONTAINS toLower($keyword)` (a full label scan lowering every
+value). The indexes are created on startup (IF NOT EXISTS, so existing ones are
+kept) with FULLTEXT_ANALYZER. The default "standard-no-stop-words" splits on
+Unicode word boundaries (Vietnamese syllables and English words alike) and
+keeps stop-word-like keywords such as "IT"; "standard-folding" additionally
+folds diacritics ("Hà Nội" and "ha noi" match) but drops English stop words.
+
+Template params used as full-text queries have the type `search`; validate()
+turns the user's keyword into a Lucene query with to_fulltext_query().
+"""
+from __future__ import annotations
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from config import FULLTEXT_ANALYZER, FULLTEXT_AWAIT_SECONDS, NEO4J_DATABASE
+from services.neo4j_exec import connect_neo4j
+
+# name -> (labels, properties)
+FULLTEXT_INDEXES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "program_fulltext": (("Program",), ("name", "description")),
+    "subject_fulltext": (("Subject",), ("name",)),
+    "study_category_fulltext": (("StudyCategory",), ("name",)),
+    "university_fulltext": (("University",), ("name",)),
+    "visa_fulltext": (("Visa",), ("name_visa", "subclass")),
+    "about_info_fulltext": (("AboutInfo",), ("content",)),
+    "settlement_category_fulltext": (("SettlementCategory",), ("name",)),
+    "settlement_page_fulltext": (("SettlementPage",), ("title", "url")),
+    "section_fulltext": (
+        ("MainSection", "Subsection", "DetailSection", "SpecificSection", "InfoSection"),
+        ("title", "key"),
+    ),
+}
+
+# Lucene's English stop words: analyzers that drop them never match `of*`
+STOP_WORD_ANALYZERS = {"standard", "standard-folding", "english", "classic", "stop"}
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it",
+    "no", "not", "of", "on", "or", "such", "that", "the", "their", "then", "there", "these",
+    "they", "this", "to", "was", "will", "with",
+}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _normalize(text: str) -> str:
+    """
+    Lower case, without diacritics for folding analyzers - prefix terms (`word*`)
+    bypass the analyzer, so they must already look like the indexed tokens
+    """
+    text = text.lower()
+    if not FULLTEXT_ANALYZER.endswith("folding"):
+        return text
+    text = unicodedata.normalize('NFKD', text.replace('đ', 'd'))
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def to_fulltext_query(value: str) -> str:
+    """
+    Lucene query for a user keyword: the phrase, or every word as a prefix
+
+    "Computer Science" → "computer science" OR (computer* AND science*)
+
+    Query syntax in the input (quotes, AND, *, :) is not interpreted - only
+    word characters survive. Raises ValueError if no words are left.
+    """
+    tokens = _TOKEN_RE.findall(_normalize(str(value)).replace('_', ' '))
+    if not tokens:
+        raise ValueError("no searchable words")
+    stop_words = STOP_WORDS if FULLTEXT_ANALYZER in STOP_WORD_ANALYZERS else set()
+    prefixes = [f"{t}*" for t in tokens if t not in stop_words] or tokens
+    if len(tokens) == 1:
+        return prefixes[0]
+    return f"\"{' '.join(tokens)}\" OR ({' AND '.join(prefixes)})"
+
+
+def _create_statement(name: str, labels: Tuple[str, ...], properties: Tuple[str, ...]) -> str:
+    props = ", ".join(f"n.{p}" for p in properties)
+    return (
+        f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR (n:{'|'.join(labels)}) ON EACH [{props}] "
+        f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+    )
+
+
+def ensure_fulltext_indexes() -> Optional[List[str]]:
+    """
+    Create the missing full-text indexes and wait (up to FULLTEXT_AWAIT_SECONDS)
+    for them to come online; returns the names created, None if Neo4j is unavailable
+    """
+    driver = connect_neo4j()
+    if not driver:
+        return None
+    try:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            existing = {r["name"] for r in session.run("SHOW FULLTEXT INDEXES YIELD name RETURN name")}
+            created = []
+            for name, (labels, properties) in FULLTEXT_INDEXES.items():
+                if name in existing:
+                    continue
+                session.run(_create_statement(name, labels, properties)).consume()
+                created.append(name)
+            if created:
+                session.run("CALL db.awaitIndexes($timeout)", timeout=int(FULLTEXT_AWAIT_SECONDS)).consume()
+                print(f"🔎 Full-text indexes created: {', '.join(created)}")
+            return created
+    except Exception as e:
+        print(f"Full-text index error: {e}")
+        return None
+    finally:
+        driver.close()
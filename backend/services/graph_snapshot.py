@@ -0,0 +1,475 @@
+"""
+Read-only in-process graph snapshot for hot templates
+
+The study and visa subgraphs are small enough for RAM, so the templates asked
+most often do not need a round trip to Neo4j. After each import (data version
+change) the labels in SNAPSHOT_NODES and the relationships in SNAPSHOT_EDGES
+are exported to GRAPH_SNAPSHOT_DIR:
+
+- <Label>.<property>.npy   int32 codes into values.json (-1 = null); one row
+                           per node, the row number is the node's id in the
+                           snapshot (elementId is kept as a column too)
+- <TYPE>.out.indptr.npy    CSR adjacency per relationship type, both
+  <TYPE>.out.indices.npy   directions (int32)
+  <TYPE>.in.indptr.npy
+  <TYPE>.in.indices.npy
+- meta.json                data version, node counts, edge specs
+
+The API opens the arrays memory-mapped at startup. SNAPSHOT_TEMPLATES maps
+template names to Python versions of the same query returning the same rows
+(column names, grouping, ordering, LIMIT); execute_query() uses them while the
+snapshot matches the current data version and falls back to Neo4j otherwise.
+Templates not listed (ad-hoc shapes, full-text search) always go to Neo4j.
+
+numpy is optional: without it the snapshot is off.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import GRAPH_SNAPSHOT_DIR, GRAPH_SNAPSHOT_ENABLED, NEO4J_DATABASE
+from services.neo4j_exec import connect_neo4j
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# label -> exported properties
+SNAPSHOT_NODES: Dict[str, Tuple[str, ...]] = {
+    "University": ("name",),
+    "Program": ("name", "program_type", "url", "starting_months"),
+    "StudyCategory": ("name",),
+    "ExamScore": ("value",),
+    "Exam": ("name",),
+    "Visa": ("name_visa", "subclass", "type", "url"),
+    "AboutInfo": ("field", "content"),
+    "EligibilityGroup": ("group_key",),
+    "EligibilityRequirement": ("key", "content"),
+    "VisaStep": ("step_order", "title", "code", "body", "url"),
+}
+
+# relationship type -> (start label, end label)
+SNAPSHOT_EDGES: Dict[str, Tuple[str, str]] = {
+    "AT_UNIVERSITY": ("Program", "University"),  # shortcut written by import_study.py
+    "IN_STUDY_CATEGORY": ("Program", "StudyCategory"),
+    "HAS_REQUIRED": ("Program", "ExamScore"),
+    "HAS_SCORE": ("Exam", "ExamScore"),
+    "HAS_ABOUT_INFO": ("Visa", "AboutInfo"),
+    "HAS_ELIGIBILITY_GROUP": ("Visa", "EligibilityGroup"),
+    "HAS_REQUIREMENT": ("EligibilityGroup", "EligibilityRequirement"),
+    "HAS_STEP": ("Visa", "VisaStep"),
+}
+
+ID_COLUMN = "elementId"
+
+_state: Dict[str, Any] = {"snapshot": None, "last_build": None, "error": None}
+_build_lock = threading.Lock()
+
+
+def snapshot_available() -> bool:
+    return GRAPH_SNAPSHOT_ENABLED and np is not None
+
+
+def _value_key(value: Any) -> str:
+    # JSON text keeps 1, 1.0, "1" and true apart and makes lists hashable
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _plain(value: Any) -> Any:
+    """Neo4j value as JSON (temporal and spatial values become strings)"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+def _csr(sources: "np.ndarray", targets: "np.ndarray", n: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+class GraphSnapshot:
+    """Memory-mapped node columns and CSR adjacency, with lookups by property value"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(directory, "values.json"), "r", encoding="utf-8") as f:
+            self.values: List[Any] = json.load(f)
+        self.columns: Dict[Tuple[str, str], "np.ndarray"] = {}
+        for label, properties in self.meta["labels"].items():
+            for prop in [ID_COLUMN, *properties]:
+                self.columns[(label, prop)] = self._load(f"{label}.{prop}.npy")
+        self.adjacency: Dict[Tuple[str, str], Tuple["np.ndarray", "np.ndarray"]] = {}
+        for rel_type in self.meta["edges"]:
+            for direction in ("out", "in"):
+                self.adjacency[(rel_type, direction)] = (
+                    self._load(f"{rel_type}.{direction}.indptr.npy"),
+                    self._load(f"{rel_type}.{direction}.indices.npy"),
+                )
+        self._codes = {_value_key(v): code for code, v in enumerate(self.values)}
+        self._lookups: Dict[Tuple[str, str], Dict[int, List[int]]] = {}
+        self._lookup_lock = threading.Lock()
+
+    def _load(self, name: str) -> "np.ndarray":
+        return np.load(os.path.join(self.directory, name), mmap_mode="r")
+
+    @property
+    def data_version(self) -> Optional[str]:
+        return self.meta.get("data_version")
+
+    def count(self, label: str) -> int:
+        return int(self.meta["labels_count"][label])
+
+    def get(self, label: str, node: int, prop: str) -> Any:
+        code = int(self.columns[(label, prop)][node])
+        return None if code < 0 else self.values[code]
+
+    def find(self, label: str, prop: str, value: Any) -> List[int]:
+        """Nodes with label whose prop equals value (an index built on first use)"""
+        code = self._codes.get(_value_key(value))
+        if code is None:
+            return []
+        key = (label, prop)
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            with self._lookup_lock:
+                lookup = self._lookups.get(key)
+                if lookup is None:
+                    lookup = {}
+                    for node, c in enumerate(self.columns[key].tolist()):
+                        if c >= 0:
+                            lookup.setdefault(c, []).append(node)
+                    self._lookups[key] = lookup
+        return lookup.get(code, [])
+
+    def out(self, rel_type: str, node: int) -> List[int]:
+        indptr, indices = self.adjacency[(rel_type, "out")]
+        return indices[indptr[node]:indptr[node + 1]].tolist()
+
+    def into(self, rel_type: str, node: int) -> List[int]:
+        indptr, indices = self.adjacency[(rel_type, "in")]
+        return indices[indptr[node]:indptr[node + 1]].tolist()
+
+
+def build_graph_snapshot(data_version: Optional[str], directory: str = GRAPH_SNAPSHOT_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Export the snapshot labels and relationships from Neo4j, write the arrays
+    and open them; returns build stats, None if unavailable or Neo4j is down
+    """
+    if not snapshot_available():
+        return None
+    driver = connect_neo4j()
+    if not driver:
+        return None
+    with _build_lock:
+        started = time.perf_counter()
+        try:
+            values: List[Any] = []
+            codes: Dict[str, int] = {}
+
+            def intern(value: Any) -> int:
+                if value is None:
+                    return -1
+                value = _plain(value)
+                key = _value_key(value)
+                if key not in codes:
+                    codes[key] = len(values)
+                    values.append(value)
+                return codes[key]
+
+            columns: Dict[str, List[int]] = {}
+            positions: Dict[str, Dict[str, int]] = {}
+            edges: Dict[str, Tuple[List[int], List[int]]] = {}
+            with driver.session(database=NEO4J_DATABASE) as session:
+                for label, properties in SNAPSHOT_NODES.items():
+                    fields = "".join(f", n.{p} AS {p}" for p in properties)
+                    rows = list(session.run(f"MATCH (n:{label}) RETURN elementId(n) AS id{fields}"))
+                    positions[label] = {r["id"]: i for i, r in enumerate(rows)}
+                    columns[f"{label}.{ID_COLUMN}"] = [intern(r["id"]) for r in rows]
+                    for prop in properties:
+                        columns[f"{label}.{prop}"] = [intern(r[prop]) for r in rows]
+                for rel_type, (start, end) in SNAPSHOT_EDGES.items():
+                    sources, targets = [], []
+                    for r in session.run(
+                        f"MATCH (a:{start})-[:{rel_type}]->(b:{end}) RETURN elementId(a) AS a, elementId(b) AS b"
+                    ):
+                        sources.append(positions[start][r["a"]])
+                        targets.append(positions[end][r["b"]])
+                    edges[rel_type] = (sources, targets)
+
+            os.makedirs(directory, exist_ok=True)
+            tmp = f"{directory}.tmp"
+            os.makedirs(tmp, exist_ok=True)
+            for name, column in columns.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(column, dtype=np.int32))
+            for rel_type, (sources, targets) in edges.items():
+                start, end = SNAPSHOT_EDGES[rel_type]
+                src = np.asarray(sources, dtype=np.int64)
+                dst = np.asarray(targets, dtype=np.int64)
+                for direction, (a, b, n) in {
+                    "out": (src, dst, len(positions[start])),
+                    "in": (dst, src, len(positions[end])),
+                }.items():
+                    indptr, indices = _csr(a, b, n)
+                    np.save(os.path.join(tmp, f"{rel_type}.{direction}.indptr.npy"), indptr)
+                    np.save(os.path.join(tmp, f"{rel_type}.{direction}.indices.npy"), indices)
+            with open(os.path.join(tmp, "values.json"), "w", encoding="utf-8") as f:
+                json.dump(values, f, ensure_ascii=False)
+            meta = {
+                "data_version": data_version,
+                "built_at": time.time(),
+                "labels": {label: list(props) for label, props in SNAPSHOT_NODES.items()},
+                "labels_count": {label: len(p) for label, p in positions.items()},
+                "edges": {rel_type: [*SNAPSHOT_EDGES[rel_type], len(e[0])] for rel_type, e in edges.items()},
+            }
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            # meta.json last: a reader never sees new metadata with old arrays
+            for name in sorted(os.listdir(tmp), key=lambda n: n == "meta.json"):
+                os.replace(os.path.join(tmp, name), os.path.join(directory, name))
+            os.rmdir(tmp)
+
+            _state["snapshot"] = GraphSnapshot(directory)
+            stats = {
+                "nodes": sum(meta["labels_count"].values()),
+                "relationships": sum(len(e[0]) for e in edges.values()),
+                "values": len(values),
+                "data_version": data_version,
+                "build_s": round(time.perf_counter() - started, 2),
+            }
+            _state.update(last_build=stats, error=None)
+            print(f"🗺️ Graph snapshot built: {stats}")
+            return stats
+        except Exception as e:
+            print(f"Graph snapshot build error: {e}")
+            _state["error"] = str(e)
+            return None
+        finally:
+            driver.close()
+
+
+def load_graph_snapshot(directory: str = GRAPH_SNAPSHOT_DIR) -> bool:
+    """Open the snapshot on disk; False if there is none"""
+    if not snapshot_available() or not os.path.exists(os.path.join(directory, "meta.json")):
+        return False
+    try:
+        snapshot = GraphSnapshot(directory)
+        if set(snapshot.meta["labels"]) != set(SNAPSHOT_NODES) or set(snapshot.meta["edges"]) != set(SNAPSHOT_EDGES):
+            print("Graph snapshot ignored: exported with a different schema")
+            return False
+        _state["snapshot"] = snapshot
+        print(f"🗺️ Graph snapshot loaded ({snapshot.data_version})")
+        return True
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Graph snapshot not loaded: {e}")
+        return False
+
+
+def get_snapshot() -> Optional[GraphSnapshot]:
+    return _state["snapshot"]
+
+
+# Template handlers: same rows as the Cypher in cypher_queries_v2.cypher
+
+def _order_key(value: Any) -> Tuple[bool, Any]:
+    # Cypher ORDER BY ... ASC puts nulls last
+    return (value is None, value if value is not None else 0)
+
+
+def _group(rows: List[Tuple[Tuple[Any, ...], Any]]) -> List[Tuple[Tuple[Any, ...], List[Any]]]:
+    """Cypher implicit grouping: collected values per distinct key, in first-seen order"""
+    keys: Dict[str, Tuple[Any, ...]] = {}
+    groups: Dict[str, List[Any]] = {}
+    for key, value in rows:
+        hashable = _value_key(key)  # keys may hold lists (starting_months)
+        keys.setdefault(hashable, key)
+        groups.setdefault(hashable, []).append(value)
+    return [(keys[k], values) for k, values in groups.items()]
+
+
+def _university_programs(s: GraphSnapshot, university_name: str, level: Optional[str] = None) -> List[Tuple[int, int]]:
+    """(university, program) per (u)<-[:AT_UNIVERSITY]-(p {program_type: level}) match"""
+    return [
+        (u, p)
+        for u in s.find("University", "name", university_name)
+        for p in s.into("AT_UNIVERSITY", u)
+        if level is None or s.get("Program", p, "program_type") == level
+    ]
+
+
+def _exam_scores(s: GraphSnapshot, program: int) -> List[Tuple[Optional[int], Optional[int]]]:
+    """OPTIONAL MATCH (p)-[:HAS_REQUIRED]->(es:ExamScore)<-[:HAS_SCORE]-(e:Exam)"""
+    pairs = [(es, e) for es in s.out("HAS_REQUIRED", program) for e in s.into("HAS_SCORE", es)]
+    return pairs or [(None, None)]
+
+
+def _categories(s: GraphSnapshot, program: int) -> List[Optional[int]]:
+    """OPTIONAL MATCH (p)-[:IN_STUDY_CATEGORY]->(cat:StudyCategory)"""
+    return s.out("IN_STUDY_CATEGORY", program) or [None]
+
+
+def _opt(s: GraphSnapshot, label: str, node: Optional[int], prop: str) -> Any:
+    return None if node is None else s.get(label, node, prop)
+
+
+def _visa_about(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for v in s.find("Visa", "subclass", params["subclass"]):
+        key = tuple(s.get("Visa", v, p) for p in ("name_visa", "subclass", "type", "url"))
+        for a in s.out("HAS_ABOUT_INFO", v) or [None]:
+            rows.append((key, {"field": _opt(s, "AboutInfo", a, "field"), "content": _opt(s, "AboutInfo", a, "content")}))
+    return [
+        {"visa_name": k[0], "subclass": k[1], "visa_type": k[2], "official_url": k[3], "about_information": about}
+        for k, about in _group(rows)
+    ]
+
+
+def _visa_eligibility(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for v in s.find("Visa", "subclass", params["subclass"]):
+        for eg in s.out("HAS_ELIGIBILITY_GROUP", v):
+            key = (s.get("Visa", v, "name_visa"), s.get("EligibilityGroup", eg, "group_key"))
+            for er in s.out("HAS_REQUIREMENT", eg):
+                rows.append((key, {
+                    "key": s.get("EligibilityRequirement", er, "key"),
+                    "content": s.get("EligibilityRequirement", er, "content"),
+                }))
+    result = [
+        {"visa_name": k[0], "requirement_group": k[1], "requirements": reqs}
+        for k, reqs in _group(rows)
+    ]
+    return sorted(result, key=lambda r: _order_key(r["requirement_group"]))
+
+
+def _visa_steps(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for v in s.find("Visa", "subclass", params["subclass"]):
+        for step in s.out("HAS_STEP", v):
+            rows.append({
+                "visa_name": s.get("Visa", v, "name_visa"),
+                "step_number": s.get("VisaStep", step, "step_order"),
+                "step_title": s.get("VisaStep", step, "title"),
+                "step_code": s.get("VisaStep", step, "code"),
+                "step_description": s.get("VisaStep", step, "body"),
+                "step_url": s.get("VisaStep", step, "url"),
+            })
+    return sorted(rows, key=lambda r: _order_key(r["step_number"]))
+
+
+def _visa_eligibility_groups_analysis(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for v in s.find("Visa", "subclass", params["subclass"]):
+        for eg in s.out("HAS_ELIGIBILITY_GROUP", v):
+            for er in s.out("HAS_REQUIREMENT", eg):
+                rows.append(((s.get("EligibilityGroup", eg, "group_key"),), s.get("EligibilityRequirement", er, "content")))
+    groups = [
+        {
+            "group_name": k[0],
+            "requirement_count": len(contents),
+            "sample_requirements": [c for c in contents if c is not None][:3],
+        }
+        for k, contents in _group(rows)
+    ]
+    return sorted(groups, key=lambda r: -r["requirement_count"])[:10]
+
+
+def _count_programs_by_university(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"total_programs": len(_university_programs(s, params["university_name"]))}]
+
+
+def _program_existence_for_university(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for u in s.find("University", "name", params["university_name"]):
+        exists = any(s.get("Program", p, "name") == params["program_name"] for p in s.into("AT_UNIVERSITY", u))
+        rows.append({"program_exists": exists})
+    return rows
+
+
+def _export_programs_by_university(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for u, p in _university_programs(s, params["university_name"]):
+        for cat in _categories(s, p):
+            key = (
+                s.get("University", u, "name"),
+                s.get("Program", p, "program_type"),
+                s.get("Program", p, "name"),
+                _opt(s, "StudyCategory", cat, "name"),
+                s.get("Program", p, "starting_months"),
+                s.get("Program", p, "url"),
+            )
+            for es, e in _exam_scores(s, p):
+                exam, value = _opt(s, "Exam", e, "name"), _opt(s, "ExamScore", es, "value")
+                rows.append((key, None if exam is None or value is None else f"{exam}: {value}"))
+    result = []
+    for k, requirements in _group(rows):
+        distinct = list(dict.fromkeys(r for r in requirements if r is not None))
+        result.append({
+            "University": k[0], "Level": k[1], "Program": k[2], "Category": k[3],
+            "StartingMonths": k[4], "Requirements": distinct, "URL": k[5],
+        })
+    return sorted(result, key=lambda r: (_order_key(r["Level"]), _order_key(r["Program"])))
+
+
+def _context_aware_more_programs(s: GraphSnapshot, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for _, p in _university_programs(s, params["previous_university"], params["previous_level"]):
+        name = s.get("Program", p, "name")
+        if name is None or name == params["previous_program"]:
+            continue
+        for cat in _categories(s, p):
+            key = (name, s.get("Program", p, "program_type"), _opt(s, "StudyCategory", cat, "name"), s.get("Program", p, "url"))
+            for es, e in _exam_scores(s, p):
+                rows.append((key, {"exam": _opt(s, "Exam", e, "name"), "score": _opt(s, "ExamScore", es, "value")}))
+    return [
+        {"program": k[0], "level": k[1], "category": k[2], "requirements": reqs, "url": k[3]}
+        for k, reqs in _group(rows)
+    ][:5]
+
+
+SNAPSHOT_TEMPLATES: Dict[str, Callable[[GraphSnapshot, Dict[str, Any]], List[Dict[str, Any]]]] = {
+    "visa_about": _visa_about,
+    "visa_eligibility": _visa_eligibility,
+    "visa_steps": _visa_steps,
+    "visa_eligibility_groups_analysis": _visa_eligibility_groups_analysis,
+    "count_programs_by_university": _count_programs_by_university,
+    "program_existence_for_university": _program_existence_for_university,
+    "export_programs_by_university": _export_programs_by_university,
+    "context_aware_more_programs": _context_aware_more_programs,
+}
+
+
+def snapshot_rows(template_name: str, params: Dict[str, Any], data_version: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Rows for a template from the snapshot; None when the template is not
+    served from it or the snapshot is missing or older than data_version
+    """
+    snapshot: Optional[GraphSnapshot] = _state["snapshot"]
+    handler = SNAPSHOT_TEMPLATES.get(template_name)
+    if snapshot is None or handler is None or snapshot.data_version != data_version:
+        return None
+    try:
+        return handler(snapshot, params)
+    except Exception as e:
+        print(f"Graph snapshot query error ({template_name}): {e}")
+        return None
+
+
+def get_snapshot_stats() -> Dict[str, Any]:
+    snapshot: Optional[GraphSnapshot] = _state["snapshot"]
+    return {
+        "enabled": snapshot_available(),
+        "data_version": snapshot.data_version if snapshot else None,
+        "nodes": snapshot.meta["labels_count"] if snapshot else {},
+        "templates": sorted(SNAPSHOT_TEMPLATES),
+        "last_build": _state["last_build"],
+        "error": _state["error"],
+    }
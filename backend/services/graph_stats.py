@@ -0,0 +1,95 @@
+"""
+Graph statistics for /api/chatbot/stats and /api/admin/neo4j/stats
+
+Node counts per label and relationship counts per type are read from the
+count store (services/data_version.count_store - no scan) once per graph
+data version and kept in memory. When the version moves (after an import)
+the counts are refreshed in a worker thread; requests meanwhile get the
+previous counts instead of waiting. Each copy carries an ETag derived from
+the counts, so clients polling the endpoints get 304 Not Modified until the
+graph changes.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import NEO4J_DATABASE
+from services.data_version import count_store, get_current_data_version
+from services.neo4j_exec import connect_neo4j
+
+_state: Dict[str, Any] = {
+    "stats": None,  # {data_version, labels, types, computed_at, etag}
+    "error": None,
+}
+_refresh_lock = threading.Lock()
+_background: set = set()  # running refreshes (referenced until done)
+
+
+def refresh_graph_stats(data_version: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Count nodes per label and relationships per type; None if Neo4j is unavailable"""
+    with _refresh_lock:
+        current = _state["stats"]
+        if current is not None and current["data_version"] == data_version:
+            return current  # refreshed by a concurrent caller
+        driver = connect_neo4j()
+        if not driver:
+            return None
+        try:
+            with driver.session(database=NEO4J_DATABASE) as session:
+                labels, types = count_store(session)
+            digest = hashlib.sha1(json.dumps([labels, types]).encode("utf-8")).hexdigest()[:16]
+            _state["stats"] = {
+                "data_version": data_version,
+                "labels": labels,
+                "types": types,
+                "computed_at": time.time(),
+                "etag": f'"{digest}"',
+            }
+            _state["error"] = None
+            return _state["stats"]
+        except Exception as e:
+            print(f"Graph stats error: {e}")
+            _state["error"] = str(e)
+            return None
+        finally:
+            driver.close()
+
+
+def _schedule_refresh(data_version: Optional[str]) -> None:
+    if _background:
+        return
+    task = asyncio.create_task(asyncio.to_thread(refresh_graph_stats, data_version))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def get_graph_stats() -> Optional[Dict[str, Any]]:
+    """
+    Cached counts; computed on the first call, refreshed in the background
+    when the data version changed. None if they were never computed
+    (Neo4j unavailable).
+    """
+    data_version = get_current_data_version()
+    stats = _state["stats"]
+    if stats is None:
+        return await asyncio.to_thread(refresh_graph_stats, data_version)
+    if stats["data_version"] != data_version:
+        _schedule_refresh(data_version)
+    return stats
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header names the current ETag (weak comparison, or *)"""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def sorted_counts(counts: Dict[str, int], key: str) -> List[Dict[str, Any]]:
+    """[{key: name, "count": n}] largest first (admin stats shape)"""
+    return [{key: name, "count": count} for name, count in sorted(counts.items(), key=lambda x: -x[1])]
@@ -0,0 +1,145 @@
+"""
+Heavy-hitter tracking for the chat pipeline
+
+A count-min sketch estimates how often any key was seen in constant memory;
+a top-K heap keeps the hottest keys. Counts are halved every HH_DECAY_SECONDS
+so the trackers follow current traffic rather than all-time totals.
+
+Trackers:
+    question_tracker - normalized questions
+    intent_tracker   - intent / query_type
+    entity_tracker   - resolved entities ("subclass=500")
+    cache_frequency  - cache key lookups (admission and TTL extension, no top-K)
+"""
+from __future__ import annotations
+import hashlib
+import heapq
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import HH_WIDTH, HH_DEPTH, HH_TOP_K, HH_DECAY_SECONDS, HH_HOT_MIN_COUNT
+from services.answer_bank import normalize_question
+
+
+class CountMinSketch:
+    """depth x width counters; estimate = min over rows (never under-counts)"""
+
+    def __init__(self, width: int = HH_WIDTH, depth: int = HH_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self.depth).digest()
+        return [int.from_bytes(digest[i * 8:(i + 1) * 8], "little") % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Add and return the new estimate"""
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate or 0
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def halve(self) -> None:
+        for row in self.rows:
+            for i in range(self.width):
+                row[i] >>= 1
+
+
+class HeavyHitterTracker:
+    """Count-min sketch plus a top-K min-heap of the keys with the highest estimates"""
+
+    def __init__(self, name: str, k: int = HH_TOP_K, width: int = HH_WIDTH, depth: int = HH_DEPTH) -> None:
+        self.name = name
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.total = 0
+        self._top: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []  # (estimate, key); may hold stale entries
+        self._last_decay = time.monotonic()
+
+    def _maybe_decay(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decay < HH_DECAY_SECONDS:
+            return
+        self._last_decay = now
+        self.sketch.halve()
+        self.total >>= 1
+        self._top = {key: count >> 1 for key, count in self._top.items() if count >> 1 > 0}
+        self._heap = [(count, key) for key, count in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, key: str) -> int:
+        self._maybe_decay()
+        self.total += 1
+        estimate = self.sketch.add(key)
+        if not self.k:
+            return estimate
+
+        if key in self._top or len(self._top) < self.k:
+            self._top[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+        else:
+            # Drop stale heap entries until the top is a live minimum
+            while self._heap and self._top.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if self._heap and estimate > self._heap[0][0]:
+                _, evicted = heapq.heappop(self._heap)
+                del self._top[evicted]
+                self._top[key] = estimate
+                heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, top_key) for top_key, count in self._top.items()]
+            heapq.heapify(self._heap)
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return self.sketch.estimate(key)
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)[: n or self.k]
+        return [{"key": key, "count": count} for key, count in ranked]
+
+
+question_tracker = HeavyHitterTracker("questions")
+intent_tracker = HeavyHitterTracker("intents")
+entity_tracker = HeavyHitterTracker("entities")
+cache_frequency = HeavyHitterTracker("cache_keys", k=0)
+
+
+def track_answer(question: str, analysis: Dict[str, Any]) -> None:
+    """Count one answered question with its intent and resolved entities"""
+    question_tracker.add(normalize_question(question))
+    if analysis.get("query_type"):
+        intent_tracker.add(f"{analysis.get('intent')}/{analysis['query_type']}")
+    for name, value in (analysis.get("entities") or {}).items():
+        if isinstance(value, (str, int, float)) and value != "":
+            entity_tracker.add(f"{name}={str(value).lower()}")
+
+
+def is_hot(cache_key: str) -> bool:
+    """Cache key looked up at least HH_HOT_MIN_COUNT times in the current window"""
+    return cache_frequency.estimate(cache_key) >= HH_HOT_MIN_COUNT
+
+
+def hot_questions(n: int) -> List[str]:
+    """Hottest normalized questions, e.g. for cache warm-up"""
+    return [item["key"] for item in question_tracker.top(n)]
+
+
+def get_heavy_hitters(limit: int = 20) -> Dict[str, Any]:
+    """Snapshot for the admin endpoint"""
+    return {
+        "questions": question_tracker.top(limit),
+        "intents": intent_tracker.top(limit),
+        "entities": entity_tracker.top(limit),
+        "totals": {
+            "questions": question_tracker.total,
+            "cache_lookups": cache_frequency.total,
+        },
+        "sketch": {"width": HH_WIDTH, "depth": HH_DEPTH, "top_k": HH_TOP_K, "decay_seconds": HH_DECAY_SECONDS},
+    }
@@ -0,0 +1,276 @@
+"""
+Index advisor for the knowledge graph
+
+Statically collects the label/property lookups the code relies on:
+
+- Cypher templates: inline property maps `(v:Visa {subclass: $subclass})`,
+  WHERE comparisons (`=`, `IN`, `<`, ...) → RANGE index; `CONTAINS` /
+  `STARTS WITH` / `ENDS WITH` on a bare property → TEXT index; `USING INDEX`
+  hints → RANGE index (the query fails without it). A function around the
+  property (`toLower(p.name) CONTAINS ...`) defeats any index and is reported
+  as unindexable instead.
+- Import scripts: MERGE keys → uniqueness constraints (MERGE looks the node up
+  by exactly these keys on every row).
+
+The lookups are compared with SHOW INDEXES (constraint-backed indexes carry
+their owningConstraint); missing ones
+become DDL. scripts/index_advisor.py prints or applies it and can PROFILE the
+affected templates before and after to compare db hits.
+"""
+from __future__ import annotations
+import glob
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from services.query_loader import QueryRegistry, QueryTemplate, _strip_literals, query_registry
+from services.query_plans import representative_params
+
+# PROFILE executes the templates: scripts only run it here without --allow-remote
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+IMPORT_SCRIPTS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'import_*.py')))
+
+# Long free-text MERGE keys: too large for an index key, not worth a constraint
+LONG_TEXT_PROPERTIES = {"content", "body", "description"}
+
+_NODE_RE = re.compile(r'\((\w*)\s*:\s*`?(\w+)`?(?::`?\w+`?)*\s*(\{[^{}]*\})?', re.DOTALL)
+_MAP_KEY_RE = re.compile(r'(\w+)\s*:')
+_MERGE_NODE_RE = re.compile(r'MERGE\s*\((\w*)\s*:\s*`?(\w+)`?\s*(\{[^{}]*\})', re.DOTALL)
+_USING_INDEX_RE = re.compile(r'USING\s+(?:TEXT\s+|RANGE\s+)?INDEX\s+\w+\s*:\s*`?(\w+)`?\s*\(([^)]*)\)', re.IGNORECASE)
+_COMPARE_RE = re.compile(r'\b(\w+)\.(\w+)\s*(?:=|<>|<=|>=|<(?!-)|>|\bIN\b)', re.IGNORECASE)
+_TEXT_RE = re.compile(r'\b(\w+)\.(\w+)\s+(?:CONTAINS|STARTS\s+WITH|ENDS\s+WITH)\b', re.IGNORECASE)
+_WRAPPED_RE = re.compile(r'\b(\w+)\(\s*(\w+)\.(\w+)\s*\)\s*(?:CONTAINS|STARTS\s+WITH|ENDS\s+WITH|=)', re.IGNORECASE)
+_CLAUSE_RE = re.compile(r'\b(WHERE|RETURN|WITH|ORDER\s+BY|MATCH|OPTIONAL\s+MATCH|UNWIND|CALL|LIMIT|SKIP|SET|MERGE|CREATE)\b', re.IGNORECASE)
+
+
+class Lookup:
+    """One label/property access pattern and where it comes from"""
+
+    def __init__(self, kind: str, label: str, properties: Tuple[str, ...]) -> None:
+        self.kind = kind  # range | text | unique | unindexable
+        self.label = label
+        self.properties = properties
+        self.sources: List[str] = []
+        self.note: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        return (self.kind, self.label, self.properties)
+
+    @property
+    def name(self) -> str:
+        prefix = {"range": "idx", "text": "txt", "unique": "uniq"}.get(self.kind, "x")
+        return f"{prefix}_{self.label}_{'_'.join(self.properties)}".lower()
+
+    def ddl(self) -> Optional[str]:
+        props = ", ".join(f"n.{p}" for p in self.properties)
+        if self.kind == "range":
+            return f"CREATE INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON ({props})"
+        if self.kind == "text":
+            return f"CREATE TEXT INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON (n.{self.properties[0]})"
+        if self.kind == "unique":
+            target = props if len(self.properties) == 1 else f"({props})"
+            return f"CREATE CONSTRAINT {self.name} IF NOT EXISTS FOR (n:{self.label}) REQUIRE {target} IS UNIQUE"
+        return None
+
+
+def _add(found: Dict[Tuple, Lookup], kind: str, label: str, properties: Iterable[str], source: str) -> Lookup:
+    lookup = Lookup(kind, label, tuple(properties))
+    lookup = found.setdefault(lookup.key, lookup)
+    if source not in lookup.sources:
+        lookup.sources.append(source)
+    return lookup
+
+
+def _where_parts(text: str) -> List[str]:
+    """Text of each WHERE clause (up to the next clause keyword)"""
+    parts = []
+    for match in re.finditer(r'\bWHERE\b', text, re.IGNORECASE):
+        rest = text[match.end():]
+        end = _CLAUSE_RE.search(rest)
+        parts.append(rest[:end.start()] if end else rest)
+    return parts
+
+
+def template_lookups(template: QueryTemplate, found: Dict[Tuple, Lookup]) -> None:
+    for statement in template.statements:
+        text = _strip_literals(statement)
+        labels: Dict[str, str] = {}
+        for var, label, props in _NODE_RE.findall(text):
+            if var:
+                labels.setdefault(var, label)
+            if props:
+                for prop in _MAP_KEY_RE.findall(props):
+                    _add(found, "range", label, [prop], template.name)
+
+        for label, props in _USING_INDEX_RE.findall(text):
+            lookup = _add(found, "range", label, [p.strip() for p in props.split(",")], template.name)
+            lookup.note = "required by a USING INDEX hint"
+
+        for where in _where_parts(text):
+            for func, var, prop in _WRAPPED_RE.findall(where):
+                if var in labels:
+                    lookup = _add(found, "unindexable", labels[var], [prop], template.name)
+                    lookup.note = f"{func}() on the property defeats indexes - use a full-text index or a normalized property"
+            for var, prop in _TEXT_RE.findall(where):
+                if var in labels:
+                    _add(found, "text", labels[var], [prop], template.name)
+            for var, prop in _COMPARE_RE.findall(where):
+                if var in labels:
+                    _add(found, "range", labels[var], [prop], template.name)
+
+
+def import_merge_lookups(paths: Iterable[str], found: Dict[Tuple, Lookup]) -> None:
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        name = os.path.basename(path)
+        for _, label, props in _MERGE_NODE_RE.findall(source):
+            keys = tuple(_MAP_KEY_RE.findall(props))
+            if not keys:
+                continue
+            long_text = [k for k in keys if k in LONG_TEXT_PROPERTIES]
+            if long_text:
+                lookup = _add(found, "unindexable", label, keys, name)
+                lookup.note = f"MERGE key includes long text ({', '.join(long_text)}) - no constraint suggested"
+                continue
+            _add(found, "unique", label, keys, name)
+
+
+def collect_lookups(templates: Optional[Iterable[QueryTemplate]] = None, import_scripts: Iterable[str] = IMPORT_SCRIPTS) -> List[Lookup]:
+    """All lookups from the runnable templates and the import scripts' MERGE keys"""
+    found: Dict[Tuple, Lookup] = {}
+    if templates is None:
+        templates = [query_registry.entry(name) for name in query_registry]
+    for template in templates:
+        if template.runnable:
+            template_lookups(template, found)
+    import_merge_lookups(import_scripts, found)
+    # A uniqueness constraint is backed by a range index on the same keys
+    unique_keys = {(l.label, l.properties) for l in found.values() if l.kind == "unique"}
+    return sorted(
+        (l for l in found.values() if not (l.kind == "range" and (l.label, l.properties) in unique_keys)),
+        key=lambda l: (l.label, l.properties, l.kind),
+    )
+
+
+def fetch_schema(session) -> List[Dict[str, Any]]:
+    """Existing node indexes (constraint-backed ones included) from SHOW INDEXES"""
+    rows = session.run(
+        "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, state, owningConstraint "
+        "WHERE entityType = 'NODE' RETURN name, type, labelsOrTypes, properties, state, owningConstraint"
+    )
+    return [r.data() for r in rows]
+
+
+def is_covered(lookup: Lookup, indexes: List[Dict[str, Any]]) -> Optional[str]:
+    """Name of an existing index serving the lookup, or None"""
+    for index in indexes:
+        if lookup.label not in (index.get("labelsOrTypes") or []):
+            continue
+        props = tuple(index.get("properties") or [])
+        index_type = str(index.get("type") or "").upper()
+        if lookup.kind == "unique":
+            if index.get("owningConstraint") and props == lookup.properties:
+                return index["name"]
+        elif lookup.kind == "text":
+            # A range index also serves STARTS WITH, TEXT serves all three
+            if index_type == "TEXT" and props == lookup.properties:
+                return index["name"]
+        elif index_type in ("RANGE", "BTREE") and props[:len(lookup.properties)] == lookup.properties:
+            return index["name"]
+    return None
+
+
+def advise(session=None) -> List[Dict[str, Any]]:
+    """
+    Every lookup with its status: covered (by index name), missing (with DDL)
+    or unindexable. Without a session only the static analysis is returned.
+    """
+    indexes = fetch_schema(session) if session is not None else None
+    report = []
+    for lookup in collect_lookups():
+        entry: Dict[str, Any] = {
+            "kind": lookup.kind,
+            "label": lookup.label,
+            "properties": list(lookup.properties),
+            "sources": lookup.sources,
+            "note": lookup.note,
+        }
+        if lookup.kind == "unindexable":
+            entry["status"] = "unindexable"
+        elif indexes is None:
+            entry.update(status="unknown", ddl=lookup.ddl())
+        else:
+            covered_by = is_covered(lookup, indexes)
+            entry.update(status="covered", index=covered_by) if covered_by else entry.update(status="missing", ddl=lookup.ddl())
+        report.append(entry)
+    return report
+
+
+def _sum_db_hits(profile: Optional[Dict[str, Any]]) -> int:
+    if not profile:
+        return 0
+    return int(profile.get("dbHits", 0)) + sum(_sum_db_hits(c) for c in profile.get("children") or [])
+
+
+def profile_db_hits(session, template: QueryTemplate, params: Dict[str, Any]) -> Optional[int]:
+    """Total db hits of one PROFILE run; None if the template failed"""
+    try:
+        summary = session.run(f"PROFILE {template.statements[0]}", params).consume()
+    except Exception as e:
+        print(f"  PROFILE {template.name} failed: {e}")
+        return None
+    return _sum_db_hits(summary.profile)
+
+
+def is_local_uri(uri: str) -> bool:
+    return urlparse(uri).hostname in LOCAL_HOSTS
+
+
+def profile_templates(session, names: Iterable[str], registry: QueryRegistry = query_registry) -> Dict[str, Optional[int]]:
+    """PROFILE db hits of the named runnable templates of `registry`, with representative params"""
+    hits = {}
+    for name in names:
+        template = registry.entry(name)
+        if template is not None and template.runnable:
+            hits[name] = profile_db_hits(session, template, representative_params(template))
+    return hits
+
+
+def format_comparison(
+    names: Iterable[str],
+    before: Dict[str, Optional[int]],
+    after: Dict[str, Optional[int]],
+    before_label: str = "db hits before",
+    after_label: str = "db hits now",
+) -> List[str]:
+    """Table rows comparing two profile_templates results, with a total over the templates in both"""
+    lines = [f"{'template':<55} {before_label:>15} {after_label:>12} {'change':>8}"]
+    total_before = total_after = 0
+    for name in names:
+        b, a = before.get(name), after.get(name)
+        if b is not None and a is not None:
+            total_before += b
+            total_after += a
+        change = f"{(a - b) / b * 100:+.0f}%" if b and a is not None else "-"
+        lines.append(f"{name:<55} {b if b is not None else '-':>15} {a if a is not None else '-':>12} {change:>8}")
+    if total_before:
+        change = f"{(total_after - total_before) / total_before * 100:+.0f}%"
+        lines.append(f"{'TOTAL (templates in both)':<55} {total_before:>15} {total_after:>12} {change:>8}")
+    return lines
+
+
+def apply_ddl(session, statements: Iterable[str]) -> List[Tuple[str, Optional[str]]]:
+    """Run each DDL statement; returns (statement, error or None). Waits for the indexes to come online."""
+    results = []
+    for statement in statements:
+        try:
+            session.run(statement).consume()
+            results.append((statement, None))
+        except Exception as e:
+            results.append((statement, str(e)))
+    session.run("CALL db.awaitIndexes(300)").consume()
+    return results
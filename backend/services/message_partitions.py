@@ -0,0 +1,197 @@
+"""
+Monthly range partitions of the `messages` table and archival of old months
+
+- ensure_partitions(): creates messages_yYYYYmMM for last month .. N months
+  ahead plus a DEFAULT partition, so inserts never fail
+- archive_partitions(): detaches months older than the retention window,
+  exports them to gzip-compressed CSV files and drops them
+- migrate_to_partitioned(): converts a pre-partitioning `messages` table
+"""
+from __future__ import annotations
+import asyncio
+import csv
+import gzip
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from config import (
+    MESSAGE_PARTITION_MONTHS_AHEAD,
+    MESSAGE_RETENTION_MONTHS,
+    MESSAGE_ARCHIVE_DIR,
+    MESSAGE_AUTO_ARCHIVE,
+)
+from models.database import Message, engine
+
+_PARTITION_RE = re.compile(r"^messages_y(\d{4})m(\d{2})$")
+DEFAULT_PARTITION = "messages_default"
+
+
+def _add_months(month: date, n: int) -> date:
+    total = month.year * 12 + month.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"messages_y{month.year:04d}m{month.month:02d}"
+
+
+def _is_partitioned(conn) -> Optional[bool]:
+    """True/False for a partitioned/plain `messages` table, None if it does not exist"""
+    kind = conn.execute(text(
+        "SELECT c.relkind FROM pg_class c "
+        "WHERE c.relname = 'messages' AND c.relnamespace = 'public'::regnamespace"
+    )).scalar()
+    return None if kind is None else kind == "p"
+
+
+def _create_month(conn, month: date) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF messages "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    ))
+
+
+def ensure_partitions(months_ahead: int = MESSAGE_PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create missing monthly partitions (last month .. months_ahead) and the default one"""
+    current = date.today().replace(day=1)
+    created = []
+    with engine.begin() as conn:
+        if not _is_partitioned(conn):
+            print("⚠️ messages is not partitioned - run scripts/manage_messages.py migrate")
+            return created
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF messages DEFAULT"))
+        for offset in range(-1, months_ahead + 1):
+            month = _add_months(current, offset)
+            # A savepoint per month: rows already in the default partition for
+            # that range make CREATE fail, which must not abort the others
+            try:
+                with conn.begin_nested():
+                    _create_month(conn, month)
+                created.append(partition_name(month))
+            except Exception as e:
+                print(f"⚠️ Could not create {partition_name(month)}: {e}")
+    return created
+
+
+def list_partitions() -> List[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'messages' ORDER BY c.relname"
+        )).scalars()
+        return list(rows)
+
+
+def _export_gzip(table: str, path: str) -> int:
+    """COPY a detached partition to a gzip CSV file; returns the number of rows written"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+            cursor.copy_expert(f"COPY {table} TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+        cursor.execute(f"SELECT count(*) FROM {table}")
+        expected = cursor.fetchone()[0]
+        raw.commit()
+    finally:
+        raw.close()
+
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        written = sum(1 for _ in csv.reader(f)) - 1  # header
+    if written != expected:
+        raise RuntimeError(f"{path}: exported {written} rows, expected {expected}")
+    return written
+
+
+def archive_partitions(
+    retention_months: int = MESSAGE_RETENTION_MONTHS, archive_dir: str = MESSAGE_ARCHIVE_DIR
+) -> List[str]:
+    """
+    Move monthly partitions older than `retention_months` to compressed files
+
+    Each partition is detached first (queries stop seeing it immediately), then
+    exported to <archive_dir>/<partition>.csv.gz, verified and dropped. A failed
+    export leaves the detached table in place for a retry.
+    """
+    cutoff = _add_months(date.today().replace(day=1), -retention_months)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    for table in list_partitions():
+        match = _PARTITION_RE.match(table)
+        if not match or date(int(match.group(1)), int(match.group(2)), 1) >= cutoff:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {table}"))
+
+    # Also picks up tables detached by an earlier run whose export failed
+    with engine.connect() as conn:
+        detached = conn.execute(text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relname ~ '^messages_y[0-9]{4}m[0-9]{2}$' AND c.relkind = 'r' AND NOT c.relispartition"
+        )).scalars().all()
+
+    done = []
+    for table in sorted(set(detached)):
+        path = os.path.join(archive_dir, f"{table}.csv.gz")
+        try:
+            rows = _export_gzip(table, path)
+        except Exception as e:
+            print(f"✗ Archive of {table} failed, kept detached: {e}")
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {table}"))
+        print(f"✓ Archived {table}: {rows} rows → {path}")
+        done.append(table)
+    return done
+
+
+def migrate_to_partitioned() -> bool:
+    """
+    Convert a plain `messages` table (created before partitioning) in place
+
+    Copies the rows into the new partitioned table and drops the old one, in a
+    single transaction. Returns False if there was nothing to migrate.
+    """
+    with engine.begin() as conn:
+        if _is_partitioned(conn) is not False:
+            return False
+        conn.execute(text("ALTER TABLE messages RENAME TO messages_legacy"))
+        conn.execute(text("ALTER INDEX IF EXISTS messages_pkey RENAME TO messages_legacy_pkey"))
+        conn.execute(text("ALTER INDEX IF EXISTS ix_messages_id RENAME TO ix_messages_legacy_id"))
+        conn.execute(text("ALTER SEQUENCE IF EXISTS messages_id_seq RENAME TO messages_legacy_id_seq"))
+        Message.__table__.create(conn)
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF messages DEFAULT"))
+
+        first = conn.execute(text("SELECT min(created_at) FROM messages_legacy")).scalar()
+        month = (first.date() if first else date.today()).replace(day=1)
+        last = _add_months(date.today().replace(day=1), MESSAGE_PARTITION_MONTHS_AHEAD)
+        while month <= last:
+            _create_month(conn, month)
+            month = _add_months(month, 1)
+
+        conn.execute(text(
+            "INSERT INTO messages (id, conversation_id, role, content, created_at) "
+            "SELECT id, conversation_id, role, content, COALESCE(created_at, now()) FROM messages_legacy"
+        ))
+        conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('messages', 'id'), COALESCE(max(id), 0) + 1, false) FROM messages"
+        ))
+        conn.execute(text("DROP TABLE messages_legacy"))
+    return True
+
+
+async def partition_maintenance_loop(interval_seconds: float = 24 * 3600) -> None:
+    """Daily: create upcoming partitions (and archive old ones if MESSAGE_AUTO_ARCHIVE)"""
+    while True:
+        try:
+            await asyncio.to_thread(ensure_partitions)
+            if MESSAGE_AUTO_ARCHIVE:
+                await asyncio.to_thread(archive_partitions)
+        except Exception as e:
+            print(f"Partition maintenance error ({datetime.now():%Y-%m-%d %H:%M}): {e}")
+        await asyncio.sleep(interval_seconds)
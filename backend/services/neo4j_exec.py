@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
-from neo4j import GraphDatabase, Driver
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase, Driver
 from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 
 def connect_neo4j() -> Optional[Driver]:
@@ -13,6 +13,16 @@ def connect_neo4j() -> Optional[Driver]:
         return GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
     return None
 
+def connect_neo4j_async() -> Optional[AsyncDriver]:
+    """Async driver - cancelling the awaiting task also cancels the running query
+
+    Returns:
+        Optional[AsyncDriver]: None if Neo4j is not configured
+    """
+    if NEO4J_URI and NEO4J_USER and NEO4J_PASSWORD:
+        return AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    return None
+
 def execute_cypher(driver: Optional[Driver], cypher: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
     """_summary_
 
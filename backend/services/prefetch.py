@@ -0,0 +1,288 @@
+"""
+Predictive prefetch of likely follow-up queries
+
+After each answer, the templates users most often ask next (learned from the
+query log, seeded with known pairs such as visa about → eligibility / steps /
+related settlement) are run in the background with the same entities, so the
+follow-up is served from the query-result cache.
+
+Prefetching is throttled: one query at a time, only while no foreground query
+is running, only while the Neo4j circuit is closed, and jobs are dropped when
+the queue is full. Query log entries have their own writer (batched appends),
+so a busy prefetch queue never costs a log line; the log is rotated to
+`<path>.1` at QUERY_LOG_MAX_BYTES.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    ENABLE_PREFETCH,
+    PREFETCH_TOP_K,
+    PREFETCH_QUEUE_SIZE,
+    PREFETCH_IDLE_WAIT_SECONDS,
+    PREFETCH_TIMEOUT_SECONDS,
+    QUERY_LOG_PATH,
+    QUERY_LOG_MAX_LINES,
+    QUERY_LOG_MAX_BYTES,
+    QUERY_LOG_PENDING_MAX,
+)
+from services.answer_bank import normalize_question
+from services.query_loader import query_registry
+
+# Known follow-up pairs (canonical template names; v1 names are aliases of
+# these, default-query names cover the fallback set); weight 1 each, learned
+# transitions from the query log are added on top
+SEED_TRANSITIONS: Dict[str, List[str]] = {
+    "visa_about": [
+        "visa_eligibility",
+        "visa_steps",
+        "visa_related_settlement_info",  # HAS_RELEVANT_SETTLEMENT_CATEGORY, any subclass
+    ],
+    "visa_eligibility": ["visa_steps", "visa_eligibility_groups_analysis"],
+    "find_programs_by_university_subject_level": [
+        "find_programs_by_ielts",
+        "find_programs_by_intake_month",
+        "complete_program_info",
+    ],
+    "visa_info": ["visa_eligibility"],
+    "find_programs_by_university": ["find_programs_by_ielts"],
+}
+
+_PARAM_RE = re.compile(r"\$(\w+)")
+
+# query_type -> Counter(next query_type)
+_transitions: Dict[str, Counter] = defaultdict(Counter)
+
+# Foreground queries in flight; prefetch waits for this to reach 0
+_foreground = 0
+
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+# Query log entries not yet appended, and the task appending them
+_log_pending: List[Dict[str, Any]] = []
+_log_writer: Optional[asyncio.Task] = None
+
+_prefetch_metrics: Dict[str, int] = {"scheduled": 0, "run": 0, "skipped": 0, "dropped": 0, "log_dropped": 0}
+
+
+def read_query_log(max_lines: int = QUERY_LOG_MAX_LINES) -> List[Dict[str, Any]]:
+    """Last `max_lines` entries of the query log (also used by warm-up and the answer bank job)"""
+    lines: deque = deque(maxlen=max_lines)
+    # The rotated file holds the older lines
+    for path in (f"{QUERY_LOG_PATH}.1", QUERY_LOG_PATH):
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines.extend(f)
+        except OSError as e:
+            print(f"Query log read error: {e}")
+
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def top_logged_questions(n: int, min_count: int = 1) -> List[Tuple[str, str, int]]:
+    """Most frequent logged questions: [(normalized, most common surface form, count)]"""
+    counts: Counter = Counter()
+    forms: Dict[str, Counter] = defaultdict(Counter)
+    for entry in read_query_log():
+        question = entry.get("question")
+        if not question:
+            continue
+        key = normalize_question(question)
+        counts[key] += 1
+        forms[key][question.strip()] += 1
+    return [
+        (key, forms[key].most_common(1)[0][0], count)
+        for key, count in counts.most_common(n)
+        if count >= min_count
+    ]
+
+
+def top_logged_queries(n: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """Most frequent (query_type, entities) pairs in the query log"""
+    counts: Counter = Counter()
+    for entry in read_query_log():
+        if entry.get("query_type") and entry.get("entities") is not None:
+            counts[(entry["query_type"], json.dumps(entry["entities"], sort_keys=True, default=str))] += 1
+    return [(query_type, json.loads(entities)) for (query_type, entities), _ in counts.most_common(n)]
+
+
+def _load_transitions() -> None:
+    """Seed the transition table, then add consecutive pairs from the query log"""
+    for source, targets in SEED_TRANSITIONS.items():
+        for target in targets:
+            _transitions[source][target] += 1
+
+    entries = read_query_log()
+    last_by_conversation: Dict[Any, str] = {}
+    for entry in entries:
+        conversation_id, query_type = entry.get("conversation_id"), entry.get("query_type")
+        if conversation_id is None or not query_type:
+            continue
+        template = query_registry.entry(query_type)  # older logs hold v1 names
+        query_type = template.name if template else query_type
+        previous = last_by_conversation.get(conversation_id)
+        if previous and previous != query_type:
+            _transitions[previous][query_type] += 1
+        last_by_conversation[conversation_id] = query_type
+    if entries:
+        print(f"Loaded query transitions from {len(entries)} log lines")
+
+
+_load_transitions()
+
+
+def _append_log(entries: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(QUERY_LOG_PATH) or ".", exist_ok=True)
+    if os.path.exists(QUERY_LOG_PATH) and os.path.getsize(QUERY_LOG_PATH) >= QUERY_LOG_MAX_BYTES:
+        os.replace(QUERY_LOG_PATH, f"{QUERY_LOG_PATH}.1")
+    with open(QUERY_LOG_PATH, "a", encoding="utf-8") as f:
+        f.writelines(json.dumps(entry, ensure_ascii=False, default=str) + "\n" for entry in entries)
+
+
+def _log_query(entry: Dict[str, Any]) -> None:
+    """Queue one log entry; a single writer task appends everything pending"""
+    global _log_writer
+    if len(_log_pending) >= QUERY_LOG_PENDING_MAX:
+        _prefetch_metrics["log_dropped"] += 1
+        return
+    _log_pending.append(entry)
+    if _log_writer is None or _log_writer.done():
+        _log_writer = asyncio.get_running_loop().create_task(_write_log())
+
+
+async def _write_log() -> None:
+    while _log_pending:
+        batch = _log_pending[:]
+        del _log_pending[:]
+        try:
+            await asyncio.to_thread(_append_log, batch)
+        except OSError as e:
+            print(f"Query log write error: {e}")
+
+
+def record_transition(previous: Optional[str], query_type: Optional[str]) -> None:
+    """Learn one observed follow-up in-process (the log covers restarts)"""
+    if previous and query_type and previous != query_type:
+        _transitions[previous][query_type] += 1
+
+
+def predict_next(query_type: str, entities: Dict[str, Any], templates: Dict[str, str]) -> List[str]:
+    """Most likely next templates whose parameters are all known from `entities`"""
+    candidates = []
+    for target, _ in _transitions.get(query_type, Counter()).most_common():
+        template = templates.get(target)
+        if not template or target == query_type:
+            continue
+        if all(name in entities for name in _PARAM_RE.findall(template)):
+            candidates.append(target)
+        if len(candidates) >= PREFETCH_TOP_K:
+            break
+    return candidates
+
+
+@contextmanager
+def foreground_query() -> Iterator[None]:
+    """Marks a user-facing Neo4j query as running (prefetch yields to it)"""
+    global _foreground
+    _foreground += 1
+    try:
+        yield
+    finally:
+        _foreground -= 1
+
+
+def schedule_prefetch(
+    conversation_id: Optional[int],
+    analysis: Dict[str, Any],
+    previous_query_type: Optional[str],
+    templates: Dict[str, str],
+    question: Optional[str] = None,
+) -> None:
+    """
+    Log the answered query, learn the transition and queue likely follow-ups
+
+    Must be called from the event loop; never blocks the caller.
+    """
+    query_type = analysis.get("query_type")
+    entities = analysis.get("entities") or {}
+    if not query_type or query_type not in templates:
+        return
+
+    record_transition(previous_query_type, query_type)
+
+    global _queue, _worker
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=PREFETCH_QUEUE_SIZE)
+    if _worker is None or _worker.done():
+        _worker = asyncio.get_running_loop().create_task(_run_worker())
+
+    _log_query({
+        "ts": time.time(),
+        "conversation_id": conversation_id,
+        "query_type": query_type,
+        "entities": entities,
+        "question": question,
+    })
+    if not ENABLE_PREFETCH:
+        return
+    for target in predict_next(query_type, entities, templates):
+        try:
+            _queue.put_nowait((target, entities))
+            _prefetch_metrics["scheduled"] += 1
+        except asyncio.QueueFull:
+            _prefetch_metrics["dropped"] += 1
+
+
+async def _run_worker() -> None:
+    """Single background consumer - at most one prefetch query at a time"""
+    from services.chatbot_service import execute_query, has_cached_rows
+    from services.circuit_breaker import CLOSED, neo4j_breaker
+    from services.deadline import Deadline
+
+    while True:
+        query_type, entities = await _queue.get()
+        try:
+            if has_cached_rows(query_type, entities):
+                _prefetch_metrics["skipped"] += 1
+                continue
+
+            # Yield to user requests; give up if the system stays busy
+            waited = 0.0
+            while _foreground > 0 and waited < PREFETCH_IDLE_WAIT_SECONDS:
+                await asyncio.sleep(0.1)
+                waited += 0.1
+            if _foreground > 0 or neo4j_breaker.state != CLOSED:
+                _prefetch_metrics["dropped"] += 1
+                continue
+
+            await execute_query(query_type, entities, Deadline(PREFETCH_TIMEOUT_SECONDS), background=True)
+            _prefetch_metrics["run"] += 1
+        except Exception as e:
+            print(f"Prefetch error: {e}")
+        finally:
+            _queue.task_done()
+
+
+def get_prefetch_metrics() -> Dict[str, Any]:
+    return {
+        **_prefetch_metrics,
+        "queued": _queue.qsize() if _queue else 0,
+        "log_pending": len(_log_pending),
+        "enabled": ENABLE_PREFETCH,
+    }
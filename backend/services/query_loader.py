@@ -1,78 +1,440 @@
 """
-Query loader - Load Cypher queries from cypher_queries.cypher file
+Query loader - compiled registry of the Cypher templates
+
+Both template files are compiled once into QueryTemplate entries:
+
+- cypher_queries_v2.cypher: entries start with `-- name: <name>` (canonical names)
+- cypher_queries.cypher:    entries start with `// N.N. TITLE`; the slug of the
+  title (the v1 name, e.g. xem_điều_kiện_đủ_điều_kiện_eligibility) becomes an
+  alias of the v2 entry with the same title, or an entry of its own
+
+An entry runs until the next entry marker, blank lines and comments included.
+Parameters ($name) get a type inferred from how they are used (or declared
+with `// @param name: type` in the header comments); validate() checks and
+coerces incoming params before a query reaches Neo4j. `search` params (full-text
+index queries) are turned into escaped Lucene queries.
+
+The registry re-compiles when a file changes (checked at most every
+QUERY_RELOAD_SECONDS) and caches the compiled entries in
+QUERY_REGISTRY_CACHE_PATH, so a restart with unchanged files skips parsing.
 """
+from __future__ import annotations
+import hashlib
+import json
 import os
 import re
-from typing import Dict
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import QUERY_REGISTRY_CACHE_PATH, QUERY_RELOAD_SECONDS
+from services.fulltext import to_fulltext_query
+
+_BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+# v2 first: its names are canonical, v1 titles only add aliases / missing entries
+CYPHER_FILES = [
+    os.path.join(_BACKEND_DIR, 'cypher_queries_v2.cypher'),
+    os.path.join(_BACKEND_DIR, 'cypher_queries.cypher'),
+]
+
+REGISTRY_FORMAT = 3  # bump when parsing changes (invalidates serialized registries)
+
+_NAME_RE = re.compile(r'^--\s*name:\s*(\w+)\s*$')
+_SECTION_RE = re.compile(r'^//\s+(\d+\.\d+)\.\s+(.*)$')
+_USE_CASE_RE = re.compile(r'^//\s*Use case:\s*(.*)$', re.IGNORECASE)
+_DECLARED_PARAM_RE = re.compile(r'^//\s*@param\s+(\w+)\s*:?\s*(\w+)')
+_PARAM_RE = re.compile(r'\$(\w+)')
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_LINE_COMMENT_RE = re.compile(r'//[^\n]*')
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_LIMIT_RE = re.compile(r'\bLIMIT\s+(\d+)\s*$', re.IGNORECASE)
+_WRITE_RE = re.compile(r'\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b|\bapoc\.(periodic|export|create|refactor)', re.IGNORECASE)
+_SCHEMA_RE = re.compile(r'^\s*(CREATE|DROP)\s+(INDEX|CONSTRAINT|FULLTEXT|RANGE|TEXT|POINT|LOOKUP|VECTOR)\b', re.IGNORECASE)
+
+# `--` lines are section banners in the v2 file (not valid Cypher comments)
+_COMMENT_PREFIXES = ('//', '--')
+
+PARAM_TYPES = ("string", "int", "float", "list", "search", "any")
+
+
+class QueryParamError(ValueError):
+    """Params do not match the declared parameters of a template"""
+
+
+class QueryTemplate:
+    """One compiled Cypher template"""
+
+    def __init__(
+        self,
+        name: str,
+        cypher: str,
+        use_case: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        source: str = "",
+        section: Optional[str] = None,
+        title: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.cypher = cypher
+        self.use_case = use_case
+        self.params = params if params is not None else _infer_param_types(cypher)
+        self.source = source
+        self.section = section
+        self.title = title
+        self.statements = _split_statements(cypher)
+        self.kind = _classify(self.statements)
+        match = _LIMIT_RE.search(self.statements[-1]) if self.statements else None
+        self.default_limit = int(match.group(1)) if match else None
+        # Changes whenever the text changes (query-result cache keys use it)
+        self.version = hashlib.sha1(cypher.encode('utf-8')).hexdigest()[:8]
+
+    @property
+    def runnable(self) -> bool:
+        """Single read-only statement - the only kind the chat path executes"""
+        return self.kind == "read" and len(self.statements) == 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cypher": self.cypher,
+            "use_case": self.use_case,
+            "params": self.params,
+            "source": self.source,
+            "section": self.section,
+            "title": self.title,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryTemplate":
+        return cls(**data)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **{k: v for k, v in self.to_dict().items() if k != "cypher"},
+            "kind": self.kind,
+            "default_limit": self.default_limit,
+            "version": self.version,
+        }
+
+
+def _strip_literals(cypher: str) -> str:
+    cypher = _BLOCK_COMMENT_RE.sub(' ', cypher)
+    cypher = _STRING_RE.sub("''", cypher)
+    return _LINE_COMMENT_RE.sub('', cypher)
 
-def load_cypher_queries() -> Dict[str, str]:
+
+def _split_statements(cypher: str) -> List[str]:
+    """Split on `;` at the end of a line (the files never put two statements on one line)"""
+    statements = re.split(r';[ \t]*(?:\n|$)', cypher)
+    return [s.strip() for s in statements if _strip_literals(s).strip()]
+
+
+def _classify(statements: List[str]) -> str:
+    """read | write | schema | profile"""
+    if not statements:
+        return "read"
+    if any(re.match(r'\s*(EXPLAIN|PROFILE)\b', _strip_literals(s), re.IGNORECASE) for s in statements):
+        return "profile"
+    if any(_SCHEMA_RE.match(_strip_literals(s)) for s in statements):
+        return "schema"
+    if any(_WRITE_RE.search(_strip_literals(s)) for s in statements):
+        return "write"
+    return "read"
+
+
+def _infer_param_types(cypher: str) -> Dict[str, str]:
     """
-    Load Cypher queries from cypher_queries.cypher file
-    
-    Returns:
-        Dictionary mapping query names to Cypher query strings
+    Type of each $param from its usage: full-text queryNodes → search,
+    IN/UNWIND → list, LIMIT → int, comparison → float, CONTAINS → string
+    """
+    text = _strip_literals(cypher)
+    types: Dict[str, str] = {}
+    for name in dict.fromkeys(_PARAM_RE.findall(text)):
+        p = re.escape(name)
+        if re.search(rf'fulltext\.queryNodes\(\s*\'\'\s*,\s*\${p}\b', text, re.IGNORECASE):
+            types[name] = "search"
+        elif re.search(rf'\b(IN|UNWIND)\s+\${p}\b', text, re.IGNORECASE):
+            types[name] = "list"
+        elif re.search(rf'\b(LIMIT|SKIP)\s+\${p}\b', text, re.IGNORECASE):
+            types[name] = "int"
+        elif re.search(rf'(<|>|<=|>=)\s*\${p}\b|\${p}\s*(<=|>=|<(?!-)|>)', text):
+            types[name] = "float"
+        elif re.search(rf'(CONTAINS|STARTS\s+WITH|ENDS\s+WITH|=~)\s*(toLower\()?\${p}\b|toLower\(\${p}\)', text, re.IGNORECASE):
+            types[name] = "string"
+        else:
+            types[name] = "any"
+    return types
+
+
+def _legacy_name(title: str) -> str:
+    """v1 query name: slug of the section title (kept for existing callers and logs)"""
+    name = title.strip().lower().replace(' ', '_').replace('-', '_')
+    return re.sub(r'[^\w_]', '', name)
+
+
+def _parse_file(path: str) -> List[Tuple[Optional[str], QueryTemplate]]:
     """
-    queries = {}
-    
-    # Get file path
-    current_dir = os.path.dirname(__file__)
-    cypher_file = os.path.join(current_dir, '..', 'cypher_queries.cypher')
-    
-    if not os.path.exists(cypher_file):
-        print(f"Warning: {cypher_file} not found, using default queries")
-        return get_default_queries()
-    
+    Parse one template file into (v2 name or None, template) pairs
+
+    Entry markers: `-- name:` lines; in files without them, `// N.N.` section
+    headers. Block comments and the trailing comments of an entry (section
+    banners) are dropped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = _BLOCK_COMMENT_RE.sub('', f.read())
+    lines = content.split('\n')
+    named = any(_NAME_RE.match(line.strip()) for line in lines)
+    source = os.path.basename(path)
+
+    blocks: List[Tuple[Optional[str], List[str]]] = []
+    for line in lines:
+        stripped = line.strip()
+        name_match = _NAME_RE.match(stripped)
+        if named and name_match:
+            blocks.append((name_match.group(1), []))
+        elif not named and _SECTION_RE.match(stripped):
+            blocks.append((None, [line]))
+        elif blocks:
+            blocks[-1][1].append(line)
+
+    entries = []
+    for v2_name, block in blocks:
+        header: List[str] = []
+        body_start = len(block)
+        for i, line in enumerate(block):
+            stripped = line.strip()
+            if stripped and not stripped.startswith(_COMMENT_PREFIXES):
+                body_start = i
+                break
+            header.append(stripped)
+        body = block[body_start:]
+        while body and (not body[-1].strip() or body[-1].strip().startswith(_COMMENT_PREFIXES)):
+            body.pop()
+        cypher = '\n'.join(body).strip()
+        if not cypher:
+            continue
+
+        section = title = use_case = None
+        declared: Dict[str, str] = {}
+        for line in header:
+            if _SECTION_RE.match(line) and section is None:
+                section, title = _SECTION_RE.match(line).groups()
+            elif _USE_CASE_RE.match(line) and use_case is None:
+                use_case = _USE_CASE_RE.match(line).group(1).strip().strip('"')
+            elif _DECLARED_PARAM_RE.match(line):
+                param, param_type = _DECLARED_PARAM_RE.match(line).groups()
+                if param_type in PARAM_TYPES:
+                    declared[param] = param_type
+
+        name = v2_name or _legacy_name(title or '')
+        if not name:
+            continue
+        params = {**_infer_param_types(cypher), **declared}
+        entries.append((v2_name, QueryTemplate(name, cypher, use_case, params, source, section, title)))
+    return entries
+
+
+def _coerce(name: str, value: Any, param_type: str) -> Any:
     try:
-        with open(cypher_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse queries by sections
-        # Format: // 1.1. QUERY_NAME
-        #         // Use case: "..."
-        #         MATCH ...
-        
-        # Split by section markers (e.g., // 1.1., // 2.1., etc.)
-        sections = re.split(r'//\s+\d+\.\d+\.', content)
-        
-        for section in sections[1:]:  # Skip first empty section
-            lines = section.strip().split('\n')
-            if not lines:
+        if param_type == "int":
+            return int(float(value)) if isinstance(value, str) else int(value)
+        if param_type == "float":
+            return float(value)
+        if param_type == "string":
+            if isinstance(value, (dict, list)):
+                raise TypeError(type(value).__name__)
+            return str(value)
+        if param_type == "list":
+            return list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if param_type == "search":
+            if isinstance(value, (dict, list)):
+                raise TypeError(type(value).__name__)
+            return to_fulltext_query(value)
+    except (TypeError, ValueError) as e:
+        raise QueryParamError(f"${name} must be {param_type}, got {value!r}") from e
+    return value
+
+
+class QueryRegistry(Mapping):
+    """
+    name → Cypher text for all compiled templates (aliases resolve too)
+
+    Used as a read-only dict by the chat pipeline; entry() / validate() give
+    the typed view.
+    """
+
+    def __init__(self, paths: List[str], cache_path: Optional[str] = QUERY_REGISTRY_CACHE_PATH) -> None:
+        self.paths = paths
+        self.cache_path = cache_path
+        self._entries: Dict[str, QueryTemplate] = {}
+        self._aliases: Dict[str, str] = {}
+        self._fingerprint: List[List[Any]] = []
+        self._rejected: Dict[str, Tuple[str, str]] = {}  # name -> (version, reason), set by the plan check
+        self._checked = 0.0
+        self.loaded_at: Optional[float] = None
+        self.from_cache = False
+        self.load()
+
+    def _source_fingerprint(self) -> List[List[Any]]:
+        fingerprint = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                fingerprint.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+            except OSError:
+                fingerprint.append([os.path.basename(path), None, None])
+        return fingerprint
+
+    def load(self) -> None:
+        """Load from the serialized registry if it matches the files, else compile"""
+        fingerprint = self._source_fingerprint()
+        self.from_cache = self._load_serialized(fingerprint)
+        if not self.from_cache:
+            self._compile()
+            self._save_serialized(fingerprint)
+        self._fingerprint = fingerprint
+        self._checked = time.monotonic()
+        self.loaded_at = time.time()
+
+    def _compile(self) -> None:
+        entries: Dict[str, QueryTemplate] = {}
+        aliases: Dict[str, str] = {}
+        by_title: Dict[str, str] = {}
+        for path in self.paths:
+            if not os.path.exists(path):
+                print(f"Warning: {path} not found")
+                continue
+            try:
+                parsed = _parse_file(path)
+            except Exception as e:
+                print(f"Error loading queries from {path}: {e}")
                 continue
-            
-            # Extract query name from first line
-            first_line = lines[0].strip()
-            query_name = first_line.lower().replace(' ', '_').replace('-', '_')
-            query_name = re.sub(r'[^\w_]', '', query_name)
-            
-            # Find the actual Cypher query (starts with MATCH, WITH, etc.)
-            query_lines = []
-            in_query = False
-            
-            for line in lines:
-                stripped = line.strip()
-                
-                # Start of query
-                if stripped.startswith(('MATCH', 'WITH', 'RETURN', 'OPTIONAL', 'WHERE', 'CREATE', 'MERGE')):
-                    in_query = True
-                
-                # End of query (empty line or next comment)
-                if in_query and (not stripped or stripped.startswith('//')):
-                    break
-                
-                if in_query:
-                    query_lines.append(line)
-            
-            if query_lines:
-                query = '\n'.join(query_lines).strip()
-                if query and len(query) > 10:  # Valid query
-                    queries[query_name] = query
-        
-        print(f"Loaded {len(queries)} queries from {cypher_file}")
-        return queries
-        
-    except Exception as e:
-        print(f"Error loading queries: {e}")
-        return get_default_queries()
+            for v2_name, template in parsed:
+                legacy = _legacy_name(template.title) if template.title else None
+                if v2_name:
+                    entries[v2_name] = template
+                    if legacy:
+                        by_title.setdefault(legacy, v2_name)
+                elif legacy in by_title:
+                    aliases[legacy] = by_title[legacy]
+                elif template.name not in entries:
+                    entries[template.name] = template
+            print(f"Loaded {len(parsed)} queries from {path}")
+
+        if not entries:
+            print("Warning: no query files found, using default queries")
+            entries = {
+                name: QueryTemplate(name, cypher.strip(), source="default")
+                for name, cypher in get_default_queries().items()
+            }
+        self._entries = entries
+        self._aliases = {alias: target for alias, target in aliases.items() if alias not in entries}
+
+    def _load_serialized(self, fingerprint: List[List[Any]]) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("format") != REGISTRY_FORMAT or data.get("sources") != fingerprint:
+                return False
+            self._entries = {e["name"]: QueryTemplate.from_dict(e) for e in data["entries"]}
+            self._aliases = data["aliases"]
+            return True
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Query registry cache ignored: {e}")
+            return False
+
+    def _save_serialized(self, fingerprint: List[List[Any]]) -> None:
+        """Atomic write; a failure only costs the next startup a re-parse"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "format": REGISTRY_FORMAT,
+                    "sources": fingerprint,
+                    "entries": [e.to_dict() for e in self._entries.values()],
+                    "aliases": self._aliases,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Query registry cache not written: {e}")
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Re-compile when a template file changed; checks at most every QUERY_RELOAD_SECONDS"""
+        now = time.monotonic()
+        if not force and now - self._checked < QUERY_RELOAD_SECONDS:
+            return False
+        self._checked = now
+        if not force and self._source_fingerprint() == self._fingerprint:
+            return False
+        self.load()
+        print(f"🔄 Reloaded query templates: {len(self._entries)} entries")
+        return True
+
+    def entry(self, name: str) -> Optional[QueryTemplate]:
+        self.reload_if_changed()
+        return self._entries.get(self._aliases.get(name, name))
+
+    def validate(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Params for template `name`: only its declared $params, coerced to their types
+
+        Raises:
+            QueryParamError: unknown template, missing or mistyped param
+        """
+        template = self.entry(name)
+        if template is None:
+            raise QueryParamError(f"Unknown query template: {name}")
+        validated = {}
+        for param, param_type in template.params.items():
+            value = params.get(param)
+            if value is None or value == "":
+                raise QueryParamError(f"{template.name}: missing ${param}")
+            validated[param] = _coerce(param, value, param_type)
+        return validated
+
+    def reject(self, name: str, reason: str) -> None:
+        """Keep a template out of the chat path until its text changes"""
+        template = self.entry(name)
+        if template:
+            self._rejected[template.name] = (template.version, reason)
+
+    def clear_rejections(self) -> None:
+        self._rejected.clear()
+
+    def rejection(self, name: str) -> Optional[str]:
+        """Reason the current version of the template was rejected, or None"""
+        template = self.entry(name)
+        rejected = self._rejected.get(template.name) if template else None
+        return rejected[1] if rejected and rejected[0] == template.version else None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        self.reload_if_changed()
+        aliases_of: Dict[str, List[str]] = {}
+        for alias, target in self._aliases.items():
+            aliases_of.setdefault(target, []).append(alias)
+        return [
+            {**e.describe(), "aliases": aliases_of.get(name, []), "rejected": self.rejection(name)}
+            for name, e in sorted(self._entries.items())
+        ]
+
+    def __getitem__(self, name: str) -> str:
+        template = self.entry(name)
+        if template is None:
+            raise KeyError(name)
+        return template.cypher
+
+    def __iter__(self) -> Iterator[str]:
+        self.reload_if_changed()
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 def get_default_queries() -> Dict[str, str]:
@@ -93,7 +455,7 @@ def get_default_queries() -> Dict[str, str]:
                    collect({exam: e.name, score: es.value}) AS requirements
             LIMIT 10
         """,
-        
+
         "find_programs_by_ielts": """
             MATCH (p:Program)-[:HAS_REQUIRED]->(es:ExamScore)
                   <-[:HAS_SCORE]-(e:Exam {name: "IELTS"})
@@ -108,7 +470,7 @@ def get_default_queries() -> Dict[str, str]:
             ORDER BY es.value ASC
             LIMIT 10
         """,
-        
+
         "visa_info": """
             MATCH (v:Visa {subclass: $subclass})
             OPTIONAL MATCH (v)-[:HAS_ABOUT_INFO]->(a:AboutInfo)
@@ -117,7 +479,7 @@ def get_default_queries() -> Dict[str, str]:
                    v.url AS official_url,
                    collect({field: a.field, content: a.content}) AS about_information
         """,
-        
+
         "visa_eligibility": """
             MATCH (v:Visa {subclass: $subclass})
                   -[:HAS_ELIGIBILITY_GROUP]->(eg:EligibilityGroup)
@@ -127,7 +489,7 @@ def get_default_queries() -> Dict[str, str]:
                    collect({key: er.key, content: er.content}) AS requirements
             ORDER BY eg.group_key
         """,
-        
+
         "settlement_info": """
             MATCH (cat:SettlementCategory)
             WHERE toLower(cat.name) CONTAINS toLower($keyword)
@@ -141,7 +503,7 @@ def get_default_queries() -> Dict[str, str]:
                    }) AS related_info
             LIMIT 5
         """,
-        
+
         "comprehensive_pathway": """
             MATCH (p:Program)-[:FOCUSES_ON]->(subj:Subject)
             WHERE toLower(subj.name) CONTAINS toLower($field)
@@ -173,36 +535,48 @@ def get_default_queries() -> Dict[str, str]:
     }
 
 
+# Compiled once per process; hot-reloads on file change
+query_registry = QueryRegistry(CYPHER_FILES)
+
+
+def load_cypher_queries() -> QueryRegistry:
+    """
+    The compiled query registry (a name → Cypher mapping)
+
+    Returns:
+        Registry mapping query names (and v1 aliases) to Cypher query strings
+    """
+    return query_registry
+
+
 def get_query(query_name: str) -> str:
     """
     Get a specific query by name
-    
+
     Args:
         query_name: Name of the query to retrieve
-        
+
     Returns:
         Cypher query string or empty string if not found
     """
-    queries = load_cypher_queries()
-    return queries.get(query_name, "")
+    return query_registry.get(query_name, "")
 
 
 def list_available_queries() -> list:
     """
     List all available query names
-    
+
     Returns:
         List of query names
     """
-    queries = load_cypher_queries()
-    return sorted(queries.keys())
+    return sorted(query_registry)
 
 
 if __name__ == "__main__":
     # Test the loader
     queries = load_cypher_queries()
-    print(f"\nLoaded {len(queries)} queries:")
-    for name in sorted(queries.keys())[:10]:
-        print(f"  - {name}")
-    
+    print(f"\nLoaded {len(queries)} queries ({'from cache' if queries.from_cache else 'compiled'}):")
+    for info in queries.describe()[:10]:
+        print(f"  - {info['name']} [{info['kind']}] params={info['params']} aliases={info['aliases']}")
+
     print(f"\n... and {len(queries) - 10} more")
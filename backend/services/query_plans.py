@@ -0,0 +1,179 @@
+"""
+Startup plan check of every Cypher template
+
+Runs EXPLAIN for each runnable template with representative parameters:
+
+- fills Neo4j's query plan cache (EXPLAIN plans the same statement text the
+  chat path later sends, so the first real execution skips planning)
+- rejects templates that fail to plan (syntax / type errors) and, with
+  PLAN_CHECK_REJECT_CARTESIAN, templates whose plan has a cartesian product;
+  rejected templates are not executed until they are edited or re-checked
+- optionally (PLAN_WARM_PAGE_CACHE) reads the nodes of the hot labels once so
+  their records are in the page cache
+
+The report is served by the admin endpoints (/api/admin/query-plans).
+"""
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from neo4j.exceptions import ClientError
+
+from config import (
+    NEO4J_DATABASE,
+    PLAN_CHECK_REJECT_CARTESIAN,
+    PLAN_CHECK_TIMEOUT_SECONDS,
+    PLAN_WARM_PAGE_CACHE,
+    PLAN_WARM_LABELS,
+    PLAN_WARM_NODE_LIMIT,
+)
+from services.neo4j_exec import connect_neo4j_async
+from services.query_loader import QueryTemplate, query_registry
+
+CARTESIAN_NOTIFICATION = "Neo.ClientNotification.Statement.CartesianProduct"
+
+# Representative values for common parameter names; others get one per type.
+# EXPLAIN does not execute, but plans are cached per parameter type.
+SAMPLE_PARAMS: Dict[str, Any] = {
+    "subclass": "500",
+    "university_name": "University of Melbourne",
+    "level": "Master",
+    "month": "February",
+    "city": "Sydney",
+    "state": "NSW",
+    "exam": "IELTS",
+    "exam_type": "IELTS",
+}
+TYPE_SAMPLES: Dict[str, Any] = {"string": "x", "int": 10, "float": 6.5, "list": ["x"], "search": "x*", "any": "x"}
+
+_report: Dict[str, Any] = {
+    "status": "pending",  # pending | running | done | failed
+    "checked_at": None,
+    "duration_s": None,
+    "summary": {},
+    "page_cache": None,
+    "error": None,
+    "results": {},
+}
+_lock = asyncio.Lock()
+
+
+def representative_params(template: QueryTemplate) -> Dict[str, Any]:
+    return {
+        name: SAMPLE_PARAMS.get(name, TYPE_SAMPLES.get(param_type, "x"))
+        for name, param_type in template.params.items()
+    }
+
+
+def _has_cartesian(plan: Optional[Dict[str, Any]]) -> bool:
+    if not plan:
+        return False
+    if str(plan.get("operatorType", "")).startswith("CartesianProduct"):
+        return True
+    return any(_has_cartesian(child) for child in plan.get("children") or [])
+
+
+async def _explain(driver, template: QueryTemplate) -> Dict[str, Any]:
+    """EXPLAIN one template in its own session - a timed-out one leaves the others usable"""
+    started = time.perf_counter()
+    try:
+        async with driver.session(database=NEO4J_DATABASE) as session:
+            result = await session.run(f"EXPLAIN {template.statements[0]}", representative_params(template))
+            summary = await result.consume()
+    except ClientError as e:
+        if not str(e.code).startswith(("Neo.ClientError.Statement.", "Neo.ClientError.Procedure.")):
+            raise  # auth, database... - not the template's fault
+        # The statement itself is broken (syntax, types, missing procedure...)
+        return {"status": "rejected", "reason": f"{e.code}: {e.message}"}
+    codes = sorted({n.get("code") for n in (summary.notifications or []) if n.get("code")})
+    entry: Dict[str, Any] = {
+        "status": "ok",
+        "plan_ms": round((time.perf_counter() - started) * 1000, 1),
+        "warnings": codes,
+    }
+    if PLAN_CHECK_REJECT_CARTESIAN and (CARTESIAN_NOTIFICATION in codes or _has_cartesian(summary.plan)):
+        entry.update(status="rejected", reason="cartesian product")
+    return entry
+
+
+async def _touch_labels(session) -> Dict[str, int]:
+    """Read properties of up to PLAN_WARM_NODE_LIMIT nodes per hot label (loads their pages)"""
+    touched = {}
+    for label in PLAN_WARM_LABELS:
+        result = await session.run(
+            f"MATCH (n:`{label}`) WITH n LIMIT $limit RETURN count(properties(n)) AS c",
+            limit=PLAN_WARM_NODE_LIMIT,
+        )
+        record = await result.single()
+        touched[label] = record["c"] if record else 0
+    return touched
+
+
+async def check_query_plans() -> Dict[str, Any]:
+    """
+    EXPLAIN every runnable template; records rejections in the query registry
+
+    Connection problems abort the run without rejecting anything - only
+    errors caused by a statement reject it.
+    """
+    async with _lock:
+        _report.update(status="running", error=None)
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        driver = connect_neo4j_async()
+        if not driver:
+            _report.update(status="failed", error="Neo4j not configured")
+            return get_plan_report()
+        try:
+            for name in query_registry:
+                template = query_registry.entry(name)
+                if not template.runnable:
+                    results[template.name] = {
+                        "status": "skipped",
+                        "reason": f"{template.kind}, {len(template.statements)} statement(s)",
+                    }
+                    continue
+                try:
+                    results[template.name] = await asyncio.wait_for(
+                        _explain(driver, template), PLAN_CHECK_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Slow to plan is worth a look, but not broken
+                    results[template.name] = {"status": "timeout"}
+            if PLAN_WARM_PAGE_CACHE:
+                async with driver.session(database=NEO4J_DATABASE) as session:
+                    _report["page_cache"] = await _touch_labels(session)
+        except Exception as e:
+            print(f"Query plan check aborted: {e}")
+            _report.update(status="failed", error=str(e))
+            return get_plan_report()
+        finally:
+            await driver.close()
+
+        query_registry.clear_rejections()
+        for name, entry in results.items():
+            if entry["status"] == "rejected":
+                query_registry.reject(name, entry["reason"])
+                print(f"✗ Query template {name} rejected: {entry['reason']}")
+
+        summary: Dict[str, int] = {}
+        for entry in results.values():
+            summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+        _report.update(
+            status="done",
+            checked_at=time.time(),
+            duration_s=round(time.perf_counter() - started, 2),
+            summary=summary,
+            results=results,
+        )
+        print(f"🧭 Query plans checked in {_report['duration_s']}s: {summary}")
+        return get_plan_report()
+
+
+def get_plan_report(include_results: bool = True) -> Dict[str, Any]:
+    report = dict(_report)
+    if not include_results:
+        report.pop("results")
+    return report
+
@@ -0,0 +1,258 @@
+"""
+SSE stream writer - coalesces text chunks, sends heartbeats and keeps a short
+per-stream replay buffer so clients can resume with `Last-Event-ID`
+"""
+from __future__ import annotations
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    SSE_COALESCE_BYTES,
+    SSE_COALESCE_MS,
+    SSE_HEARTBEAT_SECONDS,
+    SSE_REPLAY_TTL,
+    SSE_REPLAY_MAX_FRAMES,
+    SSE_DISCONNECT_POLL_SECONDS,
+)
+
+HEARTBEAT_FRAME = ": ping\n\n"
+
+
+class _ReplayBuffer:
+    """Frames already sent on one stream, kept for a short time after it ends"""
+
+    def __init__(self) -> None:
+        self.frames: List[Tuple[int, str]] = []
+        self.done = False
+        self.updated = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def append(self, seq: int, frame: str) -> None:
+        self.frames.append((seq, frame))
+        if len(self.frames) > SSE_REPLAY_MAX_FRAMES:
+            del self.frames[: len(self.frames) - SSE_REPLAY_MAX_FRAMES]
+        self._touch()
+
+    def finish(self) -> None:
+        self.done = True
+        self._touch()
+
+    def after(self, seq: int) -> List[Tuple[int, str]]:
+        return [(s, f) for s, f in self.frames if s > seq]
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _touch(self) -> None:
+        self.updated = time.monotonic()
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+# stream_id -> replay buffer
+_replay_buffers: Dict[str, _ReplayBuffer] = {}
+
+
+def _prune_replay_buffers() -> None:
+    """Drop buffers of finished streams older than SSE_REPLAY_TTL"""
+    now = time.monotonic()
+    expired = [
+        sid for sid, buf in _replay_buffers.items()
+        if buf.done and now - buf.updated > SSE_REPLAY_TTL
+    ]
+    for sid in expired:
+        del _replay_buffers[sid]
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Split a `Last-Event-ID` header ("<stream_id>:<seq>") into its parts"""
+    if not value or ":" not in value:
+        return None
+    stream_id, _, seq = value.rpartition(":")
+    try:
+        return stream_id, int(seq)
+    except ValueError:
+        return None
+
+
+def can_resume(last_event_id: Optional[str]) -> bool:
+    """
+    True if the stream referenced by `Last-Event-ID` is still buffered from the
+    frame after `seq` on; once older frames were trimmed (SSE_REPLAY_MAX_FRAMES)
+    a replay would silently skip them, so the request starts a new stream
+    """
+    _prune_replay_buffers()
+    parsed = parse_last_event_id(last_event_id)
+    if parsed is None or parsed[0] not in _replay_buffers:
+        return False
+    frames = _replay_buffers[parsed[0]].frames
+    return not frames or parsed[1] + 1 >= frames[0][0]
+
+
+def format_event(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """Format one SSE frame with a JSON payload (preserves newlines in text)"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class SSEStreamWriter:
+    """
+    Turn a stream of typed chatbot events into SSE frames
+
+    - `text` events are coalesced until SSE_COALESCE_BYTES are buffered or
+      SSE_COALESCE_MS have passed since the first buffered chunk
+    - a comment heartbeat goes out after SSE_HEARTBEAT_SECONDS without frames,
+      so idle proxies keep long Neo4j/LLM stages open
+    - every frame gets an `id: <stream_id>:<seq>` and is kept in a replay buffer
+    - when `is_disconnected` reports the client gone, the pending upstream step
+      (Neo4j query / Gemini stream) is cancelled and the stream ends
+    - a stream that ends without finishing (disconnect, upstream error) gets a
+      terminal `error` frame in the replay buffer, so a resuming client sees
+      why its answer stopped instead of a silently truncated replay
+    """
+
+    def __init__(self, stream_id: Optional[str] = None) -> None:
+        self.stream_id = stream_id or uuid.uuid4().hex
+        self._seq = 0
+        self._pending_text: List[str] = []
+        self._pending_bytes = 0
+        self._pending_since: Optional[float] = None
+        _prune_replay_buffers()
+        self._buffer = _replay_buffers.setdefault(self.stream_id, _ReplayBuffer())
+
+    def _frame(self, event: str, data: Any) -> str:
+        self._seq += 1
+        frame = format_event(event, data, f"{self.stream_id}:{self._seq}")
+        self._buffer.append(self._seq, frame)
+        return frame
+
+    def _flush_text(self) -> Optional[str]:
+        if not self._pending_text:
+            return None
+        text = "".join(self._pending_text)
+        self._pending_text = []
+        self._pending_bytes = 0
+        self._pending_since = None
+        return self._frame("text", {"text": text})
+
+    def _next_timeout(self, last_write: float) -> float:
+        now = time.monotonic()
+        timeout = SSE_HEARTBEAT_SECONDS - (now - last_write)
+        if self._pending_since is not None:
+            timeout = min(timeout, SSE_COALESCE_MS / 1000 - (now - self._pending_since))
+        return max(timeout, 0)
+
+    async def stream(
+        self,
+        events: AsyncIterator[Dict[str, Any]],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """Consume typed events and yield SSE frames"""
+        last_write = time.monotonic()
+        completed = disconnected = False
+        next_event: Optional[asyncio.Future] = None
+        disconnect_watch = (
+            asyncio.ensure_future(_wait_for_disconnect(is_disconnected)) if is_disconnected else None
+        )
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(events.__anext__())
+
+                # Wait without cancelling the upstream step, so a timeout only
+                # means "flush or ping", never "abort the LLM call"
+                waiting = {next_event, disconnect_watch} if disconnect_watch else {next_event}
+                finished, _ = await asyncio.wait(
+                    waiting, timeout=self._next_timeout(last_write), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if disconnect_watch is not None and disconnect_watch in finished:
+                    # Nobody is listening any more - the finally block cancels upstream
+                    disconnected = True
+                    return
+
+                if not finished:
+                    now = time.monotonic()
+                    if self._pending_since is not None and now - self._pending_since >= SSE_COALESCE_MS / 1000:
+                        yield self._flush_text()
+                        last_write = now
+                    elif now - last_write >= SSE_HEARTBEAT_SECONDS:
+                        yield HEARTBEAT_FRAME
+                        last_write = now
+                    continue
+
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_event = None
+
+                if event["event"] == "text":
+                    chunk = event["data"].get("text", "")
+                    if not chunk:
+                        continue
+                    self._pending_text.append(chunk)
+                    self._pending_bytes += len(chunk.encode("utf-8"))
+                    if self._pending_since is None:
+                        self._pending_since = time.monotonic()
+                    if self._pending_bytes >= SSE_COALESCE_BYTES:
+                        yield self._flush_text()
+                        last_write = time.monotonic()
+                    continue
+
+                # Any other event type keeps ordering: flush buffered text first
+                flushed = self._flush_text()
+                if flushed:
+                    yield flushed
+                yield self._frame(event["event"], event["data"])
+                last_write = time.monotonic()
+
+            flushed = self._flush_text()
+            if flushed:
+                yield flushed
+            completed = True
+        finally:
+            if disconnect_watch is not None:
+                disconnect_watch.cancel()
+            if next_event is not None and not next_event.done():
+                # Upstream is mid-await (Neo4j / Gemini): cancel it right there
+                next_event.cancel()
+            elif hasattr(events, "aclose"):
+                await events.aclose()
+            if not completed:
+                # Not yielded (the client is gone or the generator is closing);
+                # only a resumed stream reads these
+                self._flush_text()
+                self._frame("error", {"error": "disconnected" if disconnected else "stream"})
+            self._buffer.finish()
+
+
+async def _wait_for_disconnect(is_disconnected: Callable[[], Awaitable[bool]]) -> None:
+    """Return once the client has gone away"""
+    while not await is_disconnected():
+        await asyncio.sleep(SSE_DISCONNECT_POLL_SECONDS)
+
+
+async def resume_stream(last_event_id: str) -> AsyncIterator[str]:
+    """
+    Replay frames after `Last-Event-ID`, then follow the stream until it ends
+
+    Call only when can_resume() is True.
+    """
+    stream_id, seq = parse_last_event_id(last_event_id)
+    buffer = _replay_buffers[stream_id]
+    while True:
+        for seq, frame in buffer.after(seq):
+            yield frame
+        if buffer.done:
+            return
+        await buffer.wait(SSE_HEARTBEAT_SECONDS)
+        if not buffer.after(seq) and not buffer.done:
+            yield HEARTBEAT_FRAME
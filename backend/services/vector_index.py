@@ -0,0 +1,307 @@
+"""
+Local dense vector index for semantic retrieval
+
+Keyword search misses paraphrases ("tôi muốn đưa vợ con sang Úc" should find
+family visas and settlement support). The same passages as the BM25 index
+(services/bm25_index.export_passages) are embedded with a local CPU
+sentence-transformers model (VECTOR_MODEL, multilingual by default) and stored
+in VECTOR_INDEX_DIR:
+
+- vectors.f16  N x dim float16 matrix, L2-normalized, opened memory-mapped
+- ivf.npz      IVF index: k-means centroids and the rows of each list
+- meta.json    model, data version and, per row, node id, text hash, source,
+               title, text and url
+
+Search: cosine similarity against the centroids, then exact scores within the
+VECTOR_NPROBE closest lists (small indexes are scanned completely).
+
+Builds are incremental: passages whose text hash is in the previous build keep
+their vector, only new or edited passages are embedded, and the
+centroids are reused until the index grows by half. scripts/build_vector_index.py
+runs a build offline; the server rebuilds in the background when the graph data
+version changes.
+
+numpy and sentence-transformers are optional: without them the index is off.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import (
+    VECTOR_ENABLED,
+    VECTOR_MODEL,
+    VECTOR_INDEX_DIR,
+    VECTOR_TOP_K,
+    VECTOR_MIN_SCORE,
+    VECTOR_NPROBE,
+    VECTOR_BATCH_SIZE,
+)
+from services.bm25_index import export_passages
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+IVF_MIN_ROWS = 2000  # below this a full scan is faster than probing lists
+KMEANS_ITERATIONS = 10
+MAX_EMBED_CHARS = 2000
+
+_state: Dict[str, Any] = {"index": None, "building": False, "last_build": None, "error": None}
+_model: Dict[str, Any] = {"model": None}
+_model_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def vectors_available() -> bool:
+    if not VECTOR_ENABLED or np is None:
+        return False
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_model():
+    with _model_lock:
+        if _model["model"] is None:
+            from sentence_transformers import SentenceTransformer
+            _model["model"] = SentenceTransformer(VECTOR_MODEL, device="cpu")
+        return _model["model"]
+
+
+def embed(texts: List[str]) -> "np.ndarray":
+    """L2-normalized float32 embeddings, one row per text"""
+    vectors = _get_model().encode(
+        [t[:MAX_EMBED_CHARS] for t in texts],
+        batch_size=VECTOR_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _passage_text(title: str, text: str) -> str:
+    return f"{title}\n{text}"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _paths(directory: str) -> Dict[str, str]:
+    return {
+        "vectors": os.path.join(directory, "vectors.f16"),
+        "ivf": os.path.join(directory, "ivf.npz"),
+        "meta": os.path.join(directory, "meta.json"),
+    }
+
+
+class VectorIndex:
+    """Memory-mapped vectors plus an IVF index; rows map back to graph node ids"""
+
+    def __init__(self, directory: str) -> None:
+        paths = _paths(directory)
+        with open(paths["meta"], "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.rows: List[List[Any]] = self.meta["rows"]  # [node_id, hash, source, title, text, url]
+        self.vectors = np.memmap(paths["vectors"], dtype=np.float16, mode="r", shape=(len(self.rows), self.meta["dim"]))
+        ivf = np.load(paths["ivf"])
+        self.centroids = ivf["centroids"]
+        self.order = ivf["order"]
+        self.offsets = ivf["offsets"]
+
+    @property
+    def data_version(self) -> Optional[str]:
+        return self.meta.get("data_version")
+
+    def search(self, query_vector: "np.ndarray", k: int = VECTOR_TOP_K, nprobe: int = VECTOR_NPROBE) -> List[tuple]:
+        """Top k (row, cosine similarity) pairs"""
+        if not self.rows:
+            return []
+        if len(self.centroids) == 0:
+            candidates = np.arange(len(self.rows))
+        else:
+            probe = np.argsort(self.centroids @ query_vector)[::-1][:nprobe]
+            candidates = np.concatenate([self.order[self.offsets[p]:self.offsets[p + 1]] for p in probe])
+            if candidates.size == 0:
+                return []
+            candidates.sort()  # sequential reads from the memory map
+        scores = np.asarray(self.vectors[candidates], dtype=np.float32) @ query_vector
+        top = np.argsort(scores)[::-1][:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+def _kmeans(vectors: "np.ndarray", n_lists: int) -> "np.ndarray":
+    """Spherical k-means (cosine) on normalized vectors"""
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = _assign(vectors, centroids)
+        for c in range(n_lists):
+            members = vectors[assignment == c]
+            if len(members):
+                mean = members.mean(axis=0)
+                centroids[c] = mean / (np.linalg.norm(mean) or 1.0)
+    return centroids
+
+
+def _assign(vectors: "np.ndarray", centroids: "np.ndarray", batch: int = 8192) -> "np.ndarray":
+    return np.concatenate([
+        np.argmax(np.asarray(vectors[i:i + batch], dtype=np.float32) @ centroids.T, axis=1)
+        for i in range(0, len(vectors), batch)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+def load_vector_index(directory: str = VECTOR_INDEX_DIR) -> bool:
+    """Open the index on disk (no model load); False if there is none"""
+    if not vectors_available() or not os.path.exists(_paths(directory)["meta"]):
+        return False
+    try:
+        index = VectorIndex(directory)
+        if index.meta.get("model") != VECTOR_MODEL:
+            print(f"Vector index ignored: built with {index.meta.get('model')}, VECTOR_MODEL is {VECTOR_MODEL}")
+            return False
+        _state["index"] = index
+        print(f"🧭 Vector index loaded: {len(index.rows)} passages ({index.data_version})")
+        return True
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Vector index not loaded: {e}")
+        return False
+
+
+def build_vector_index(data_version: Optional[str], directory: str = VECTOR_INDEX_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Export the passages and (re)build the index, embedding only new or changed
+    ones; returns build stats, None if unavailable or Neo4j is down
+    """
+    if not vectors_available():
+        return None
+    with _build_lock:
+        _state["building"] = True
+        started = time.perf_counter()
+        try:
+            passages = export_passages()
+            if passages is None:
+                return None
+            rows, texts, seen = [], [], set()
+            for node_id, source, title, text, url in passages:
+                full_text = _passage_text(title, text)
+                text_hash = _text_hash(full_text)
+                if (node_id, text_hash) in seen:
+                    continue
+                seen.add((node_id, text_hash))
+                rows.append([node_id, text_hash, source, title, text, url])
+                texts.append(full_text)
+            if not rows:
+                print("Vector index not built: no passages exported")
+                return None
+
+            previous: Optional[VectorIndex] = _state["index"]
+            if previous is None and load_vector_index(directory):
+                previous = _state["index"]
+            # Same text, same vector - even if the import recreated the node
+            reusable = {}
+            if previous is not None and previous.meta.get("model") == VECTOR_MODEL:
+                reusable = {r[1]: i for i, r in enumerate(previous.rows)}
+
+            todo = [i for i, r in enumerate(rows) if r[1] not in reusable]
+            new_vectors = embed([texts[i] for i in todo]) if todo else None
+            dim = new_vectors.shape[1] if new_vectors is not None else previous.meta["dim"]
+
+            os.makedirs(directory, exist_ok=True)
+            paths = _paths(directory)
+            matrix = np.memmap(f"{paths['vectors']}.tmp", dtype=np.float16, mode="w+", shape=(len(rows), dim))
+            todo_position = {row: n for n, row in enumerate(todo)}
+            for i, r in enumerate(rows):
+                if i in todo_position:
+                    matrix[i] = new_vectors[todo_position[i]]
+                else:
+                    matrix[i] = previous.vectors[reusable[r[1]]]
+            matrix.flush()
+
+            n_lists = int(np.sqrt(len(rows))) if len(rows) >= IVF_MIN_ROWS else 0
+            trained_rows = previous.meta.get("trained_rows", 0) if previous is not None else 0
+            if n_lists == 0:
+                centroids = np.zeros((0, dim), dtype=np.float32)
+            elif previous is not None and len(previous.centroids) and len(rows) <= trained_rows * 1.5:
+                centroids = previous.centroids
+            else:
+                centroids = _kmeans(np.asarray(matrix, dtype=np.float32), n_lists)
+                trained_rows = len(rows)
+            assignment = _assign(matrix, centroids) if len(centroids) else np.zeros(len(rows), dtype=np.int64)
+            order = np.argsort(assignment, kind="stable").astype(np.int32)
+            offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1)).astype(np.int64)
+
+            del matrix
+            np.savez(f"{paths['ivf']}.tmp.npz", centroids=centroids.astype(np.float32), order=order, offsets=offsets)
+            with open(f"{paths['meta']}.tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "model": VECTOR_MODEL,
+                    "dim": int(dim),
+                    "data_version": data_version,
+                    "built_at": time.time(),
+                    "trained_rows": trained_rows,
+                    "rows": rows,
+                }, f, ensure_ascii=False)
+            os.replace(f"{paths['vectors']}.tmp", paths["vectors"])
+            os.replace(f"{paths['ivf']}.tmp.npz", paths["ivf"])
+            os.replace(f"{paths['meta']}.tmp", paths["meta"])
+
+            _state["index"] = VectorIndex(directory)
+            stats = {
+                "passages": len(rows),
+                "embedded": len(todo),
+                "reused": len(rows) - len(todo),
+                "lists": int(len(centroids)),
+                "data_version": data_version,
+                "build_s": round(time.perf_counter() - started, 2),
+            }
+            _state.update(last_build=stats, error=None)
+            print(f"🧭 Vector index built: {stats}")
+            return stats
+        except Exception as e:
+            print(f"Vector index build error: {e}")
+            _state["error"] = str(e)
+            return None
+        finally:
+            _state["building"] = False
+
+
+def vector_index_loaded() -> bool:
+    return _state["index"] is not None
+
+
+def search_similar(query: str, k: int = VECTOR_TOP_K) -> List[Dict[str, Any]]:
+    """Semantically closest passages as result rows (empty when the index is off)"""
+    index: Optional[VectorIndex] = _state["index"]
+    if index is None or not query.strip():
+        return []
+    results = []
+    for row, score in index.search(embed([query])[0], k):
+        if score < VECTOR_MIN_SCORE:
+            continue
+        node_id, _, source, title, text, url = index.rows[row]
+        results.append({
+            "node_id": node_id, "source": source, "title": title, "content": text, "url": url,
+            "score": round(score, 3),
+        })
+    return results
+
+
+def get_vector_stats() -> Dict[str, Any]:
+    index: Optional[VectorIndex] = _state["index"]
+    return {
+        "enabled": vectors_available(),
+        "passages": len(index.rows) if index else 0,
+        "data_version": index.data_version if index else None,
+        "building": _state["building"],
+        "last_build": _state["last_build"],
+        "error": _state["error"],
+    }
@@ -0,0 +1,267 @@
+"""
+Cache warm-up and readiness
+
+On startup the full-text indexes are created if missing (services/fulltext.py),
+the graph snapshot is opened (services/graph_snapshot.py), the report
+templates are materialized (services/analytics.py) and every Cypher template
+is EXPLAINed (services/query_plans.py).
+Then, and whenever the graph data version changes (i.e. after an import), the
+hottest work is replayed before users ask for it:
+
+1. the most frequent (template, entities) pairs → query-result cache and the
+   Neo4j plan cache (same query text, so later executions reuse the plan)
+2. the most asked questions through the full pipeline → answer cache
+   (questions already in the FAQ answer bank are skipped)
+
+Sources are the in-memory heavy hitters when available, else the persisted
+query log. /ready reports 503 until the startup warm-up finished (or ran out
+of WARMUP_TIMEOUT_SECONDS); /health stays a pure liveness check.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from config import (
+    PLAN_CHECK_ENABLED,
+    WARMUP_ENABLED,
+    WARMUP_TOP_QUESTIONS,
+    WARMUP_TOP_QUERIES,
+    WARMUP_CONCURRENCY,
+    WARMUP_TIMEOUT_SECONDS,
+    DATA_VERSION_POLL_SECONDS,
+    VECTOR_REBUILD_ON_CHANGE,
+)
+from services.analytics import get_analytics_stats, refresh_analytics
+from services.answer_bank import load_answer_bank, lookup_answer, reload_answer_bank_if_changed
+from services.bm25_index import get_bm25_stats, rebuild_bm25_index
+from services.data_version import fetch_data_version, get_current_data_version, set_current_data_version
+from services.deadline import Deadline
+from services.fulltext import ensure_fulltext_indexes
+from services.graph_snapshot import build_graph_snapshot, get_snapshot, get_snapshot_stats, load_graph_snapshot
+from services.graph_stats import refresh_graph_stats
+from services.heavy_hitters import hot_questions
+from services.prefetch import top_logged_questions, top_logged_queries
+from services.vector_index import (
+    build_vector_index,
+    embed,
+    get_vector_stats,
+    load_vector_index,
+    vector_index_loaded,
+    vectors_available,
+)
+from services.query_plans import check_query_plans
+
+_state: Dict[str, Any] = {
+    "status": "pending",  # pending | running | ready
+    "ready": False,
+    "runs": 0,
+    "last_reason": None,
+    "last_started": None,
+    "last_duration_s": None,
+    "last_queries": 0,
+    "last_questions": 0,
+    "last_errors": 0,
+    "startup_errors": [],  # pre-warm steps that failed or did not finish in time
+}
+_lock = asyncio.Lock()
+_background: set = set()  # running vector index builds (referenced until done)
+
+
+def is_ready() -> bool:
+    return _state["ready"]
+
+
+def get_warmup_state() -> Dict[str, Any]:
+    return {
+        **_state,
+        "data_version": get_current_data_version(),
+        "bm25": get_bm25_stats(),
+        "snapshot": get_snapshot_stats(),
+        "analytics": get_analytics_stats(),
+        "vectors": get_vector_stats(),
+    }
+
+
+def _schedule_vector_build(data_version: Optional[str]) -> None:
+    """Incremental vector index build in a worker thread - embedding can take minutes, nobody waits for it"""
+    if not VECTOR_REBUILD_ON_CHANGE or not vectors_available() or get_vector_stats()["building"]:
+        return
+    task = asyncio.create_task(asyncio.to_thread(build_vector_index, data_version))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _replay_queries(semaphore: asyncio.Semaphore) -> int:
+    from services.chatbot_service import execute_query
+
+    async def _one(query_type: str, entities: Dict[str, Any]) -> bool:
+        async with semaphore:
+            try:
+                await execute_query(query_type, entities, Deadline(), background=True)
+                return True
+            except Exception as e:
+                print(f"Warm-up query {query_type} failed: {e}")
+                return False
+
+    pairs = await asyncio.to_thread(top_logged_queries, WARMUP_TOP_QUERIES)
+    results = await asyncio.gather(*(_one(q, e) for q, e in pairs))
+    _state["last_errors"] += results.count(False)
+    return results.count(True)
+
+
+async def _replay_questions(semaphore: asyncio.Semaphore) -> int:
+    from services.chatbot_service import chatbot_event_stream, load_system_prompt
+
+    questions = hot_questions(WARMUP_TOP_QUESTIONS)
+    if not questions:
+        logged = await asyncio.to_thread(top_logged_questions, WARMUP_TOP_QUESTIONS)
+        questions = [question for _, question, _ in logged]
+    questions = [q for q in questions if not lookup_answer(q)]
+    system_prompt = load_system_prompt()
+
+    async def _one(question: str) -> bool:
+        async with semaphore:
+            try:
+                async for event in chatbot_event_stream(question, system_prompt, record=False):
+                    if event["event"] == "done" and (event["data"].get("error") or event["data"].get("degraded")):
+                        return False
+                return True
+            except Exception as e:
+                print(f"Warm-up question failed: {e}")
+                return False
+
+    results = await asyncio.gather(*(_one(q) for q in questions))
+    _state["last_errors"] += results.count(False)
+    return results.count(True)
+
+
+async def run_warmup(reason: str = "startup") -> Dict[str, Any]:
+    """
+    Replay hot queries and questions; marks the instance ready when done
+
+    Only one warm-up runs at a time. Bounded by WARMUP_TIMEOUT_SECONDS - a slow
+    dependency must not keep the instance out of rotation forever.
+    """
+    async with _lock:
+        _state.update(status="running", last_reason=reason, last_started=time.time(), last_errors=0)
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+        try:
+            # Templates first: the question replay then hits warm Neo4j results
+            _state["last_queries"] = await asyncio.wait_for(_replay_queries(semaphore), WARMUP_TIMEOUT_SECONDS)
+            remaining = max(WARMUP_TIMEOUT_SECONDS - (time.perf_counter() - started), 1)
+            _state["last_questions"] = await asyncio.wait_for(_replay_questions(semaphore), remaining)
+        except asyncio.TimeoutError:
+            print(f"⏱️ Warm-up ({reason}) stopped after {WARMUP_TIMEOUT_SECONDS}s")
+        _state.update(
+            status="ready",
+            ready=True,
+            runs=_state["runs"] + 1,
+            last_duration_s=round(time.perf_counter() - started, 2),
+        )
+        print(f"🔥 Warm-up ({reason}): {_state['last_queries']} queries, "
+              f"{_state['last_questions']} answers in {_state['last_duration_s']}s")
+        return get_warmup_state()
+
+
+async def _startup_step(name: str, func, *args) -> Any:
+    """Run one pre-warm step in a worker thread; a failure is logged and skipped"""
+    _state["startup_errors"].append(name)  # removed again when the step finishes
+    try:
+        result = await asyncio.to_thread(func, *args)
+        _state["startup_errors"].remove(name)
+        return result
+    except Exception as e:
+        print(f"Startup step {name} failed: {e}")
+        return None
+
+
+async def _prepare_startup() -> None:
+    version = get_current_data_version()
+    await _startup_step("fulltext", ensure_fulltext_indexes)
+    await _startup_step("bm25", rebuild_bm25_index, version)
+    await _startup_step("snapshot_load", load_graph_snapshot)
+    if get_snapshot() is None or get_snapshot().data_version != version:
+        await _startup_step("snapshot_build", build_graph_snapshot, version)
+    await _startup_step("analytics", refresh_analytics, version)
+    if await _startup_step("vectors_load", load_vector_index):
+        # Load the embedding model now rather than on the first question
+        await _startup_step("embedding_model", embed, ["warm-up"])
+    if not vector_index_loaded() or get_vector_stats()["data_version"] != version:
+        _schedule_vector_build(version)
+    if PLAN_CHECK_ENABLED:
+        _state["startup_errors"].append("query_plans")
+        try:
+            await check_query_plans()
+            _state["startup_errors"].remove("query_plans")
+        except Exception as e:
+            print(f"Query plan check error: {e}")
+
+
+async def startup_warmup() -> None:
+    """
+    Lifespan entry point: create missing full-text indexes, build the BM25
+    index, open the graph snapshot (re-exported when stale), bring the
+    materialized reports up to date, open the vector index (a stale one is
+    rebuilt in the background), check and plan every template, then warm up
+
+    The preparation is bounded by WARMUP_TIMEOUT_SECONDS and a failing step is
+    skipped (listed in startup_errors); the instance becomes ready in any case.
+    A step cut off by the timeout keeps running in its worker thread.
+    """
+    try:
+        try:
+            await asyncio.wait_for(_prepare_startup(), WARMUP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"⏱️ Startup preparation stopped after {WARMUP_TIMEOUT_SECONDS}s: {_state['startup_errors']}")
+        if WARMUP_ENABLED:
+            await run_warmup("startup")
+    except Exception as e:
+        print(f"Startup warm-up error: {e}")
+    finally:
+        _state.update(status="ready", ready=True)
+
+
+async def refresh_after_import(force: bool = False) -> bool:
+    """
+    If the graph data version changed (or `force`), switch the cache keys to
+    the new version, reload the answer bank, rebuild the BM25 index and the
+    graph snapshot, recompute the reports of the changed subgraphs and the
+    graph counts (the vector index in the background), warm up again and tell
+    the open chat WebSockets (a `push` message); returns True when a refresh ran
+
+    Otherwise only a rebuilt answer bank file (scripts/build_answer_bank.py)
+    is reloaded.
+    """
+    from api.chat_ws import push_to_all
+    from services.chatbot_service import clear_caches
+
+    version = await asyncio.to_thread(fetch_data_version)
+    previous = get_current_data_version()
+    if not force and (version is None or version == previous):
+        await asyncio.to_thread(reload_answer_bank_if_changed, previous)
+        return False
+    print(f"📦 Graph data changed ({previous} → {version}), refreshing caches")
+    set_current_data_version(version)
+    clear_caches()
+    await asyncio.to_thread(load_answer_bank, version)
+    await asyncio.to_thread(rebuild_bm25_index, version)
+    await asyncio.to_thread(build_graph_snapshot, version)
+    await asyncio.to_thread(refresh_analytics, version)
+    await asyncio.to_thread(refresh_graph_stats, version)
+    _schedule_vector_build(version)
+    if WARMUP_ENABLED:
+        await run_warmup("data_version")
+    await push_to_all({"event": "data_version", "data_version": version})
+    return True
+
+
+async def data_version_watch_loop() -> None:
+    """Poll the DataVersion nodes (one small query) so caches follow finished imports"""
+    while True:
+        await asyncio.sleep(DATA_VERSION_POLL_SECONDS)
+        try:
+            await refresh_after_import()
+        except Exception as e:
+            print(f"Data version watch error: {e}")
@@ -0,0 +1,102 @@
+"""
+Load test: WebSocket (/api/chatbot/ws) vs SSE (/api/chatbot/query-stream)
+
+Simulates N browsers each asking the same list of questions, and compares
+connections opened, wall time and server CPU time for both transports.
+
+Needs a running server (python run.py) and: pip install httpx websockets psutil
+
+    python test_ws_load.py --clients 50 --server-pid <uvicorn worker pid>
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import websockets
+
+QUESTIONS = [
+    "Visa 500 là gì?",
+    "điều kiện visa 189",
+    "học Master IT cần IELTS bao nhiêu",
+]
+
+
+def server_cpu_seconds(pid):
+    """User + system CPU time of the server process (None without --server-pid)"""
+    if not pid:
+        return None
+    import psutil
+    times = psutil.Process(pid).cpu_times()
+    return times.user + times.system
+
+
+async def sse_client(base_url: str, stats: dict):
+    """One browser over SSE: a new streaming POST per question"""
+    async with httpx.AsyncClient(timeout=120) as client:
+        for question in QUESTIONS:
+            stats["connections"] += 1
+            async with client.stream("POST", f"{base_url}/api/chatbot/query-stream", json={"question": question}) as resp:
+                async for line in resp.aiter_lines():
+                    if line.startswith("event: done"):
+                        stats["answers"] += 1
+                        break
+
+
+async def ws_client(ws_url: str, stats: dict):
+    """One browser over WebSocket: all questions multiplexed on a single socket"""
+    stats["connections"] += 1
+    async with websockets.connect(f"{ws_url}/api/chatbot/ws", max_size=None) as ws:
+        pending = set()
+        for question in QUESTIONS:
+            request_id = uuid.uuid4().hex
+            pending.add(request_id)
+            await ws.send(json.dumps({"type": "query", "request_id": request_id, "question": question}))
+        while pending:
+            message = json.loads(await ws.recv())
+            if message.get("type") in ("done", "error"):
+                pending.discard(message.get("request_id"))
+                stats["answers"] += 1
+
+
+async def run(name: str, client, target: str, clients: int, pid):
+    stats = {"connections": 0, "answers": 0}
+    cpu_before = server_cpu_seconds(pid)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(target, stats) for _ in range(clients)), return_exceptions=True)
+    wall = time.perf_counter() - start
+    cpu_after = server_cpu_seconds(pid)
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    print(f"\n{name}")
+    print("-" * 50)
+    print(f"  Clients:     {clients}")
+    print(f"  Connections: {stats['connections']}")
+    print(f"  Answers:     {stats['answers']}")
+    print(f"  Errors:      {len(errors)}")
+    print(f"  Wall time:   {wall:.2f} s")
+    if cpu_before is not None:
+        cpu = cpu_after - cpu_before
+        print(f"  Server CPU:  {cpu:.2f} s ({cpu / max(stats['answers'], 1) * 1000:.1f} ms/answer)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--server-pid", type=int, default=None)
+    args = parser.parse_args()
+
+    ws_url = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    print("=" * 60)
+    print(f"Load test: {args.clients} clients x {len(QUESTIONS)} questions")
+    print("=" * 60)
+    await run("SSE (/query-stream)", sse_client, args.base_url, args.clients, args.server_pid)
+    await run("WebSocket (/ws)", ws_client, ws_url, args.clients, args.server_pid)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+"""
+Unit tests for the backend services (no Neo4j, Gemini or PostgreSQL needed)
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+# Tests import `config` / `services` the way the server does (from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py refuses to load without a key; the tests never call Gemini
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
@@ -0,0 +1,35 @@
+import os
+
+from services import answer_bank
+from services.answer_bank import (
+    load_answer_bank,
+    lookup_answer,
+    reload_answer_bank_if_changed,
+    write_answer_bank,
+)
+
+
+def _answers(text):
+    return {"visa 500 là gì": {"question": "Visa 500 là gì?", "intent": "VISA", "rows": [], "text": text}}
+
+
+def test_rebuilt_bank_is_reloaded_without_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_bank, "_bank", dict(answer_bank._bank))
+    path = str(tmp_path / "bank.json")
+    write_answer_bank(_answers("old"), "v1", 1, path)
+    assert load_answer_bank("v1", path) == 1
+    assert reload_answer_bank_if_changed("v1", path) is None  # file untouched
+
+    write_answer_bank(_answers("new"), "v1", 2, path)
+    os.utime(path, (1, 1))  # mtime granularity: make the rewrite visible
+    assert reload_answer_bank_if_changed("v1", path) == 1
+    assert lookup_answer("visa 500 là gì?")["text"] == "new"
+
+
+def test_bank_for_another_data_version_is_not_served(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_bank, "_bank", dict(answer_bank._bank))
+    path = str(tmp_path / "bank.json")
+    write_answer_bank(_answers("old"), "v1", 1, path)
+    assert load_answer_bank("v2", path) == 0
+    assert lookup_answer("Visa 500 là gì") is None
+    assert answer_bank.get_answer_bank_info()["stale"]
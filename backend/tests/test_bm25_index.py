@@ -0,0 +1,51 @@
+from services.bm25_index import BM25Index, tokenize
+
+
+def _doc(node_id, title, text):
+    return (node_id, "test", title, text, None)
+
+
+def test_tokenize_folds_accents_and_drops_stop_words():
+    assert tokenize("Định cư tại Úc là gì?") == ["dinh", "cu", "uc"]
+    assert tokenize("What is the visa_subclass for students") == ["visa", "subclass", "students"]
+    assert tokenize("") == []
+
+
+def test_stop_words_are_matched_before_folding():
+    # thế (so) is a stop word; thẻ (card), vé (ticket), tài (finance) fold onto stop words but are kept
+    assert tokenize("Như thế nào") == []
+    assert tokenize("thẻ xanh") == ["the", "xanh"]
+    assert tokenize("vé máy bay, tài chính") == ["ve", "may", "bay", "tai", "chinh"]
+
+
+def test_decomposed_input_matches_composed_stop_words():
+    import unicodedata
+
+    assert tokenize(unicodedata.normalize("NFD", "về visa")) == ["visa"]
+
+
+def test_search_ranks_rarer_and_more_frequent_terms_higher():
+    index = BM25Index([
+        _doc("a", "Visa 500", "Student visa for study in Australia"),
+        _doc("b", "Thẻ Medicare", "Đăng ký thẻ Medicare, thẻ y tế công"),
+        _doc("c", "Visa 485", "Graduate visa after study"),
+    ])
+    ranked = [index.docs[doc_id][0] for doc_id, _ in index.search("thẻ medicare")]
+    assert ranked == ["b"]
+
+    ranked = index.search("student visa")
+    assert index.docs[ranked[0][0]][0] == "a"  # "student" only occurs in a
+    assert len(ranked) == 2
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_search_without_known_terms_is_empty():
+    index = BM25Index([_doc("a", "Visa", "text")])
+    assert index.search("là gì") == []
+    assert index.search("unrelated") == []
+    assert BM25Index([]).search("visa") == []
+
+
+def test_search_respects_k():
+    index = BM25Index([_doc(str(i), f"visa {i}", "visa") for i in range(10)])
+    assert len(index.search("visa", k=3)) == 3
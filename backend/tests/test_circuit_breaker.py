@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from services import circuit_breaker
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    monkeypatch.setattr(circuit_breaker, "CB_MIN_CALLS", 4)
+    monkeypatch.setattr(circuit_breaker, "CB_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(circuit_breaker, "CB_WINDOW_SECONDS", 30)
+    monkeypatch.setattr(circuit_breaker, "CB_OPEN_SECONDS", 10)
+    monkeypatch.setattr(circuit_breaker, "CB_HALF_OPEN_PROBES", 1)
+    return clock
+
+
+def _open(breaker):
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_opens_at_failure_rate_once_min_calls_reached(clock):
+    breaker = CircuitBreaker("t")
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED  # 3 < CB_MIN_CALLS
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = CircuitBreaker("t")
+    for ok in (True, True, False, True, False):
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CLOSED  # 2 of 5 failed
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = CircuitBreaker("t")
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_calls"] == 1
+
+
+def test_open_refuses_then_half_open_lets_one_probe(clock):
+    breaker = CircuitBreaker("t")
+    _open(breaker)
+    assert not breaker.allow()
+    assert breaker.snapshot()["retry_in_seconds"] == 10
+
+    clock.now += 10
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only CB_HALF_OPEN_PROBES at a time
+
+
+def test_probe_success_closes_and_failure_reopens(clock):
+    breaker = CircuitBreaker("t")
+    _open(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.total_opened == 2
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_calls"] == 1
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = CircuitBreaker("t")
+    _open(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.allow()
+
+
+def test_execute_query_without_driver_keeps_the_probe_slot(clock, monkeypatch):
+    from services import chatbot_service
+
+    breaker = CircuitBreaker("neo4j")
+    _open(breaker)
+    clock.now += 10
+    monkeypatch.setattr(chatbot_service, "neo4j_breaker", breaker)
+    monkeypatch.setattr(chatbot_service, "connect_neo4j_async", lambda: None)
+    monkeypatch.setattr(chatbot_service, "snapshot_rows", lambda *a: None)
+    monkeypatch.setattr(chatbot_service, "analytics_rows", lambda *a: None)
+
+    rows = asyncio.run(chatbot_service.execute_query("list_settlement_categories", {}))
+    assert rows == []
+    assert breaker.allow()  # the probe slot was not taken by the unconfigured call
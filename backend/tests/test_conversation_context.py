@@ -0,0 +1,62 @@
+import pytest
+
+from services import conversation_context as cc
+
+TEMPLATES = {"visa_about": "", "visa_eligibility": "", "visa_steps": ""}
+
+
+@pytest.fixture(autouse=True)
+def visa_500_turn():
+    cc._contexts.clear()
+    cc.remember(1, {"intent": "VISA", "query_type": "visa_about", "entities": {"subclass": "500"}}, [{"row": 1}])
+    yield
+    cc._contexts.clear()
+
+
+def test_pronoun_follow_up_reuses_rows():
+    follow_up = cc.resolve_follow_up(1, "còn thời hạn của nó?", TEMPLATES)
+    assert follow_up.question == "còn thời hạn của visa 500?"
+    assert follow_up.rows == [{"row": 1}]
+
+
+def test_aspect_follow_up_switches_template():
+    follow_up = cc.resolve_follow_up(1, "điều kiện của nó là gì?", TEMPLATES)
+    assert follow_up.analysis["query_type"] == "visa_eligibility"
+    assert follow_up.analysis["entities"] == {"subclass": "500"}
+    assert follow_up.rows is None
+
+
+@pytest.mark.parametrize("question", [
+    "học Master IT cần IELTS bao nhiêu",
+    "Master of IT ở UTS",
+    "what about IT at UNSW?",
+    "thế còn ngành kế toán?",
+    "vậy còn University of Sydney?",
+    "thế còn visa 189?",
+])
+def test_new_entity_is_not_a_follow_up(question):
+    assert cc.resolve_follow_up(1, question, TEMPLATES) is None
+
+
+def test_exam_names_do_not_count_as_new_entities():
+    follow_up = cc.resolve_follow_up(1, "nó cần IELTS bao nhiêu?", TEMPLATES)
+    assert follow_up is not None
+    assert follow_up.question == "visa 500 cần IELTS bao nhiêu?"
+
+
+def test_unknown_conversation():
+    assert cc.resolve_follow_up(2, "còn của nó?", TEMPLATES) is None
+    assert cc.resolve_follow_up(None, "còn của nó?", TEMPLATES) is None
+
+
+def test_aspect_words_after_a_study_turn_keep_the_program_query():
+    rows = [{"program": "Master of Accounting", "requirements": ["IELTS: 6.5"]}]
+    cc.remember(2, {
+        "intent": "STUDY",
+        "query_type": "complete_program_info",
+        "entities": {"university_name": "University of Sydney", "program_name": "Master of Accounting"},
+    }, rows)
+    follow_up = cc.resolve_follow_up(2, "còn yêu cầu đầu vào của nó?", {**TEMPLATES, "complete_program_info": ""})
+    assert follow_up.analysis["query_type"] == "complete_program_info"
+    assert follow_up.rows == rows
+    assert follow_up.question == "còn yêu cầu đầu vào của University of Sydney?"
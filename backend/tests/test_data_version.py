@@ -0,0 +1,42 @@
+from services.data_version import count_store
+
+
+class Result(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class FakeSession:
+    """Answers the two count_store statements from an in-memory schema"""
+
+    def __init__(self, labels, types):
+        self.labels, self.types = labels, types
+        self.statements = []
+
+    def run(self, cypher, **params):
+        self.statements.append(cypher)
+        if cypher.startswith("CALL {"):
+            return Result([{"labels": list(self.labels), "types": list(self.types)}])
+        rows = []
+        for branch in cypher.split(" UNION ALL "):
+            kind = "label" if branch.startswith("MATCH (n:") else "type"
+            name = params[branch.split(" AS name")[0].rsplit("$", 1)[1]]
+            counts = self.labels if kind == "label" else self.types
+            rows.append({"kind": kind, "name": name, "c": counts[name]})
+        return Result(rows)
+
+
+def test_counts_every_label_and_type_in_two_statements():
+    session = FakeSession({"Visa": 3, "University": 40, "Odd`Label": 1}, {"OFFERS": 7, "AT_UNIVERSITY": 9})
+    labels, types = count_store(session)
+    assert labels == {"Odd`Label": 1, "University": 40, "Visa": 3}
+    assert types == {"AT_UNIVERSITY": 9, "OFFERS": 7}
+    assert list(labels) == sorted(labels)
+    assert len(session.statements) == 2
+    assert "`Odd``Label`" in session.statements[1]
+
+
+def test_empty_graph_needs_no_count_statement():
+    session = FakeSession({}, {})
+    assert count_store(session) == ({}, {})
+    assert len(session.statements) == 1
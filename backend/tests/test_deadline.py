@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from services import deadline as deadline_module
+from services.deadline import Deadline, LatencyTracker, hedged_call
+
+
+@pytest.fixture
+def shares(monkeypatch):
+    monkeypatch.setitem(deadline_module.STAGE_SHARES, "intent", 0.2)
+    monkeypatch.setitem(deadline_module.STAGE_SHARES, "query", 0.3)
+    monkeypatch.setattr(deadline_module, "MIN_STAGE_SECONDS", 1.0)
+
+
+def test_budget_is_share_of_total_capped_by_remaining(shares):
+    d = Deadline(20)
+    assert d.budget("intent") == pytest.approx(4, abs=0.05)
+    assert d.budget("query") == pytest.approx(6, abs=0.05)
+    assert d.budget("llm") == pytest.approx(20, abs=0.05)  # no share: whatever is left
+
+    d.expires_at -= 17  # 3s left
+    assert d.budget("query") == pytest.approx(3, abs=0.05)
+
+
+def test_budget_has_a_floor_until_the_deadline_passes(shares):
+    d = Deadline(20)
+    d.expires_at -= 19.7
+    assert d.budget("llm") == 1.0
+    d.expires_at -= 1
+    assert d.expired()
+    assert d.budget("llm") == 0.0
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker(window=10)
+    for i in range(5):
+        tracker.record(i)
+    assert tracker.percentile(0.9, min_samples=10) is None
+    for i in range(5, 15):
+        tracker.record(i)
+    assert tracker.percentile(0.9, min_samples=10) == 14  # window keeps 5..14
+
+
+class Calls:
+    """make_call factory: call i sleeps steps[i][0], then returns or raises steps[i][1]"""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.started = 0
+
+    async def __call__(self):
+        delay, outcome = self.steps[self.started]
+        self.started += 1
+        await asyncio.sleep(delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def test_fast_primary_is_not_hedged():
+    calls = Calls((0.0, "primary"))
+    assert asyncio.run(hedged_call(calls, hedge_after=0.1, timeout=1)) == "primary"
+    assert calls.started == 1
+
+
+def test_slow_primary_is_hedged_and_the_backup_wins():
+    calls = Calls((0.5, "primary"), (0.0, "backup"))
+    assert asyncio.run(hedged_call(calls, hedge_after=0.05, timeout=1)) == "backup"
+    assert calls.started == 2
+
+
+def test_fast_failure_is_not_hedged():
+    calls = Calls((0.0, RuntimeError("429 quota")), (0.0, "backup"))
+    with pytest.raises(RuntimeError, match="429"):
+        asyncio.run(hedged_call(calls, hedge_after=0.1, timeout=1))
+    assert calls.started == 1
+
+
+def test_times_out_when_every_attempt_is_slow():
+    calls = Calls((1.0, "primary"), (1.0, "backup"))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(hedged_call(calls, hedge_after=0.02, timeout=0.1))
+    assert calls.started == 2
+
+
+def test_no_call_without_budget():
+    calls = Calls((0.0, "primary"))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(hedged_call(calls, hedge_after=0.1, timeout=0))
+    assert calls.started == 0
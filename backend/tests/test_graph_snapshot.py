@@ -0,0 +1,96 @@
+import re
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from services import graph_snapshot
+from services.graph_snapshot import SNAPSHOT_TEMPLATES, build_graph_snapshot
+
+# label -> [(id, properties)]
+NODES = {
+    "University": [("u1", {"name": "Melbourne"}), ("u2", {"name": "Sydney"})],
+    "Program": [
+        ("p1", {"name": "MIT", "program_type": "Master", "url": "/mit", "starting_months": ["Feb", "Jul"]}),
+        ("p2", {"name": "MDS", "program_type": "Master", "url": "/mds", "starting_months": ["Feb"]}),
+        ("p3", {"name": "BIT", "program_type": "Bachelor", "url": "/bit", "starting_months": None}),
+        ("p4", {"name": "BCom", "program_type": "Bachelor", "url": "/bcom", "starting_months": None}),
+    ],
+    "StudyCategory": [("c1", {"name": "IT"})],
+    "ExamScore": [("es1", {"value": 6.5})],
+    "Exam": [("e1", {"name": "IELTS"})],
+}
+# relationship type -> [(start id, end id)]
+EDGES = {
+    "AT_UNIVERSITY": [("p1", "u1"), ("p2", "u1"), ("p3", "u1"), ("p4", "u2")],
+    "IN_STUDY_CATEGORY": [("p1", "c1")],
+    "HAS_REQUIRED": [("p1", "es1")],
+    "HAS_SCORE": [("e1", "es1")],
+}
+
+
+class FakeSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, **params):
+        node = re.match(r"MATCH \(n:(\w+)\) RETURN elementId\(n\) AS id", cypher)
+        if node:
+            return [{"id": i, **{k: props.get(k) for k in graph_snapshot.SNAPSHOT_NODES[node.group(1)]}}
+                    for i, props in NODES.get(node.group(1), [])]
+        edge = re.match(r"MATCH \(a:\w+\)-\[:(\w+)\]->\(b:\w+\)", cypher)
+        return [{"a": a, "b": b} for a, b in EDGES.get(edge.group(1), [])]
+
+
+class FakeDriver:
+    def session(self, **kwargs):
+        return FakeSession()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_snapshot, "_state", {"snapshot": None, "last_build": None, "error": None})
+    monkeypatch.setattr(graph_snapshot, "GRAPH_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(graph_snapshot, "connect_neo4j", FakeDriver)
+    assert build_graph_snapshot("v1", str(tmp_path / "snapshot")) is not None
+    return graph_snapshot.get_snapshot()
+
+
+def test_program_templates_follow_at_university(snapshot):
+    run = lambda name, **params: SNAPSHOT_TEMPLATES[name](snapshot, params)
+
+    assert run("count_programs_by_university", university_name="Melbourne") == [{"total_programs": 3}]
+    assert run("program_existence_for_university", university_name="Melbourne", program_name="MDS") == [
+        {"program_exists": True}
+    ]
+    assert run("program_existence_for_university", university_name="Melbourne", program_name="BCom") == [
+        {"program_exists": False}
+    ]
+
+    export = run("export_programs_by_university", university_name="Melbourne")
+    assert [(r["Level"], r["Program"]) for r in export] == [("Bachelor", "BIT"), ("Master", "MDS"), ("Master", "MIT")]
+    assert export[2]["Requirements"] == ["IELTS: 6.5"]
+    assert export[2]["Category"] == "IT"
+    assert export[0]["Requirements"] == []
+
+    more = run("context_aware_more_programs", previous_university="Melbourne", previous_level="Master", previous_program="MIT")
+    assert more == [{
+        "program": "MDS", "level": "Master", "category": None,
+        "requirements": [{"exam": None, "score": None}], "url": "/mds",
+    }]
+
+
+def test_verify_samples_come_from_at_university(snapshot):
+    from scripts.build_graph_snapshot import sample_params
+
+    params = sample_params(snapshot)
+    assert {p["university_name"] for p in params["count_programs_by_university"]} == {"Melbourne", "Sydney"}
+    assert {(p["previous_level"], p["previous_program"]) for p in params["context_aware_more_programs"]} <= {
+        ("Master", "MIT"), ("Master", "MDS"), ("Bachelor", "BIT"), ("Bachelor", "BCom")
+    }
@@ -0,0 +1,59 @@
+from services import heavy_hitters
+from services.heavy_hitters import CountMinSketch, HeavyHitterTracker
+
+
+def test_sketch_never_under_counts():
+    sketch = CountMinSketch(width=16, depth=3)  # narrow: collisions are certain
+    truth = {f"key{i}": i % 7 + 1 for i in range(100)}
+    for key, count in truth.items():
+        sketch.add(key, count)
+    assert all(sketch.estimate(key) >= count for key, count in truth.items())
+
+
+def test_sketch_is_exact_without_collisions():
+    sketch = CountMinSketch(width=4096, depth=4)
+    for _ in range(5):
+        sketch.add("visa 500")
+    assert sketch.add("visa 485") == 1
+    assert sketch.estimate("visa 500") == 5
+    assert sketch.estimate("never seen") == 0
+
+
+def test_top_k_keeps_the_heaviest_keys():
+    tracker = HeavyHitterTracker("t", k=3, width=4096, depth=4)
+    stream = ["a"] * 50 + ["b"] * 30 + ["c"] * 20 + [f"rare{i}" for i in range(200)] + ["d"] * 10
+    for key in stream:
+        tracker.add(key)
+    assert [item["key"] for item in tracker.top()] == ["a", "b", "c"]
+    assert tracker.top(1) == [{"key": "a", "count": 50}]
+    assert tracker.total == len(stream)
+
+
+def test_late_heavy_key_evicts_the_smallest():
+    tracker = HeavyHitterTracker("t", k=2, width=4096, depth=4)
+    for key in ["a"] * 5 + ["b"] * 3 + ["c"] * 4:
+        tracker.add(key)
+    assert {item["key"] for item in tracker.top()} == {"a", "c"}
+
+
+def test_counts_halve_every_decay_period(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(heavy_hitters.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(heavy_hitters, "HH_DECAY_SECONDS", 60)
+    tracker = HeavyHitterTracker("t", k=2, width=4096, depth=4)
+    for key in ["a"] * 8 + ["b"]:
+        tracker.add(key)
+
+    clock[0] += 61
+    tracker.add("c")
+    assert tracker.estimate("a") == 4
+    assert tracker.total == 5  # 9 halved, plus c
+    assert [item["key"] for item in tracker.top()] == ["a", "c"]  # b decayed to 0
+
+
+def test_frequency_only_tracker_has_no_top():
+    tracker = HeavyHitterTracker("t", k=0, width=4096, depth=4)
+    for _ in range(3):
+        tracker.add("rows:visa_about")
+    assert tracker.estimate("rows:visa_about") == 3
+    assert tracker.top() == []
@@ -0,0 +1,121 @@
+import pytest
+
+from services.query_loader import QueryParamError, QueryRegistry
+
+V2 = """// ============================================================
+// PHẦN 1: STUDY
+// ============================================================
+
+-- name: find_by_ielts
+// 1.2. TÌM THEO IELTS
+// Use case: "Chương trình IELTS 6.5"
+MATCH (p:Program)-[:HAS_REQUIRED]->(es:ExamScore)
+WHERE es.value <= $score AND p.program_type IN $levels
+RETURN p.name AS name
+LIMIT 10;
+
+-- ============================================================
+-- PHẦN 2
+-- ============================================================
+
+-- name: search_programs
+// @param q: search
+CALL db.index.fulltext.queryNodes('program_fulltext', $q) YIELD node
+RETURN node.name AS name
+LIMIT $limit;
+
+-- name: write_thing
+MATCH (n:Program) SET n.seen = true;
+
+-- name: two_statements
+MATCH (n:Visa) RETURN n;
+MATCH (m:Program) RETURN m;
+"""
+
+V1 = """// 1.2. TÌM THEO IELTS
+MATCH (p:Program) RETURN p;
+
+// 9.9. ONLY IN V1
+MATCH (v:Visa) WHERE v.subclass = $subclass RETURN v;
+"""
+
+
+@pytest.fixture
+def files(tmp_path):
+    v2, v1 = tmp_path / "v2.cypher", tmp_path / "v1.cypher"
+    v2.write_text(V2, encoding="utf-8")
+    v1.write_text(V1, encoding="utf-8")
+    return [str(v2), str(v1)], tmp_path / "registry.json"
+
+
+def test_parses_v2_entries_with_metadata_and_inferred_params(files):
+    paths, _ = files
+    registry = QueryRegistry(paths, cache_path=None)
+    template = registry.entry("find_by_ielts")
+    assert template.section == "1.2"
+    assert template.use_case == "Chương trình IELTS 6.5"
+    assert template.params == {"score": "float", "levels": "list"}
+    assert template.default_limit == 10
+    assert template.runnable
+    assert registry.entry("search_programs").params == {"q": "search", "limit": "int"}
+    # Section banners between entries are not part of the previous entry
+    assert "PHẦN 2" not in template.cypher
+
+
+def test_write_and_multi_statement_entries_are_not_runnable(files):
+    registry = QueryRegistry(files[0], cache_path=None)
+    assert registry.entry("write_thing").kind == "write"
+    assert not registry.entry("write_thing").runnable
+    two = registry.entry("two_statements")
+    assert two.kind == "read" and len(two.statements) == 2
+    assert not two.runnable
+
+
+def test_v1_titles_become_aliases_or_entries(files):
+    registry = QueryRegistry(files[0], cache_path=None)
+    assert registry.entry("tìm_theo_ielts").name == "find_by_ielts"
+    assert registry["tìm_theo_ielts"] == registry["find_by_ielts"]
+    assert registry.entry("only_in_v1").params == {"subclass": "any"}
+    assert "tìm_theo_ielts" not in list(registry)  # aliases are not listed as entries
+    assert next(d for d in registry.describe() if d["name"] == "find_by_ielts")["aliases"] == ["tìm_theo_ielts"]
+
+
+def test_validate_coerces_and_drops_unknown_params(files):
+    registry = QueryRegistry(files[0], cache_path=None)
+    params = registry.validate("find_by_ielts", {"score": "6.5", "levels": "Master", "extra": 1})
+    assert params == {"score": 6.5, "levels": ["Master"]}
+    assert registry.validate("search_programs", {"q": "data science", "limit": "5"})["limit"] == 5
+
+    with pytest.raises(QueryParamError, match="missing"):
+        registry.validate("find_by_ielts", {"score": 6.5})
+    with pytest.raises(QueryParamError, match="float"):
+        registry.validate("find_by_ielts", {"score": "high", "levels": ["Master"]})
+    with pytest.raises(QueryParamError, match="Unknown"):
+        registry.validate("nope", {})
+
+
+def test_serialized_registry_is_reused_until_a_file_changes(files):
+    paths, cache = files
+    first = QueryRegistry(paths, cache_path=str(cache))
+    assert not first.from_cache
+    second = QueryRegistry(paths, cache_path=str(cache))
+    assert second.from_cache
+    assert second.entry("find_by_ielts").params == first.entry("find_by_ielts").params
+
+    with open(paths[0], "a", encoding="utf-8") as f:
+        f.write("\n-- name: added_later\nMATCH (u:University) RETURN u.name AS name;\n")
+    assert second.reload_if_changed(force=True)
+    assert second.entry("added_later") is not None
+
+
+def test_rejection_lasts_until_the_template_text_changes(files):
+    paths, _ = files
+    registry = QueryRegistry(paths, cache_path=None)
+    registry.reject("tìm_theo_ielts", "cartesian product")
+    assert registry.rejection("find_by_ielts") == "cartesian product"
+
+    text = open(paths[0], encoding="utf-8").read().replace("LIMIT 10;", "LIMIT 20;")
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.write(text)
+    registry.reload_if_changed(force=True)
+    assert registry.rejection("find_by_ielts") is None
@@ -0,0 +1,78 @@
+import asyncio
+
+from services import query_plans
+from services.query_loader import QueryTemplate
+
+
+class Summary:
+    notifications = []
+    plan = {"operatorType": "ProduceResults", "children": []}
+
+
+class Result:
+    async def consume(self):
+        return Summary()
+
+
+class Session:
+    """Fake async session; a session whose query timed out stays broken"""
+
+    def __init__(self):
+        self.broken = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, cypher, params=None, **kwargs):
+        assert not self.broken, "session reused after a cancelled query"
+        if "slow" in cypher:
+            self.broken = True
+            await asyncio.sleep(10)
+        return Result()
+
+
+class Driver:
+    def session(self, **kwargs):
+        return Session()
+
+    async def close(self):
+        pass
+
+
+class Registry:
+    def __init__(self, templates):
+        self.templates = {t.name: t for t in templates}
+        self.rejected = {}
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def entry(self, name):
+        return self.templates[name]
+
+    def clear_rejections(self):
+        self.rejected.clear()
+
+    def reject(self, name, reason):
+        self.rejected[name] = reason
+
+
+def test_timed_out_template_does_not_break_the_next_ones(monkeypatch):
+    registry = Registry([
+        QueryTemplate("fast_a", "MATCH (v:Visa) RETURN v.name AS name"),
+        QueryTemplate("slow_one", "MATCH (s:slow) RETURN s"),
+        QueryTemplate("fast_b", "MATCH (u:University) RETURN u.name AS name"),
+    ])
+    monkeypatch.setattr(query_plans, "query_registry", registry)
+    monkeypatch.setattr(query_plans, "connect_neo4j_async", Driver)
+    monkeypatch.setattr(query_plans, "PLAN_CHECK_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(query_plans, "PLAN_WARM_PAGE_CACHE", False)
+
+    report = asyncio.run(query_plans.check_query_plans())
+    statuses = {name: r["status"] for name, r in report["results"].items()}
+    assert statuses == {"fast_a": "ok", "slow_one": "timeout", "fast_b": "ok"}
+    assert report["status"] == "done"
+    assert registry.rejected == {}
@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+from services import stream_writer
+from services.stream_writer import SSEStreamWriter, can_resume, resume_stream
+
+
+async def _collect(agen):
+    return [frame async for frame in agen]
+
+
+def _events(frames):
+    return [line[7:] for frame in frames for line in frame.split("\n") if line.startswith("event: ")]
+
+
+def test_disconnect_leaves_terminal_error_frame_for_resume():
+    async def scenario():
+        gate = asyncio.Event()
+        disconnected = asyncio.Event()
+
+        async def upstream():
+            yield {"event": "intent", "data": {"intent": "visa"}}
+            disconnected.set()
+            await gate.wait()  # never released: the client goes away first
+            yield {"event": "done", "data": {}}
+
+        async def is_disconnected():
+            return disconnected.is_set()
+
+        writer = SSEStreamWriter()
+        sent = await _collect(writer.stream(upstream(), is_disconnected=is_disconnected))
+        last_id = f"{writer.stream_id}:1"
+        assert can_resume(last_id)
+        replay = await _collect(resume_stream(f"{writer.stream_id}:0"))
+        return sent, replay
+
+    sent, replay = asyncio.run(scenario())
+    assert _events(sent) == ["intent"]
+    assert _events(replay) == ["intent", "error"]
+    assert '"disconnected"' in replay[-1]
+
+
+def test_resume_is_refused_once_the_next_frame_was_trimmed(monkeypatch):
+    monkeypatch.setattr(stream_writer, "SSE_REPLAY_MAX_FRAMES", 3)
+    monkeypatch.setattr(stream_writer, "SSE_COALESCE_BYTES", 1)
+
+    async def scenario():
+        writer = SSEStreamWriter()
+        await _collect(writer.stream(_text_events(5)))  # frames 1..6, 4..6 kept
+        return writer.stream_id
+
+    stream_id = asyncio.run(scenario())
+    assert not can_resume(f"{stream_id}:1")
+    assert can_resume(f"{stream_id}:3")
+    stream_writer._replay_buffers.clear()
+
+
+def test_upstream_error_leaves_terminal_error_frame():
+    async def scenario():
+        async def upstream():
+            yield {"event": "text", "data": {"text": "partial"}}
+            raise RuntimeError("neo4j down")
+
+        writer = SSEStreamWriter()
+        try:
+            await _collect(writer.stream(upstream()))
+        except RuntimeError:
+            pass
+        return await _collect(resume_stream(f"{writer.stream_id}:0"))
+
+    replay = asyncio.run(scenario())
+    assert _events(replay) == ["text", "error"]
+    assert "partial" in replay[0]
+
+
+def test_completed_stream_has_no_error_frame():
+    async def scenario():
+        async def upstream():
+            yield {"event": "text", "data": {"text": "hi"}}
+            yield {"event": "done", "data": {}}
+
+        writer = SSEStreamWriter()
+        await _collect(writer.stream(upstream()))
+        return await _collect(resume_stream(f"{writer.stream_id}:0"))
+
+    assert _events(asyncio.run(scenario())) == ["text", "done"]
+    stream_writer._replay_buffers.clear()
+
+
+def _text(frame):
+    data = [line[6:] for line in frame.split("\n") if line.startswith("data: ")][0]
+    return json.loads(data)["text"]
+
+
+def _text_events(n, chunk="x"):
+    async def upstream():
+        for _ in range(n):
+            yield {"event": "text", "data": {"text": chunk}}
+        yield {"event": "done", "data": {}}
+    return upstream()
+
+
+def test_text_is_coalesced_up_to_the_byte_limit(monkeypatch):
+    monkeypatch.setattr(stream_writer, "SSE_COALESCE_BYTES", 10)
+    monkeypatch.setattr(stream_writer, "SSE_COALESCE_MS", 10_000)
+    frames = asyncio.run(_collect(SSEStreamWriter().stream(_text_events(26, "ab"))))
+    assert _events(frames) == ["text"] * 6 + ["done"]
+    assert [_text(f) for f in frames[:6]] == ["ababababab"] * 5 + ["ab"]  # the rest goes out before done
+
+
+def test_other_events_flush_buffered_text_first():
+    async def upstream():
+        yield {"event": "intent", "data": {"intent": "visa"}}
+        yield {"event": "text", "data": {"text": "Visa "}}
+        yield {"event": "text", "data": {"text": ""}}  # empty chunks are skipped
+        yield {"event": "text", "data": {"text": "500"}}
+        yield {"event": "done", "data": {"total_ms": 1}}
+
+    frames = asyncio.run(_collect(SSEStreamWriter().stream(upstream())))
+    assert _events(frames) == ["intent", "text", "done"]
+    assert _text(frames[1]) == "Visa 500"
+
+
+def test_slow_chunks_are_flushed_after_the_time_limit(monkeypatch):
+    monkeypatch.setattr(stream_writer, "SSE_COALESCE_BYTES", 10_000)
+    monkeypatch.setattr(stream_writer, "SSE_COALESCE_MS", 20)
+
+    async def upstream():
+        yield {"event": "text", "data": {"text": "first"}}
+        await asyncio.sleep(0.1)
+        yield {"event": "text", "data": {"text": "second"}}
+        yield {"event": "done", "data": {}}
+
+    frames = asyncio.run(_collect(SSEStreamWriter().stream(upstream())))
+    assert [_text(f) for f in frames if "event: text" in f] == ["first", "second"]
+
+
+def test_idle_stream_gets_heartbeats(monkeypatch):
+    monkeypatch.setattr(stream_writer, "SSE_HEARTBEAT_SECONDS", 0.02)
+
+    async def upstream():
+        await asyncio.sleep(0.1)
+        yield {"event": "done", "data": {}}
+
+    frames = asyncio.run(_collect(SSEStreamWriter().stream(upstream())))
+    assert stream_writer.HEARTBEAT_FRAME in frames
+    assert _events(frames) == ["done"]
+
+
+def test_frame_ids_are_sequential_per_stream():
+    writer = SSEStreamWriter()
+    frames = asyncio.run(_collect(writer.stream(_text_events(1))))
+    ids = [line[4:] for f in frames for line in f.split("\n") if line.startswith("id: ")]
+    assert ids == [f"{writer.stream_id}:1", f"{writer.stream_id}:2"]
@@ -39,74 +39,156 @@ export async function sendChatMessage(question: string): Promise<ChatResponse> {
     return response.json()
 }
 
+export type StreamEventType = 'intent' | 'data' | 'text' | 'done' | 'error'
+
+export interface StreamEvent {
+    event: StreamEventType
+    data: any
+}
+
+// Reconnects after a dropped stream, each resuming from the last frame received
+const MAX_STREAM_RESUMES = 3
+
 /**
  * Stream chat message with real-time response
+ *
+ * The backend sends typed SSE events: `intent`, `data` (Neo4j rows, before any
+ * LLM text), `text` chunks and `done` (timing stats). Text chunks go to onChunk;
+ * every event is also passed to the optional onEvent callback.
+ *
+ * Every frame carries an `id: <stream_id>:<seq>`. If the connection drops
+ * before `done`, the request is re-sent with that id as `Last-Event-ID` and
+ * the backend replays only the missed frames. A replay of a stream that
+ * stopped early ends with an `error` event.
  */
 export async function streamChatMessage(
     question: string,
     onChunk: (chunk: string) => void,
     onComplete: () => void,
-    onError: (error: Error) => void
+    onError: (error: Error) => void,
+    onEvent?: (event: StreamEvent) => void
 ): Promise<void> {
-    try {
-        const response = await fetch(`${API_URL}/api/chatbot/query-stream`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ question }),
-        })
+    let lastEventId: string | null = null
+    let resumes = 0
 
-        if (!response.ok) {
-            throw new Error('Failed to start streaming')
-        }
+    while (true) {
+        try {
+            const headers: Record<string, string> = {
+                'Content-Type': 'application/json',
+            }
+            if (lastEventId) {
+                headers['Last-Event-ID'] = lastEventId
+            }
 
-        const reader = response.body?.getReader()
-        const decoder = new TextDecoder()
+            const response = await fetch(`${API_URL}/api/chatbot/query-stream`, {
+                method: 'POST',
+                headers,
+                body: JSON.stringify({ question }),
+            })
 
-        if (!reader) {
-            throw new Error('No response body')
-        }
+            if (!response.ok) {
+                throw new Error('Failed to start streaming')
+            }
 
-        while (true) {
-            const { done, value } = await reader.read()
+            const reader = response.body?.getReader()
+            const decoder = new TextDecoder()
 
-            if (done) {
-                onComplete()
-                break
+            if (!reader) {
+                throw new Error('No response body')
             }
 
-            const chunk = decoder.decode(value, { stream: true })
-            const lines = chunk.split('\n')
+            let buffer = ''
+
+            while (true) {
+                const { done, value } = await reader.read()
+
+                if (done) {
+                    break
+                }
+
+                buffer += decoder.decode(value, { stream: true })
+
+                // SSE frames are separated by a blank line; keep the trailing partial frame
+                const frames = buffer.split('\n\n')
+                buffer = frames.pop() ?? ''
+
+                for (const frame of frames) {
+                    let eventType = 'text'
+                    let eventId: string | null = null
+                    let data = ''
+
+                    for (const line of frame.split('\n')) {
+                        if (line.startsWith('id: ')) {
+                            eventId = line.slice(4).trim()
+                        } else if (line.startsWith('event: ')) {
+                            eventType = line.slice(7).trim()
+                        } else if (line.startsWith('data: ')) {
+                            data += line.slice(6) // Remove 'data: ' prefix
+                        }
+                    }
+
+                    if (!data) {
+                        continue
+                    }
+
+                    if (eventId) {
+                        // The replay buffer expired and the question is being answered
+                        // again from scratch: don't append a second answer
+                        if (lastEventId && streamIdOf(eventId) !== streamIdOf(lastEventId)) {
+                            await reader.cancel()
+                            onError(new Error('Stream interrupted'))
+                            return
+                        }
+                        lastEventId = eventId
+                    }
 
-            for (const line of lines) {
-                if (line.startsWith('data: ')) {
-                    const data = line.slice(6) // Remove 'data: ' prefix
+                    let parsed: any
+                    try {
+                        parsed = JSON.parse(data)
+                    } catch (e) {
+                        // Fallback for plain text
+                        parsed = { text: data }
+                    }
 
-                    if (data === '[DONE]') {
+                    onEvent?.({ event: eventType as StreamEventType, data: parsed })
+
+                    if (eventType === 'done') {
                         onComplete()
                         return
                     }
 
-                    if (data) {
-                        try {
-                            const parsed = JSON.parse(data)
-                            if (parsed.text) {
-                                onChunk(parsed.text)
-                            }
-                        } catch (e) {
-                            // Fallback for plain text
-                            onChunk(data)
-                        }
+                    if (eventType === 'error') {
+                        onError(new Error(`Stream interrupted (${parsed.error})`))
+                        return
+                    }
+
+                    if (eventType === 'text' && parsed.text) {
+                        onChunk(parsed.text)
                     }
                 }
             }
+
+            if (!lastEventId) {
+                onComplete()
+                return
+            }
+            throw new Error('Stream ended before completion')
+        } catch (error) {
+            if (lastEventId && resumes < MAX_STREAM_RESUMES) {
+                resumes++
+                await new Promise((resolve) => setTimeout(resolve, 500 * resumes))
+                continue
+            }
+            onError(error instanceof Error ? error : new Error('Unknown streaming error'))
+            return
         }
-    } catch (error) {
-        onError(error instanceof Error ? error : new Error('Unknown streaming error'))
     }
 }
 
+function streamIdOf(eventId: string): string {
+    return eventId.slice(0, eventId.lastIndexOf(':'))
+}
+
 /**
  * Get system statistics
  */